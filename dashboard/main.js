@@ -1,5 +1,6 @@
 // --- Configuration ---
-const WEBSOCKET_URL = "ws://127.0.0.1:9001";
+const DEFAULT_WEBSOCKET_HOST = "127.0.0.1";
+const DEFAULT_WEBSOCKET_PORT = 9001;
 
 // --- DOM Elements ---
 const statusElement = document.getElementById('connection-status');
@@ -10,7 +11,11 @@ const resetButton = document.getElementById('reset-button');
 // --- State Management ---
 // This will hold the data, e.g., stats['Rust']['matrix_multiplication'] = { runs: 123, ... }
 let stats = {};
-const LANGUAGES = ["Python", "Ruby", "Java", "Rust"];
+// Rolled-up history per series, from the snapshot and from history requests: history['Rust/fibonacci'] = [[t, count, sum, min, max], ...]
+let history = {};
+let socket = null;
+let historyRequestId = 0;
+const LANGUAGES = ["Python", "Python-NumPy", "Ruby", "Java", "Rust"];
 const ALGORITHMS = [
     "array_sort", "fibonacci", "game_of_life",
     "matrix_multiplication", "prime_factors", "is_leap_year"
@@ -31,39 +36,255 @@ function logMessage(message, level = 'info') {
 }
 
 
+/**
+ * Formats a duration in seconds with a readable unit (s, ms, µs, ns).
+ * @param {number} seconds - The duration to format.
+ * @returns {string}
+ */
+function formatDuration(seconds) {
+    if (seconds === null || seconds === undefined || !isFinite(seconds)) return '–';
+    if (seconds >= 1) return `${seconds.toFixed(2)}s`;
+    if (seconds >= 1e-3) return `${(seconds * 1e3).toFixed(2)}ms`;
+    if (seconds >= 1e-6) return `${(seconds * 1e6).toFixed(2)}µs`;
+    return `${Math.round(seconds * 1e9)}ns`;
+}
+
+
+/**
+ * Formats a rate with a metric suffix (k, M, G).
+ * @param {number} perSecond - Events per second.
+ * @returns {string}
+ */
+function formatRate(perSecond) {
+    if (!isFinite(perSecond) || perSecond <= 0) return '–';
+    if (perSecond >= 1e9) return `${(perSecond / 1e9).toFixed(2)}G`;
+    if (perSecond >= 1e6) return `${(perSecond / 1e6).toFixed(2)}M`;
+    if (perSecond >= 1e3) return `${(perSecond / 1e3).toFixed(2)}k`;
+    return perSecond.toFixed(1);
+}
+
+
+/**
+ * Turns a series name such as "Python [processes]" into a safe DOM id fragment.
+ * @param {string} name
+ * @returns {string}
+ */
+function slug(name) {
+    return name.toLowerCase().replace(/[^a-z0-9_]+/g, '-').replace(/^-|-$/g, '');
+}
+
+
+/**
+ * Creates the card for a language (or execution-mode series) if it does not exist yet.
+ * @param {string} lang
+ * @returns {HTMLElement} The card's algorithm list.
+ */
+function ensureLanguageCard(lang) {
+    let card = document.getElementById(`card-${slug(lang)}`);
+    if (!card) {
+        stats[lang] = stats[lang] || {};
+        card = document.createElement('div');
+        card.className = 'lang-card';
+        card.id = `card-${slug(lang)}`;
+        card.innerHTML = `<h2></h2><div class="algo-list"></div>`;
+        card.querySelector('h2').textContent = lang;
+        statsGrid.appendChild(card);
+    }
+    return card.querySelector('.algo-list');
+}
+
+
+/**
+ * Creates the state entry and UI row for one (lang, algo) pair if needed.
+ * @returns {object} The stats entry.
+ */
+function ensureStat(lang, algo) {
+    const algoList = ensureLanguageCard(lang);
+    if (!stats[lang][algo]) {
+        // Initialize stats object for each algorithm
+        stats[lang][algo] = { runs: 0, total_duration: 0, min_duration: Infinity, max_duration: 0, elements: 1 };
+
+        // Create the HTML structure for each algorithm's stats display
+        algoList.insertAdjacentHTML('beforeend', `
+            <div class="algo-stat" id="stat-${slug(lang)}-${slug(algo)}">
+                <div class="algo-row">
+                    <span class="algo-name">${algo}</span>
+                    <span class="algo-runs">0</span>
+                </div>
+                <div class="algo-percentiles">p50 – · p90 – · p99 – · p99.9 –</div>
+                <div class="algo-throughput">– elem/s</div>
+            </div>
+        `);
+    }
+    return stats[lang][algo];
+}
+
+
 /**
  * Initializes the statistics data structure and UI grid.
+ * Languages and algorithms not listed here get a card as soon as results arrive.
  */
-function initializeState() {
+function initializeState(quiet = false) {
     // Clear existing data and UI
     stats = {};
+    history = {};
     statsGrid.innerHTML = '';
 
     LANGUAGES.forEach(lang => {
-        stats[lang] = {};
+        ALGORITHMS.forEach(algo => ensureStat(lang, algo));
+    });
+    if (!quiet) logMessage("Dashboard reset and initialized.", "info");
+}
 
-        const card = document.createElement('div');
-        card.className = 'lang-card';
-        card.id = `card-${lang.toLowerCase()}`;
 
-        let algoHtml = '';
-        ALGORITHMS.forEach(algo => {
-            // Initialize stats object for each algorithm
-            stats[lang][algo] = { runs: 0, total_duration: 0 };
+/**
+ * Replaces the whole state with the orchestrator's snapshot, sent once per connection before the live deltas.
+ * Reconnecting dashboards therefore pick up where the run is instead of starting from zero.
+ * @param {object} snapshot - { results: [cumulative entries], history: { resolution, series }, tests: [...] }.
+ */
+function applySnapshot(snapshot) {
+    initializeState(true);
+    snapshot.results.forEach(applyDelta);
+    storeHistory(snapshot.history.series);
+    snapshot.tests.forEach(test => applyTestPhase({ ...test, series: [test.lang] }, false));
+    const runs = snapshot.results.reduce((total, entry) => total + entry.count, 0);
+    logMessage(`Restored ${snapshot.results.length} series (${runs} runs) and ` +
+               `${snapshot.history.series.length} histories at ${snapshot.history.resolution}s resolution.`, 'info');
+}
+
 
-            // Create the HTML structure for each algorithm's stats display
-            algoHtml += `
-                <div class="algo-stat" id="stat-${lang.toLowerCase()}-${algo}">
-                    <span class="algo-name">${algo}</span>
-                    <span class="algo-runs">0</span>
-                </div>
-            `;
-        });
+/**
+ * Keeps rolled-up history points per series (snapshot or history reply).
+ * @param {Array} series - [{ lang, algo, points: [[t, count, sum, min, max], ...] }].
+ */
+function storeHistory(series) {
+    series.forEach(({ lang, algo, points }) => { history[`${lang}/${algo}`] = points; });
+}
 
-        card.innerHTML = `<h2>${lang}</h2><div class="algo-list">${algoHtml}</div>`;
-        statsGrid.appendChild(card);
+
+/**
+ * Asks the orchestrator for a window of rolled-up history, e.g. requestHistory(3600, 'auto', 'Rust').
+ * @param {number} seconds - Window length, ending now.
+ * @param {number|string} resolution - 1, 10, 60 (seconds per point) or 'auto'.
+ * @param {string} [lang] - Only this series.
+ * @param {string} [algo] - Only this algorithm.
+ */
+function requestHistory(seconds, resolution = 'auto', lang = undefined, algo = undefined) {
+    if (!socket || socket.readyState !== WebSocket.OPEN) return;
+    socket.send(JSON.stringify({ type: 'history', id: ++historyRequestId, seconds, resolution, lang, algo }));
+}
+
+
+/**
+ * Folds one aggregated (lang, algo) delta into the in-memory state and UI.
+ * @param {object} delta - { lang, algo, count, sum, min, max, elements, p50, p90, p99, p999 } for one tick.
+ */
+function applyDelta(delta) {
+    const { lang, algo, count, sum, min, max } = delta;
+    const entry = ensureStat(lang, algo);
+    entry.runs += count;
+    entry.total_duration += sum;
+    entry.min_duration = Math.min(entry.min_duration, min);
+    entry.max_duration = Math.max(entry.max_duration, max);
+    // Problem instances one run processes (e.g. a whole NumPy batch); 1 for scalar workers
+    entry.elements = delta.elements || 1;
+
+    // Percentiles are cumulative values computed by the orchestrator's histograms;
+    // once a stream is steady, only its steady-state data is shown.
+    if (delta.steady) {
+        entry.percentiles = delta.steady;
+        entry.steady = true;
+    } else if (delta.p50 !== undefined) {
+        entry.percentiles = { p50: delta.p50, p90: delta.p90, p99: delta.p99, p999: delta.p999 };
+        entry.steady = false;
+    }
+    if (delta.phase) {
+        entry.phase = delta.phase;
+    }
+    if (delta.telemetry) {
+        entry.telemetry = delta.telemetry;
+    }
+
+    // Update the UI
+    const statElement = document.getElementById(`stat-${slug(lang)}-${slug(algo)}`);
+    if (statElement) {
+        statElement.querySelector('.algo-runs').textContent = entry.runs;
+        if (entry.total_duration > 0) {
+            const elementsDone = entry.runs * entry.elements;
+            statElement.querySelector('.algo-throughput').textContent =
+                `${formatRate(elementsDone / entry.total_duration)} elem/s · ` +
+                `${formatDuration(entry.total_duration / elementsDone)}/elem`;
+        }
+        if (entry.percentiles) {
+            const p = entry.percentiles;
+            const percentileElement = statElement.querySelector('.algo-percentiles');
+            percentileElement.textContent = (entry.steady ? 'steady · ' : '') +
+                `p50 ${formatDuration(p.p50)} · p90 ${formatDuration(p.p90)} · ` +
+                `p99 ${formatDuration(p.p99)} · p99.9 ${formatDuration(p.p999)}`;
+            percentileElement.title =
+                `min ${formatDuration(entry.min_duration)} · max ${formatDuration(entry.max_duration)}` +
+                (entry.steady ? ` · ${p.count} steady-state runs` : '') +
+                formatTailAttribution(entry.telemetry);
+        }
+        statElement.classList.toggle('transient', entry.phase === 'transient');
+    }
+}
+
+
+/**
+ * Tooltip suffix naming the share of the p99 tail that coincided with GC or scheduler events.
+ * @param {object|undefined} telemetry - The orchestrator's telemetry summary of one key (--telemetry workers).
+ */
+function formatTailAttribution(telemetry) {
+    if (!telemetry || telemetry.p99_gc_share === undefined) return '';
+    const percent = share => `${Math.round(share * 100)}%`;
+    return `\ntail ≥ p99: ${percent(telemetry.p99_gc_share)} during GC · ` +
+        `${percent(telemetry.p99_scheduler_share)} preempted/page faults · ` +
+        `${telemetry.gc_collections} collections`;
+}
+
+
+/**
+ * Marks the rows of a scheduled test with its current phase (warmup, measure, done, skipped).
+ * @param {object} event - { test_id, lang, algo, series, phase }.
+ */
+function applyTestPhase(event, log = true) {
+    if (log) {
+        logMessage(`[TEST ${event.test_id}] ${event.lang} / ${event.algo}: ${event.phase}`,
+                   event.phase === 'skipped' ? 'warn' : 'info');
+    }
+    event.series.forEach(lang => {
+        ensureStat(lang, event.algo);
+        const statElement = document.getElementById(`stat-${slug(lang)}-${slug(event.algo)}`);
+        statElement.classList.remove('phase-warmup', 'phase-measure', 'phase-done');
+        statElement.classList.add(`phase-${event.phase}`);
     });
-    logMessage("Dashboard reset and initialized.", "info");
+}
+
+
+/**
+ * Logs a steady-state start or changepoint detected by the orchestrator.
+ * @param {object} event - { lang, algo, phase, mean, changepoint?, previous_mean? }.
+ */
+function applySteadyState(event) {
+    if (event.changepoint) {
+        logMessage(`[PHASE] ${event.lang} / ${event.algo}: changepoint, mean ` +
+                   `${formatDuration(event.previous_mean)} → ${formatDuration(event.mean)}`, 'warn');
+    } else {
+        logMessage(`[PHASE] ${event.lang} / ${event.algo}: steady at ${formatDuration(event.mean)}`, 'info');
+    }
+}
+
+
+/**
+ * Logs an updated sampling profile (the collapsed stacks are in the file it names).
+ * @param {object} profile - { lang, algo, samples, seconds, file, top: [[frame, share], ...] }.
+ */
+function logProfile(profile) {
+    const hottest = profile.top.slice(0, 3)
+        .map(([frame, share]) => `${frame} ${Math.round(share * 100)}%`).join(', ');
+    logMessage(`[PROFILE] ${profile.lang} / ${profile.algo}: ${profile.samples} samples (${hottest}) → ${profile.file}`,
+               'info');
 }
 
 
@@ -81,21 +302,20 @@ function handleWebSocketMessage(event) {
         // Check the message type to distinguish between stats and status updates
         if (data.type === 'status') {
             logMessage(`[STATUS] ${data.message}`, data.level);
-        } else {
-            // This is a benchmark result, so update our stats
-            const { lang, algo, duration } = data;
-
-            // Update the in-memory state
-            if (stats[lang] && stats[lang][algo]) {
-                stats[lang][algo].runs++;
-                stats[lang][algo].total_duration += duration;
-
-                // Update the UI
-                const runElement = document.querySelector(`#stat-${lang.toLowerCase()}-${algo} .algo-runs`);
-                if (runElement) {
-                    runElement.textContent = stats[lang][algo].runs;
-                }
-            }
+        } else if (data.type === 'snapshot') {
+            applySnapshot(data);
+        } else if (data.type === 'results') {
+            // One coalesced frame per orchestrator tick: fold each delta into our stats
+            data.results.forEach(applyDelta);
+        } else if (data.type === 'history') {
+            storeHistory(data.series);
+            logMessage(`[HISTORY] ${data.series.length} series, ${data.resolution}s resolution`, 'info');
+        } else if (data.type === 'test_phase') {
+            applyTestPhase(data);
+        } else if (data.type === 'steady_state') {
+            applySteadyState(data);
+        } else if (data.type === 'profile') {
+            logProfile(data);
         }
 
     } catch (error) {
@@ -105,17 +325,55 @@ function handleWebSocketMessage(event) {
 }
 
 
+/**
+ * Subscription from the page URL, e.g. dashboard.html?langs=Rust,Java&metrics=counts,percentiles&rate=2
+ * (series, algorithms, metrics, updates per second). Null when the URL asks for everything.
+ */
+function subscriptionFromUrl() {
+    const params = new URLSearchParams(window.location.search);
+    const list = name => params.has(name) ? params.get(name).split(',').filter(Boolean) : null;
+    const request = { type: 'subscribe', langs: list('langs'), algos: list('algos'), metrics: list('metrics'),
+                      max_rate: params.has('rate') ? Number(params.get('rate')) : null };
+    const wantsEverything = ['langs', 'algos', 'metrics', 'max_rate'].every(field => request[field] === null);
+    return wantsEverything ? null : request;
+}
+
+
+/**
+ * Orchestrator WebSocket URL: ?ws=ws://host:port as-is, otherwise ?host= / ?port=
+ * (matching --dashboard-bind / --dashboard-port). Without them a dashboard served over
+ * HTTP(S) connects back to its own host; a local file to 127.0.0.1:9001.
+ */
+function websocketUrl() {
+    const params = new URLSearchParams(window.location.search);
+    if (params.get('ws')) {
+        return params.get('ws');
+    }
+    const served = window.location.protocol === 'http:' || window.location.protocol === 'https:';
+    const host = params.get('host') || (served && window.location.hostname) || DEFAULT_WEBSOCKET_HOST;
+    const port = params.get('port') || DEFAULT_WEBSOCKET_PORT;
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    return `${scheme}://${host}:${port}`;
+}
+
+
 /**
  * Main function to set up WebSocket connection and event listeners.
  */
 function connect() {
-    logMessage("Attempting to connect to orchestrator...");
-    const socket = new WebSocket(WEBSOCKET_URL);
+    const url = websocketUrl();
+    logMessage(`Attempting to connect to orchestrator at ${url}...`);
+    socket = new WebSocket(url);
 
     socket.onopen = () => {
         statusElement.textContent = '● Connected';
         statusElement.className = 'connected';
         logMessage('Successfully connected to WebSocket server.', 'info');
+        const subscription = subscriptionFromUrl();
+        if (subscription) {
+            socket.send(JSON.stringify(subscription));
+            logMessage(`Subscribed: ${JSON.stringify(subscription)}`, 'info');
+        }
     };
 
     socket.onmessage = handleWebSocketMessage;
@@ -135,7 +393,7 @@ function connect() {
 }
 
 // --- Event Listeners ---
-resetButton.addEventListener('click', initializeState);
+resetButton.addEventListener('click', () => initializeState());
 
 // --- Initial Setup ---
 document.addEventListener('DOMContentLoaded', () => {
@@ -0,0 +1,132 @@
+# =========================
+#   P-RAF: CPU Affinity & Isolation
+# =========================
+#
+# Splits the cores this process may use into
+#
+#   housekeeping  the orchestrator itself and every worker's sender thread
+#   workers       one dedicated block of cores per worker (language)
+#
+# Worker processes are pinned to their block right after they are spawned
+# (from the parent: a preexec_fn is not safe in the threaded orchestrator,
+# since only async-signal-safe calls may run between fork and exec). The block and
+# the housekeeping cores are also passed in PRAF_WORKER_CORES /
+# PRAF_HOUSEKEEPING_CORES, so runtimes that support it (the Python worker)
+# can pin each algorithm thread or process to a single core of its block.
+# Affinity needs Linux (os.sched_setaffinity); elsewhere everything here is a no-op.
+
+import os
+
+WORKER_CORES_ENV = "PRAF_WORKER_CORES"
+HOUSEKEEPING_CORES_ENV = "PRAF_HOUSEKEEPING_CORES"
+DEFAULT_HOUSEKEEPING_CORES = 1
+
+
+def affinity_supported():
+    return hasattr(os, "sched_setaffinity")
+
+
+def available_cores():
+    """The cores this process may run on, in ascending order."""
+    if affinity_supported():
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def format_cores(cores):
+    """Comma-separated list, as used in the environment variables."""
+    return ",".join(str(core) for core in cores)
+
+
+class CoreMap:
+    """Core assignment of one orchestrator run (recorded with the results)."""
+
+    def __init__(self, available, housekeeping, workers, nice=None, shared=False):
+        self.available = available  # Cores the orchestrator could use when the map was planned
+        self.housekeeping = housekeeping
+        self.workers = workers      # Worker name -> [core, ...]
+        self.nice = nice
+        self.shared = shared        # True if there were too few cores for dedicated blocks
+
+    @classmethod
+    def plan(cls, names, cores=None, housekeeping=DEFAULT_HOUSEKEEPING_CORES, nice=None):
+        """
+        Deterministically assigns cores: the first `housekeeping` cores to the
+        orchestrator, then equal contiguous blocks to the workers in `names` order.
+        With too few cores, workers share single cores round-robin.
+
+        `names` are the workers that will actually be launched; no cores are kept for others.
+        """
+        cores = list(cores if cores is not None else available_cores())
+        housekeeping = max(1, housekeeping)
+        if not names:
+            return cls(cores, cores[:housekeeping], {}, nice)
+        if len(cores) <= housekeeping:
+            return cls(cores, cores, {name: list(cores) for name in names}, nice, shared=True)
+        reserved, measurement = cores[:housekeeping], cores[housekeeping:]
+        block = len(measurement) // len(names) if names else 0
+        if block == 0:
+            workers = {name: [measurement[i % len(measurement)]] for i, name in enumerate(names)}
+            return cls(cores, reserved, workers, nice, shared=True)
+        workers = {name: measurement[i * block:(i + 1) * block] for i, name in enumerate(names)}
+        return cls(cores, reserved, workers, nice)
+
+    def environment(self, name):
+        """Environment variables that tell a worker its cores."""
+        return {
+            WORKER_CORES_ENV: format_cores(self.workers[name]),
+            HOUSEKEEPING_CORES_ENV: format_cores(self.housekeeping),
+        }
+
+    def place(self, name, pid):
+        """Pins the freshly spawned worker `name` to its block (and renices it)."""
+        place_process(pid, self.workers[name], self.nice)
+
+    def to_dict(self):
+        return {
+            "available": self.available,
+            "housekeeping": self.housekeeping,
+            "workers": self.workers,
+            "nice": self.nice,
+            "shared": self.shared,
+        }
+
+
+def process_threads(pid):
+    """Thread ids of process `pid` (Linux /proc); just `pid` where they cannot be listed."""
+    try:
+        return [int(tid) for tid in os.listdir(f"/proc/{pid}/task")]
+    except OSError:
+        return [pid]
+
+
+def place_process(pid, cores=None, nice=None):
+    """
+    Pins process `pid` to `cores` and lowers its priority by `nice` (0/None: unchanged).
+
+    Called by the parent right after Popen. Affinity and nice level are per
+    thread on Linux, so every thread the process started so far is moved;
+    threads it creates later inherit the placement.
+    """
+    for tid in process_threads(pid):
+        if cores and affinity_supported():
+            try:
+                os.sched_setaffinity(tid, cores)
+            except OSError:
+                pass  # The thread (or process) exited meanwhile
+        if nice and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, 0) + nice)
+            except OSError:
+                pass  # Negative values need privileges; keep the default priority
+
+
+def pin_current_process(cores):
+    """Restricts the calling thread (and threads it creates later) to `cores`."""
+    if not affinity_supported() or not cores:
+        return False
+    try:
+        os.sched_setaffinity(0, cores)
+        return True
+    except OSError:
+        return False
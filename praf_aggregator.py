@@ -0,0 +1,142 @@
+# =========================
+#   P-RAF: Result Aggregator
+#   (Ingest -> Broadcast coalescing stage)
+# =========================
+
+import operator
+
+from praf_histogram import LogHistogram
+
+
+class ResultAggregator:
+    """
+    Folds incoming worker results into per-(lang, algo) deltas.
+
+    A sample is a per-iteration duration measured over a batch of `iterations`
+    runs, so counts and sums are weighted by the batch size.
+
+    Ingest calls `add()` for every result; the broadcast loop calls `drain()`
+    once per tick and publishes a single compact frame. Ingest never waits on
+    the dashboards this way, no matter how many are connected or how slow they are.
+
+    Alongside the per-tick deltas, every (lang, algo) key keeps a cumulative
+    LogHistogram (nanoseconds) for percentile queries, and a second one in
+    `samples` that counts every timed sample once, whatever its batch size.
+    Statistical tests need the latter: the iterations of one batch are not
+    independent observations. Runs that only arrive as histograms (overwritten
+    ring samples) are missing from `samples`.
+
+    Workers that process several problem instances per run (e.g. the vectorized
+    Python-NumPy profile) announce that number; it is kept in `elements` so
+    dashboards can compare per-element throughput.
+    """
+
+    def __init__(self):
+        self._deltas = {}
+        self.histograms = {}
+        self.samples = {}
+        self.elements = {}
+
+    def _histogram(self, key):
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = LogHistogram()
+            self.samples[key] = LogHistogram()
+        return hist
+
+    def add(self, lang, algo, duration, iterations=1):
+        """Folds one sample: the per-iteration duration (seconds) over `iterations` runs."""
+        key = (lang, algo)
+        value = round(duration * 1e9)
+        self._histogram(key).record(value, iterations)
+        self.samples[key].record(value)
+        total = duration * iterations
+        delta = self._deltas.get(key)
+        if delta is None:
+            # [count, sum, min, max]
+            self._deltas[key] = [iterations, total, duration, duration]
+            return
+        delta[0] += iterations
+        delta[1] += total
+        if duration < delta[2]:
+            delta[2] = duration
+        elif duration > delta[3]:
+            delta[3] = duration
+
+    def add_ns(self, lang, algo, durations_ns, iterations=None):
+        """Folds a group of nanosecond samples (e.g. a decoded binary frame).
+
+        `iterations` holds the batch size of each sample; None means one run each.
+        """
+        if not durations_ns:
+            return
+        key = (lang, algo)
+        self._histogram(key).record_many(durations_ns, iterations, self.samples[key])
+        if iterations is None:
+            count = len(durations_ns)
+            total = sum(durations_ns) * 1e-9
+        else:
+            count = sum(iterations)
+            total = sum(map(operator.mul, durations_ns, iterations)) * 1e-9
+        low = min(durations_ns) * 1e-9
+        high = max(durations_ns) * 1e-9
+        delta = self._deltas.get(key)
+        if delta is None:
+            self._deltas[key] = [count, total, low, high]
+            return
+        delta[0] += count
+        delta[1] += total
+        if low < delta[2]:
+            delta[2] = low
+        if high > delta[3]:
+            delta[3] = high
+
+    def add_histogram(self, lang, algo, hist):
+        """Folds runs that arrived as a histogram (nanoseconds) instead of as samples."""
+        if not hist.count:
+            return
+        key = (lang, algo)
+        self._histogram(key).merge(hist)
+        low, high = hist.min * 1e-9, hist.max * 1e-9
+        delta = self._deltas.get(key)
+        if delta is None:
+            self._deltas[key] = [hist.count, hist.sum * 1e-9, low, high]
+            return
+        delta[0] += hist.count
+        delta[1] += hist.sum * 1e-9
+        if low < delta[2]:
+            delta[2] = low
+        if high > delta[3]:
+            delta[3] = high
+
+    def set_elements(self, lang, algo, elements):
+        """Records how many problem instances one run of (lang, algo) processes."""
+        self.elements[(lang, algo)] = elements
+
+    def drain(self):
+        """Returns the deltas collected since the last call and starts a new tick."""
+        deltas, self._deltas = self._deltas, {}
+        return deltas
+
+    def percentiles(self, lang, algo):
+        """Cumulative p50/p90/p99/p99.9 for one key, in seconds."""
+        hist = self.histograms.get((lang, algo))
+        return hist.percentiles(1e-9) if hist else None
+
+
+def build_results_frame(deltas, histograms, timestamp, interval, elements=None):
+    """Builds the dashboard frame for one tick's worth of deltas.
+
+    Keys that changed during the tick also carry their cumulative percentiles
+    and the number of elements one run processes.
+    """
+    elements = elements or {}
+    results = []
+    for key, (count, total, low, high) in deltas.items():
+        entry = {"lang": key[0], "algo": key[1], "count": count, "sum": total, "min": low, "max": high,
+                 "elements": elements.get(key, 1)}
+        hist = histograms.get(key)
+        if hist is not None:
+            entry.update(hist.percentiles(1e-9))
+        results.append(entry)
+    return {"type": "results", "timestamp": timestamp, "interval": interval, "results": results}
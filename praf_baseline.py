@@ -0,0 +1,392 @@
+# =========================
+#   P-RAF: Baselines & Regression Comparison
+# =========================
+#
+# A baseline is a named run summary per (lang, algo): two LogHistograms plus
+# elements per call, stored as baselines/<name>.json. "histogram" weights
+# every sample by its batch size (iterations), like the live statistics;
+# "samples" counts every timed sample once. Baselines are taken from the
+# orchestrator's live state (--save-baseline, steady-state data where a
+# stream reached it) or from a recorded result log session.
+#
+# Two result sets are compared key by key - run vs run (same series and
+# algorithm) or language vs language (same algorithm, per-element times).
+# All statistics use the per-sample histograms, so n is the number of timed
+# samples: the iterations of one batch share a single measurement and are
+# not independent observations.
+#
+#   ratio        candidate median / baseline median of the per-sample
+#                durations (> 1: slower)
+#   95% CI       bootstrap of the median ratio; every resample draws a whole
+#                histogram with one multinomial draw, so the cost depends on
+#                the number of buckets, not on the number of samples
+#   Mann-Whitney U on the binned values (ties within a bucket), normal
+#                approximation with tie correction; `effect` is the
+#                probability that a candidate sample is slower than a baseline one
+#
+# A key is a regression if the whole CI lies above 1, the ratio exceeds
+# 1 + threshold and U is significant at alpha; improvements mirror that.
+# Keys with fewer than MIN_SAMPLES timed samples on either side are
+# "insufficient". Needs NumPy.
+#
+#   python praf_baseline.py save NAME SESSION_DIR
+#   python praf_baseline.py list
+#   python praf_baseline.py compare BASELINE CANDIDATE
+#   python praf_baseline.py compare-langs SOURCE LANG_A LANG_B
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from praf_histogram import BUCKET_COUNT, SUB_BUCKET_BITS, SUB_BUCKET_COUNT, LogHistogram
+from praf_report import format_duration
+
+BASELINE_VERSION = 2  # 2: per-sample histograms next to the iteration-weighted ones
+BASELINE_ROOT = Path(__file__).parent.resolve() / "baselines"
+
+DEFAULT_THRESHOLD = 0.05     # Minimum relative change of the median that counts
+DEFAULT_ALPHA = 0.01         # Significance level of the Mann-Whitney test
+DEFAULT_RESAMPLES = 2000     # Bootstrap resamples per key
+DEFAULT_CONFIDENCE = 0.95
+MIN_SAMPLES = 20             # Keys with fewer timed samples on either side are "insufficient"
+
+REGRESSION = "regression"
+IMPROVEMENT = "improvement"
+UNCHANGED = "unchanged"
+INSUFFICIENT = "insufficient"
+VERDICT_ORDER = {REGRESSION: 0, IMPROVEMENT: 1, UNCHANGED: 2, INSUFFICIENT: 3}
+
+Entry = namedtuple("Entry", ["histogram", "elements", "samples"])  # histogram: weighted; samples: one per sample
+Comparison = namedtuple("Comparison", [
+    "baseline", "candidate", "algo", "baseline_runs", "candidate_runs", "baseline_samples", "candidate_samples",
+    "baseline_median_s", "candidate_median_s", "ratio", "ci_low", "ci_high",
+    "p_value", "effect", "verdict",
+])
+
+
+def import_numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("Baseline comparisons require NumPy (`pip install numpy`).") from None
+    return np
+
+
+# --- Baseline Store ---
+def entries_from_state(aggregator, steady_state=None):
+    """Entries of a live orchestrator run; steady-state data where a stream reached it."""
+    entries = {}
+    for key, hist in aggregator.histograms.items():
+        if not hist.count:
+            continue
+        samples = aggregator.samples[key]
+        steady = steady_state.steady_histogram(key, hist) if steady_state else None
+        if steady is not None and steady.count:
+            entries[key] = Entry(steady, aggregator.elements.get(key, 1),
+                                 steady_state.steady_histogram(key, samples, which=1))
+        else:
+            entries[key] = Entry(hist.copy(), aggregator.elements.get(key, 1), samples.copy())
+    return entries
+
+
+def histograms_from_records(np, durations_ns, iterations):
+    """(weighted, per-sample) LogHistograms of per-iteration durations (vectorized).
+
+    The first weights every sample by its batch size, the second counts it once.
+    """
+    values = np.maximum(np.asarray(durations_ns, dtype=np.int64), 0)
+    weights = np.maximum(np.asarray(iterations, dtype=np.int64), 1)
+    bits = np.frexp(values.astype(np.float64))[1]           # bit_length, may round up above 2**53
+    bits -= (bits > 0) & ((values >> np.maximum(bits - 1, 0)) == 0)
+    shift = np.maximum(bits - SUB_BUCKET_BITS - 1, 0)
+    indices = shift * SUB_BUCKET_COUNT + (values >> shift)
+    weighted, samples = LogHistogram(), LogHistogram()
+    weighted.counts = np.bincount(indices, weights=weights, minlength=BUCKET_COUNT).astype(np.int64).tolist()
+    weighted.count = int(weights.sum())
+    weighted.sum = int((values * weights).sum())
+    samples.counts = np.bincount(indices, minlength=BUCKET_COUNT).tolist()
+    samples.count = len(values)
+    samples.sum = int(values.sum())
+    weighted.min = samples.min = int(values.min())
+    weighted.max = samples.max = int(values.max())
+    return weighted, samples
+
+
+def entries_from_log(reader):
+    """Entries of a recorded result log session (all data; the log has no phase information)."""
+    np = import_numpy()
+    elements = reader.metadata.get("elements", {})
+    entries = {}
+    for lang, algo in reader.keys():
+        records = [r for _, _, r in reader.query(lang=lang, algo=algo)]
+        durations = np.concatenate([r["duration_ns"] for r in records])
+        iterations = np.concatenate([r["iterations"] for r in records])
+        if len(durations):
+            weighted, samples = histograms_from_records(np, durations, iterations)
+            entries[(lang, algo)] = Entry(weighted, elements.get(lang, {}).get(algo, 1), samples)
+    return entries
+
+
+def baseline_path(name):
+    """Baseline names live in BASELINE_ROOT; anything that looks like a path is used as-is."""
+    if name.endswith(".json") or "/" in name or "\\" in name:
+        return Path(name)
+    return BASELINE_ROOT / f"{name}.json"
+
+
+def save_baseline(name, entries, metadata=None):
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "version": BASELINE_VERSION,
+        "name": path.stem,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "metadata": metadata or {},
+        "results": {
+            f"{lang}/{algo}": {"elements": entry.elements, "histogram": entry.histogram.to_dict(),
+                               "samples": entry.samples.to_dict()}
+            for (lang, algo), entry in sorted(entries.items())
+        },
+    }), encoding="utf-8")
+    return path
+
+
+def load_baseline(name):
+    """Returns (entries, metadata) of a saved baseline."""
+    path = baseline_path(name)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read baseline {path}: {e}") from None
+    if data.get("version", 1) < 2:
+        raise ValueError(f"Baseline {path} has iteration-weighted counts only, which cannot be tested for "
+                         f"significance; save it again from its result log session.")
+    entries = {}
+    for key, result in data.get("results", {}).items():
+        lang, algo = key.rsplit("/", 1)
+        entries[(lang, algo)] = Entry(LogHistogram.from_dict(result["histogram"]), result.get("elements", 1),
+                                      LogHistogram.from_dict(result["samples"]))
+    return entries, data.get("metadata", {})
+
+
+def load_entries(source):
+    """Entries of a baseline name/file or of a result log session directory."""
+    if (Path(source) / "manifest.json").is_file():
+        from praf_resultlog import ResultLogReader
+        return entries_from_log(ResultLogReader(source))
+    return load_baseline(source)[0]
+
+
+def list_baselines():
+    return sorted(path.stem for path in BASELINE_ROOT.glob("*.json"))
+
+
+# --- Statistics ---
+def _support(np, entry):
+    """Non-empty buckets of an entry's per-sample histogram as (counts, lows, widths, midpoints),
+    in seconds per element.
+
+    lows/widths are clipped to the recorded min/max (for interpolated medians);
+    midpoints are not, so equal buckets of two runs compare as ties.
+    """
+    hist = entry.samples
+    counts = np.asarray(hist.counts, dtype=np.int64)
+    index = np.flatnonzero(counts)
+    shift = np.maximum(index // SUB_BUCKET_COUNT - 1, 0)
+    top = index - shift * SUB_BUCKET_COUNT
+    lowest, highest = top << shift, ((top + 1) << shift) - 1
+    lows = np.maximum(lowest, hist.min)
+    highs = np.minimum(highest, hist.max)
+    scale = 1e-9 / entry.elements
+    return counts[index], lows * scale, (highs - lows + 1) * scale, (lowest + highest) / 2 * scale
+
+
+def _medians(np, draws, lows, widths):
+    """Interpolated median of every row of bucket counts in `draws` (shape resamples x buckets)."""
+    cumulative = draws.cumsum(axis=1)
+    rank = cumulative[:, -1] / 2.0
+    bucket = (cumulative < rank[:, None]).sum(axis=1)
+    rows = np.arange(len(draws))
+    inside = draws[rows, bucket]
+    before = cumulative[rows, bucket] - inside
+    return lows[bucket] + (rank - before) / np.maximum(inside, 1) * widths[bucket]
+
+
+def bootstrap_median_ratio(np, baseline, candidate, resamples, confidence, rng):
+    """(baseline median, candidate median, ci_low, ci_high) of the ratio candidate / baseline."""
+    medians = []
+    for counts, lows, widths, _ in (baseline, candidate):
+        point = _medians(np, counts[None, :], lows, widths)[0]
+        draws = rng.multinomial(counts.sum(), counts / counts.sum(), size=resamples)
+        medians.append((point, _medians(np, draws, lows, widths)))
+    (base_point, base_draws), (cand_point, cand_draws) = medians
+    ratios = cand_draws / base_draws
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(ratios, [tail, 100 - tail])
+    return float(base_point), float(cand_point), float(low), float(high)
+
+
+def mann_whitney(np, baseline, candidate):
+    """(p_value, effect) of a two-sided Mann-Whitney U test on binned values.
+
+    Every bucket is represented by its midpoint, so values within one bucket
+    are ties. n1 and n2 are the numbers of timed samples (see _support).
+    `effect` = P(candidate > baseline) + P(tie) / 2.
+    """
+    (a_counts, _, _, a_values), (b_counts, _, _, b_values) = baseline, candidate
+    a_counts, b_counts = a_counts.astype(np.float64), b_counts.astype(np.float64)
+    n1, n2 = a_counts.sum(), b_counts.sum()
+    a_cumulative = np.concatenate(([0.0], a_counts.cumsum()))
+    below = a_cumulative[np.searchsorted(a_values, b_values, side="left")]
+    equal = a_cumulative[np.searchsorted(a_values, b_values, side="right")] - below
+    u = float((b_counts * (below + equal / 2)).sum())
+
+    values, inverse = np.unique(np.concatenate((a_values, b_values)), return_inverse=True)
+    ties = np.bincount(inverse, weights=np.concatenate((a_counts, b_counts)), minlength=len(values))
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0, 0.5
+    z = (u - n1 * n2 / 2) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2)), u / (n1 * n2)
+
+
+def compare_entry(np, baseline, candidate, labels, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA,
+                  resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE, rng=None):
+    """Compares two entries; `labels` is (baseline series, candidate series, algo)."""
+    runs = (baseline.histogram.count, candidate.histogram.count)
+    samples = (baseline.samples.count, candidate.samples.count)
+    if min(samples) < MIN_SAMPLES:
+        return Comparison(*labels, *runs, *samples, None, None, None, None, None, None, None, INSUFFICIENT)
+    rng = rng if rng is not None else np.random.default_rng(0)
+    base, cand = _support(np, baseline), _support(np, candidate)
+    base_median, cand_median, ci_low, ci_high = bootstrap_median_ratio(np, base, cand, resamples, confidence, rng)
+    ratio = cand_median / base_median
+    p_value, effect = mann_whitney(np, base, cand)
+    verdict = UNCHANGED
+    if p_value < alpha and ci_low > 1 and ratio > 1 + threshold:
+        verdict = REGRESSION
+    elif p_value < alpha and ci_high < 1 and ratio < 1 - threshold:
+        verdict = IMPROVEMENT
+    return Comparison(*labels, *runs, *samples, base_median, cand_median, ratio, ci_low, ci_high, p_value, effect,
+                      verdict)
+
+
+def rank(comparisons):
+    """Regressions (worst first), improvements (best first), then the rest."""
+    return sorted(comparisons, key=lambda c: (
+        VERDICT_ORDER[c.verdict], -abs(math.log(c.ratio)) if c.ratio else 0.0, c.candidate, c.algo,
+    ))
+
+
+def compare_runs(baseline, candidate, seed=0, **options):
+    """Run vs run: every (lang, algo) present in both entry sets."""
+    np = import_numpy()
+    rng = np.random.default_rng(seed)
+    return rank(
+        compare_entry(np, baseline[key], candidate[key], (key[0], key[0], key[1]), rng=rng, **options)
+        for key in sorted(baseline.keys() & candidate.keys())
+    )
+
+
+def compare_languages(entries, baseline_lang, candidate_lang, seed=0, **options):
+    """Language vs language: per-element times of every algorithm both series ran."""
+    np = import_numpy()
+    rng = np.random.default_rng(seed)
+    algorithms = sorted({a for l, a in entries if l == baseline_lang} & {a for l, a in entries if l == candidate_lang})
+    return rank(
+        compare_entry(np, entries[(baseline_lang, algo)], entries[(candidate_lang, algo)],
+                      (baseline_lang, candidate_lang, algo), rng=rng, **options)
+        for algo in algorithms
+    )
+
+
+def has_regressions(comparisons):
+    return any(c.verdict == REGRESSION for c in comparisons)
+
+
+# --- Output ---
+def print_comparisons(comparisons, title):
+    print(f"\n--- {title} ---")
+    print(f"{'Verdict':<14} {'Baseline':<22} {'Candidate':<22} {'Algorithm':<22} {'Median':>10} {'Median':>10} "
+          f"{'Ratio':>7} {'95% CI':>15} {'p-value':>9} {'P(slower)':>9} {'Samples (n)':>17}")
+    for c in comparisons:
+        n = f"{c.baseline_samples} / {c.candidate_samples}"
+        if c.ratio is None:
+            print(f"{c.verdict:<14} {c.baseline:<22} {c.candidate:<22} {c.algo:<22} "
+                  f"(timed samples: {n}, need {MIN_SAMPLES})")
+            continue
+        marker = {REGRESSION: "🔴", IMPROVEMENT: "🟢"}.get(c.verdict, "  ")
+        print(f"{c.verdict:<11} {marker} {c.baseline:<22} {c.candidate:<22} {c.algo:<22} "
+              f"{format_duration(c.baseline_median_s):>10} {format_duration(c.candidate_median_s):>10} "
+              f"{c.ratio:>7.3f} {f'{c.ci_low:.3f}-{c.ci_high:.3f}':>15} {c.p_value:>9.2g} {c.effect:>9.2f} {n:>17}")
+
+
+def comparisons_to_dicts(comparisons):
+    return [c._asdict() for c in comparisons]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="P-RAF baselines and regression comparison")
+    commands = parser.add_subparsers(dest="command", required=True)
+    save = commands.add_parser("save", help="save a recorded session (or another baseline) as a named baseline")
+    save.add_argument("name")
+    save.add_argument("source", help="result log session directory or baseline")
+    commands.add_parser("list", help="list saved baselines")
+    compare = commands.add_parser("compare", help="compare a run against a baseline")
+    compare.add_argument("baseline", help="baseline name/file or result log session directory")
+    compare.add_argument("candidate", help="baseline name/file or result log session directory")
+    langs = commands.add_parser("compare-langs", help="compare two languages of one run per element")
+    langs.add_argument("source", help="baseline name/file or result log session directory")
+    langs.add_argument("baseline_lang")
+    langs.add_argument("candidate_lang")
+    for sub in (compare, langs):
+        sub.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="minimum relative change of the median (default: 0.05)")
+        sub.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                         help="significance level of the Mann-Whitney test (default: 0.01)")
+        sub.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES,
+                         help="bootstrap resamples per key (default: 2000)")
+        sub.add_argument("--seed", type=int, default=0, help="bootstrap seed (default: 0)")
+        sub.add_argument("--json", metavar="PATH", help="also write the comparison as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "list":
+        for name in list_baselines():
+            print(name)
+        return 0
+    try:
+        if args.command == "save":
+            path = save_baseline(args.name, load_entries(args.source), {"source": str(args.source)})
+            print(f"💾 Baseline written to {path}")
+            return 0
+        options = dict(threshold=args.threshold, alpha=args.alpha, resamples=args.resamples, seed=args.seed)
+        if args.command == "compare":
+            comparisons = compare_runs(load_entries(args.baseline), load_entries(args.candidate), **options)
+            title = f"Comparison: {args.candidate} vs baseline {args.baseline}"
+        else:
+            comparisons = compare_languages(load_entries(args.source), args.baseline_lang, args.candidate_lang,
+                                            **options)
+            title = f"Comparison per element: {args.candidate_lang} vs {args.baseline_lang} ({args.source})"
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+    if not comparisons:
+        print("⚠️  No common (language, algorithm) keys to compare.")
+        return 1
+    print_comparisons(comparisons, title)
+    if args.json:
+        Path(args.json).write_text(json.dumps(comparisons_to_dicts(comparisons), indent=2), encoding="utf-8")
+        print(f"📄 Comparison written to {args.json}")
+    return 3 if has_regressions(comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
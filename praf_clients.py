@@ -0,0 +1,291 @@
+# =========================
+#   P-RAF: Dashboard Clients (subscriptions, conflation, slow consumers)
+# =========================
+#
+# The broadcast loop never writes to a WebSocket itself. Every dashboard gets
+# a DashboardClient with its own sender task, and the loop only offers each
+# tick to each client, which takes no time. A slow client therefore only
+# delays itself:
+#
+#   results   conflated per key: while a client is behind (or waits out its
+#             update interval), new deltas are merged into the one pending
+#             entry of their key - counts and sums add up, min/max widen,
+#             percentiles and phases keep the latest value. Memory is bounded
+#             by the number of keys, and nothing is lost from the totals.
+#   events    status, phase, profile and history messages; a bounded queue
+#             that drops its oldest entries when full.
+#
+# A client that keeps falling behind (results waiting longer than its
+# interval + LAG_LIMIT, or dropped events) collects strikes. SLOW_STRIKES in a
+# row halve its update rate, down to one frame per MAX_CLIENT_INTERVAL; after
+# that it is disconnected, as is any client whose single send stalls for
+# SEND_TIMEOUT. Clients that keep up again speed back up to their subscription.
+#
+# Clients subscribe with
+#
+#   {"type": "subscribe", "langs": ["Rust"], "algos": null, "metrics": ["counts", "percentiles"], "max_rate": 2}
+#
+# (null or missing: everything; max_rate in frames per second) and receive a
+# fresh snapshot for the new subscription.
+
+import asyncio
+import json
+from collections import deque
+
+CLIENT_METRICS = ("counts", "percentiles", "steady", "telemetry")
+METRIC_FIELDS = {
+    "percentiles": ("p50", "p90", "p99", "p999"),
+    "steady": ("steady", "phase"),
+    "telemetry": ("telemetry",),
+}
+EVENT_QUEUE_LIMIT = 256     # Queued events per client before the oldest are dropped
+SEND_TIMEOUT = 5.0          # Seconds one send may stall before the client is disconnected
+LAG_LIMIT = 0.5             # Seconds results may wait beyond the client's interval before it gets a strike
+SLOW_STRIKES = 3            # Strikes in a row that downgrade (or drop) a client
+MAX_CLIENT_INTERVAL = 5.0   # Slowest update interval a client is downgraded to before it is dropped
+RECOVERY_SENDS = 50         # Timely sends in a row before a downgraded client speeds up again
+SLOW_CLOSE_CODE = 1013      # "Try again later"
+
+
+class Subscription:
+    """Which series, algorithms and metrics a client wants, and how often."""
+
+    def __init__(self, langs=None, algos=None, metrics=None, interval=0.0):
+        self.langs = set(langs) if langs is not None else None
+        self.algos = set(algos) if algos is not None else None
+        self.metrics = set(metrics) if metrics is not None else set(CLIENT_METRICS)
+        self.interval = interval
+        self.dropped_fields = tuple(
+            field for metric, fields in METRIC_FIELDS.items() if metric not in self.metrics for field in fields
+        )
+
+    @classmethod
+    def from_request(cls, request, min_interval):
+        """Parses a `subscribe` request; raises ValueError for unknown metrics or rates."""
+        for field in ("langs", "algos", "metrics"):
+            if request.get(field) is not None and not isinstance(request[field], list):
+                raise ValueError(f"{field} must be a list (or null for all)")
+        metrics = request.get("metrics")
+        if metrics is not None:
+            unknown = set(metrics) - set(CLIENT_METRICS)
+            if unknown:
+                raise ValueError(f"unknown metrics {sorted(unknown)} (have {list(CLIENT_METRICS)})")
+        interval = min_interval
+        if request.get("max_rate") is not None:
+            rate = float(request["max_rate"])
+            if rate <= 0:
+                raise ValueError("max_rate must be positive")
+            interval = max(min_interval, 1.0 / rate)
+        return cls(request.get("langs"), request.get("algos"), metrics, interval)
+
+    @property
+    def everything(self):
+        return self.langs is None and self.algos is None and not self.dropped_fields
+
+    def wants(self, lang, algo=None):
+        return ((self.langs is None or lang in self.langs)
+                and (algo is None or self.algos is None or algo in self.algos))
+
+    def filter_entry(self, entry):
+        """The entry with unsubscribed metrics removed, or None for an unsubscribed key."""
+        if not self.wants(entry["lang"], entry["algo"]):
+            return None
+        if not self.dropped_fields:
+            return entry
+        return {field: value for field, value in entry.items() if field not in self.dropped_fields}
+
+    def to_dict(self):
+        return {
+            "langs": sorted(self.langs) if self.langs is not None else None,
+            "algos": sorted(self.algos) if self.algos is not None else None,
+            "metrics": sorted(self.metrics),
+            "interval": self.interval,
+        }
+
+
+def merge_entry(pending, entry):
+    """Folds a newer `results` entry of the same key into a pending one."""
+    pending["count"] += entry["count"]
+    pending["sum"] += entry["sum"]
+    if entry["min"] < pending["min"]:
+        pending["min"] = entry["min"]
+    if entry["max"] > pending["max"]:
+        pending["max"] = entry["max"]
+    for field, value in entry.items():
+        if field not in ("count", "sum", "min", "max"):
+            pending[field] = value
+
+
+class DashboardClient:
+    """One dashboard connection: subscription, conflating outbound queue and sender task."""
+
+    def __init__(self, websocket, interval):
+        self.websocket = websocket
+        self.subscription = Subscription(interval=interval)
+        self.interval = interval       # Current update interval (>= the subscription's when downgraded)
+        self.events = deque()          # Encoded messages, sent in order before the results
+        self.dropped_events = 0
+        self.pending = {}              # (lang, algo) -> conflated results entry
+        self.pending_ticks = 0
+        self.pending_since = None      # Loop time the oldest pending result was offered
+        self.shared_frame = None       # The tick's encoded frame, while it can be sent as-is
+        self.last_timestamp = None
+        self.tick_interval = interval
+        self.strikes = 0
+        self.timely_sends = 0
+        self.next_send = 0.0
+        self._seen_drops = 0
+        self._wake = asyncio.Event()
+        self._task = None
+
+    @property
+    def name(self):
+        return str(self.websocket.remote_address)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    def subscribe(self, subscription):
+        """Switches to a new subscription; the caller sends a fresh snapshot."""
+        self.subscription = subscription
+        self.interval = subscription.interval
+        self.strikes = self.timely_sends = 0
+
+    # --- Offers (called on the event loop, never block) ---
+    def offer_event(self, message_str, lang=None):
+        """Queues an encoded message (dropped if the client is not subscribed to `lang`)."""
+        if lang is not None and not self.subscription.wants(lang):
+            return
+        if len(self.events) >= EVENT_QUEUE_LIMIT:
+            self.events.popleft()
+            self.dropped_events += 1
+        self.events.append(message_str)
+        self._wake.set()
+
+    def offer_snapshot(self, snapshot_str):
+        """Queues a snapshot; it already covers every result pending so far."""
+        self.pending.clear()
+        self.pending_ticks = 0
+        self.pending_since = self.shared_frame = None
+        self.offer_event(snapshot_str)
+
+    def offer_results(self, frame, frame_str):
+        """Conflates one tick's `results` frame into the pending entries."""
+        subscription = self.subscription
+        if subscription.everything:
+            entries = frame["results"]
+        else:
+            entries = [e for e in map(subscription.filter_entry, frame["results"]) if e is not None]
+            if not entries:
+                return
+        self.shared_frame = frame_str if not self.pending_ticks and subscription.everything else None
+        pending = self.pending
+        for entry in entries:
+            key = (entry["lang"], entry["algo"])
+            if key in pending:
+                merge_entry(pending[key], entry)
+            else:
+                pending[key] = dict(entry)
+        self.pending_ticks += 1
+        self.last_timestamp = frame["timestamp"]
+        self.tick_interval = frame["interval"]
+        if self.pending_since is None:
+            self.pending_since = asyncio.get_running_loop().time()
+        self._wake.set()
+
+    def snapshot_message(self, snapshot):
+        """Encodes a snapshot (see praf_rollup.py) restricted to this client's subscription."""
+        subscription = self.subscription
+        if not subscription.everything:
+            snapshot = {
+                **snapshot,
+                "results": [e for e in map(subscription.filter_entry, snapshot["results"]) if e is not None],
+                "history": {**snapshot["history"], "series": [
+                    s for s in snapshot["history"]["series"] if subscription.wants(s["lang"], s["algo"])
+                ]},
+                "tests": [t for t in snapshot["tests"] if subscription.wants(t["lang"], t["algo"])],
+            }
+        return json.dumps({**snapshot, "subscription": subscription.to_dict()}, separators=(",", ":"))
+
+    # --- Sender task ---
+    def _take(self):
+        messages = list(self.events)
+        self.events.clear()
+        if self.pending:
+            if self.shared_frame is not None and self.pending_ticks == 1:
+                messages.append(self.shared_frame)
+            else:
+                messages.append(json.dumps({
+                    "type": "results", "timestamp": self.last_timestamp,
+                    "interval": self.tick_interval * self.pending_ticks, "conflated": self.pending_ticks,
+                    "results": list(self.pending.values()),
+                }, separators=(",", ":")))
+            self.pending = {}
+            self.pending_ticks = 0
+            self.pending_since = self.shared_frame = None
+        return messages
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                if not self.events:  # Events go out at once; results wait for the client's interval
+                    delay = self.next_send - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                had_results = bool(self.pending)
+                since = self.pending_since
+                for message in self._take():
+                    await asyncio.wait_for(self.websocket.send(message), SEND_TIMEOUT)
+                if had_results:
+                    now = loop.time()
+                    self.next_send = now + self.interval
+                    if not await self._check_health(now - since):
+                        return
+        except asyncio.TimeoutError:
+            await self._drop(f"a send stalled for {SEND_TIMEOUT:.0f}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # Connection closed; the WebSocket handler cleans up
+
+    async def _check_health(self, lag):
+        """Downgrades or drops a client that falls behind; returns False once it was dropped."""
+        dropped = self.dropped_events - self._seen_drops
+        self._seen_drops = self.dropped_events
+        if lag <= self.interval + LAG_LIMIT and not dropped:
+            self.strikes = 0
+            self.timely_sends += 1
+            if self.timely_sends >= RECOVERY_SENDS and self.interval > self.subscription.interval:
+                self.interval = max(self.subscription.interval, self.interval / 2)
+                self.timely_sends = 0
+                print(f"ℹ️  [WebSocket] Dashboard {self.name} keeps up again: updates every {self.interval:.2f}s.")
+            return True
+        self.timely_sends = 0
+        self.strikes += 1
+        if self.strikes < SLOW_STRIKES:
+            return True
+        self.strikes = 0
+        if self.interval >= MAX_CLIENT_INTERVAL:
+            await self._drop(f"still {lag:.1f}s behind at one update per {self.interval:.0f}s")
+            return False
+        self.interval = min(MAX_CLIENT_INTERVAL, max(2 * self.interval, 0.5))
+        print(f"⚠️  [WebSocket] Dashboard {self.name} falls behind ({lag:.1f}s): updates every {self.interval:.2f}s.")
+        self.offer_event(json.dumps({
+            "type": "status", "level": "warn",
+            "message": f"This dashboard falls behind; updates slowed to every {self.interval:.2f}s.",
+        }))
+        return True
+
+    async def _drop(self, reason):
+        print(f"⚠️  [WebSocket] Dropping slow dashboard {self.name}: {reason}.")
+        try:
+            await self.websocket.close(SLOW_CLOSE_CODE, "slow consumer")
+        except Exception:
+            pass
@@ -0,0 +1,95 @@
+# =========================
+#   P-RAF: Node Clocks (PING / pong offset estimation)
+# =========================
+#
+# Workers on other machines stamp their results with their own wall clock.
+# To put those timestamps on the orchestrator's timeline, the orchestrator
+# measures each connection's clock offset the way NTP does: it sends
+#
+#   {"command": "PING", "payload": {"seq": 7, "t0": <orchestrator send time>}}
+#
+# and the worker answers at once with
+#
+#   {"type": "pong", "payload": {"seq": 7, "t0": ..., "t1": <worker receive time>, "t2": <worker send time>}}
+#
+# With t3 the orchestrator's receive time:
+#
+#   offset = ((t1 - t0) + (t2 - t3)) / 2     worker clock minus orchestrator clock
+#   delay  = (t3 - t0) - (t2 - t1)           round trip spent on the network
+#
+# The offset is exact when both legs take equally long; its error is bounded
+# by delay / 2. Of the last CLOCK_WINDOW exchanges the one with the smallest
+# delay wins (queueing only ever adds delay), which also lets the estimate
+# follow slow drift.
+
+import math
+import time
+from collections import deque
+
+from praf_histogram import LogHistogram
+
+CLOCK_WINDOW = 16           # Exchanges the offset is chosen from
+CLOCK_BURST = 8             # Exchanges right after the handshake...
+CLOCK_BURST_INTERVAL = 0.05  # ...this many seconds apart
+CLOCK_SYNC_INTERVAL = 5.0   # Seconds between exchanges afterwards
+
+
+def ping_command(seq, t0=None):
+    return {"command": "PING", "payload": {"seq": seq, "t0": time.time() if t0 is None else t0}}
+
+
+def ntp_sample(t0, t1, t2, t3):
+    """(offset, delay) of one exchange; see the module comment."""
+    return ((t1 - t0) + (t2 - t3)) / 2, (t3 - t0) - (t2 - t1)
+
+
+class NodeClock:
+    """Clock offset of one worker connection, plus how late its results arrive."""
+
+    def __init__(self, node):
+        self.node = node
+        self.samples = deque(maxlen=CLOCK_WINDOW)  # (offset, delay)
+        self.exchanges = 0
+        self.offset = 0.0    # Seconds the worker clock is ahead; 0 until the first pong
+        self.delay = None    # Round trip of the exchange the offset comes from
+        self.lag = LogHistogram()  # Arrival minus corrected worker timestamp (ns), per RECORDS frame
+
+    @property
+    def synced(self):
+        return self.delay is not None
+
+    def add(self, t0, t1, t2, t3):
+        """Folds one PING/pong exchange in; returns the new offset."""
+        offset, delay = ntp_sample(t0, t1, t2, t3)
+        if delay < 0:
+            delay = 0.0  # Clock resolution; the exchange is still the best there is
+        self.samples.append((offset, delay))
+        self.exchanges += 1
+        self.offset, self.delay = min(self.samples, key=lambda sample: sample[1])
+        return self.offset
+
+    def correct(self, timestamp):
+        """A worker timestamp on the orchestrator's clock."""
+        return timestamp - self.offset
+
+    def correct_many(self, timestamps):
+        offset = self.offset
+        return [t - offset for t in timestamps]
+
+    def note_arrival(self, arrival, corrected):
+        """Records how long after its (corrected) worker timestamp a result arrived."""
+        if not math.isnan(corrected):
+            self.lag.record(round((arrival - corrected) * 1e9))
+
+    def to_dict(self):
+        lag = self.lag.percentiles(1e-9) if self.lag.count else {}
+        return {
+            "node": self.node,
+            "synced": self.synced,
+            "exchanges": self.exchanges,
+            "offset_s": self.offset,
+            "rtt_s": self.delay,
+            "uncertainty_s": self.delay / 2 if self.synced else None,
+            "arrival_lag_p50_s": lag.get("p50"),
+            "arrival_lag_p99_s": lag.get("p99"),
+        }
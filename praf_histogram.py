@@ -0,0 +1,222 @@
+# =========================
+#   P-RAF: Streaming Percentiles (log-bucketed histogram)
+# =========================
+#
+# Values are non-negative integers (nanoseconds). Below 2 * SUB_BUCKET_COUNT
+# every value has its own bucket; above that each power of two is split into
+# SUB_BUCKET_COUNT linear sub-buckets, HDR-histogram style. The relative error
+# of any reported quantile is therefore bounded by 1 / SUB_BUCKET_COUNT (~3 %),
+# and the bucket array has a fixed size for the whole int64 range - memory stays
+# constant no matter how many results are recorded.
+
+import math
+from itertools import repeat
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+_LINEAR_LIMIT = 2 * SUB_BUCKET_COUNT
+
+REPORTED_PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+
+def bucket_index(value):
+    """Maps a non-negative integer to its bucket."""
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKET_COUNT + (value >> shift)
+
+
+def bucket_bounds(index):
+    """Returns the inclusive (lowest, highest) value that maps to `index`."""
+    if index < _LINEAR_LIMIT:
+        return index, index
+    shift = index // SUB_BUCKET_COUNT - 1
+    top = index - shift * SUB_BUCKET_COUNT
+    return top << shift, ((top + 1) << shift) - 1
+
+
+BUCKET_COUNT = bucket_index((1 << 63) - 1) + 1
+
+
+def bucket_layout():
+    """The layout a worker announces in its hello ("histogram"); its snapshots merge only if it matches."""
+    return {"sub_bucket_bits": SUB_BUCKET_BITS, "bucket_count": BUCKET_COUNT}
+
+
+class LogHistogram:
+    """Constant-memory, mergeable histogram with O(buckets) quantile queries."""
+
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value, count=1):
+        """Records `count` occurrences of `value` (negative values are clamped to 0)."""
+        if value < 0:
+            value = 0
+        self.counts[bucket_index(value)] += count
+        self.count += count
+        self.sum += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def record_many(self, values, weights=None, samples=None):
+        """Records an iterable of values, each `weights[i]` times (default once).
+
+        `samples`, another LogHistogram, gets every value once in the same pass.
+        """
+        if weights is None:
+            weights = repeat(1)
+        counts = self.counts
+        sample_counts = samples.counts if samples is not None else None
+        low = high = None
+        total = n = values_seen = value_sum = 0
+        for value, weight in zip(values, weights):
+            if value < 0:
+                value = 0
+            if value < _LINEAR_LIMIT:
+                index = value
+            else:
+                shift = value.bit_length() - SUB_BUCKET_BITS - 1
+                index = shift * SUB_BUCKET_COUNT + (value >> shift)
+            counts[index] += weight
+            if sample_counts is not None:
+                sample_counts[index] += 1
+                values_seen += 1
+                value_sum += value
+            total += value * weight
+            n += weight
+            if low is None or value < low:
+                low = value
+            if high is None or value > high:
+                high = value
+        if low is None:
+            return
+        for hist, added, added_sum in ((self, n, total), (samples, values_seen, value_sum)):
+            if hist is None:
+                continue
+            hist.count += added
+            hist.sum += added_sum
+            hist.min = low if hist.min is None else min(hist.min, low)
+            hist.max = high if hist.max is None else max(hist.max, high)
+
+    def merge(self, other):
+        """Adds all values recorded in `other` to this histogram."""
+        if not other.count:
+            return self
+        counts, other_counts = self.counts, other.counts
+        for index in range(bucket_index(other.min), bucket_index(other.max) + 1):
+            if other_counts[index]:
+                counts[index] += other_counts[index]
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def copy(self):
+        clone = LogHistogram()
+        clone.counts = self.counts[:]
+        clone.count, clone.sum, clone.min, clone.max = self.count, self.sum, self.min, self.max
+        return clone
+
+    def since(self, earlier):
+        """Histogram of the values recorded after `earlier`, an older copy of this histogram.
+
+        Exact per bucket; min and max are the bounds of the outermost non-empty buckets.
+        """
+        if earlier is None or not earlier.count:
+            return self.copy()
+        diff = LogHistogram()
+        if self.count == earlier.count:
+            return diff
+        first, last = bucket_index(self.min), bucket_index(self.max)
+        counts, old = self.counts, earlier.counts
+        low = high = None
+        for index in range(first, last + 1):
+            n = counts[index] - old[index]
+            if n:
+                diff.counts[index] = n
+                if low is None:
+                    low = index
+                high = index
+        diff.count = self.count - earlier.count
+        diff.sum = self.sum - earlier.sum
+        diff.min = max(bucket_bounds(low)[0], self.min)
+        diff.max = min(bucket_bounds(high)[1], self.max)
+        return diff
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def quantiles(self, qs):
+        """Returns one value per quantile in `qs` (each 0..1) with a single bucket scan."""
+        if not self.count:
+            return [None] * len(qs)
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        ranks = [max(1, math.ceil(qs[i] * self.count)) for i in order]
+        results = [None] * len(qs)
+        counts = self.counts
+        seen = 0
+        pos = 0
+        for index in range(bucket_index(self.min), bucket_index(self.max) + 1):
+            seen += counts[index]
+            while pos < len(ranks) and seen >= ranks[pos]:
+                lowest, highest = bucket_bounds(index)
+                value = (lowest + highest) // 2
+                results[order[pos]] = min(max(value, self.min), self.max)
+                pos += 1
+            if pos == len(ranks):
+                break
+        return results
+
+    def quantile(self, q):
+        return self.quantiles((q,))[0]
+
+    def count_at_least(self, value):
+        """Number of recorded values in buckets at or above the bucket of `value`."""
+        if not self.count or value > self.max:
+            return 0
+        counts = self.counts
+        start = max(bucket_index(max(0, value)), bucket_index(self.min))
+        return sum(counts[index] for index in range(start, bucket_index(self.max) + 1))
+
+    def percentiles(self, scale=1.0):
+        """The REPORTED_PERCENTILES as a dict, multiplied by `scale` (e.g. 1e-9 for seconds)."""
+        values = self.quantiles([q for _, q in REPORTED_PERCENTILES])
+        return {
+            name: (value * scale if value is not None else None)
+            for (name, _), value in zip(REPORTED_PERCENTILES, values)
+        }
+
+    def to_dict(self):
+        """Sparse, JSON-friendly representation (used for reports and snapshots)."""
+        return {
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("sub_bucket_bits", SUB_BUCKET_BITS) != SUB_BUCKET_BITS:
+            raise ValueError("Histogram was recorded with a different bucket layout")
+        hist = cls()
+        for index, count in data.get("buckets", {}).items():
+            hist.counts[int(index)] = count
+        hist.count = data.get("count", sum(hist.counts))
+        hist.sum = data.get("sum", 0)
+        hist.min = data.get("min")
+        hist.max = data.get("max")
+        return hist
@@ -1,53 +1,577 @@
+import argparse
 import asyncio
+import os
 import subprocess
 import sys
 import webbrowser
 import json
 import time
 from pathlib import Path
+from urllib.parse import urlencode
+
+from praf_affinity import DEFAULT_HOUSEKEEPING_CORES, CoreMap, affinity_supported, pin_current_process, place_process
+from praf_aggregator import ResultAggregator, build_results_frame
+from praf_clients import DashboardClient, Subscription
+from praf_clock import CLOCK_BURST, CLOCK_BURST_INTERVAL, CLOCK_SYNC_INTERVAL, NodeClock, ping_command
+from praf_baseline import (
+    compare_runs, comparisons_to_dicts, entries_from_state, has_regressions, load_baseline, print_comparisons,
+    save_baseline,
+)
+from praf_histogram import LogHistogram, bucket_layout
+from praf_profile import PROFILE_WINDOW_SEC, ProfileCollector, profile_command
+from praf_report import build_report, environment_metadata, format_duration, result_rows, write_csv, write_json
+from praf_protocol import (
+    FRAME_HEADER, KIND_JSON, KIND_RECORDS, MAX_FRAME_SIZE, ProtocolError,
+    choose_encoding, decode_json, decode_records
+)
+from praf_scaling import analyze, medians_from_rows, print_scaling
+from praf_rollup import SNAPSHOT_HISTORY_SEC, RollupStore
+from praf_resultlog import (
+    DEFAULT_SEGMENT_BYTES, NO_TIMESTAMP, ResultLogReader, ResultLogWriter, new_session_dir, replay
+)
+from praf_scheduler import PHASE_DONE, PHASE_MEASURE, PlanError, Scheduler, load_plan
+from praf_startup import LAUNCH_TIME_ENV, START_COMMAND, STARTUP_TIMEOUT, StartupBarrier
+from praf_steadystate import SteadyStateDetector
+from praf_telemetry import TelemetryAggregator
 
 # =========================
 #   P-RAF: Orchestrator (v1.4 - Extra Robust, Persistent Connections)
 # =========================
 
-TCP_HOST = '127.0.0.1'
+TCP_HOST = '127.0.0.1'  # Default listen addresses; --bind / --dashboard-bind (0.0.0.0 for remote workers)
 TCP_PORT = 9000
 WEBSOCKET_HOST = '127.0.0.1'
 WEBSOCKET_PORT = 9001
+BROADCAST_INTERVAL = 0.1  # Seconds between coalesced dashboard frames
 
 ROOT_DIR = Path(__file__).parent.resolve()
 DASHBOARD_PATH = ROOT_DIR / "dashboard" / "dashboard.html"
+RESULT_LOG_ROOT = ROOT_DIR / "results"
+RESULT_LOG_SEGMENT_BYTES = DEFAULT_SEGMENT_BYTES
+REPLAY_START_DELAY = 2.0  # Seconds to let the dashboard connect before a replay starts
+REPORT_ROOT = ROOT_DIR / "reports"  # Default location of headless run reports
+PROFILE_ROOT = ROOT_DIR / "profiles"  # Collapsed-stack profiles (--profile / "profile" plan tests)
 
 WORKER_COMMANDS = {
     "Python": [sys.executable, str(ROOT_DIR / "python_benchmark" / "benchmark.py")],
+    "Python-NumPy": [sys.executable, str(ROOT_DIR / "python_benchmark" / "benchmark.py"), "--profile", "numpy"],
     "Ruby": ["ruby", str(ROOT_DIR / "ruby_benchmark" / "benchmark.rb")],
     "Java": ["java", "-jar", str(ROOT_DIR / "java_benchmark" / "target" / "java-benchmark-runner.jar")],
     "Rust": [str(ROOT_DIR / "rust_benchmark" / "target" / "release" / "rust_benchmark_worker.exe")]
 }
+RUNTIME_VERSION_COMMANDS = {  # Probed for the environment section of headless reports
+    "Python": [sys.executable, "--version"],
+    "Ruby": ["ruby", "--version"],
+    "Java": ["java", "-version"],
+    "Rust": ["rustc", "--version"],
+}
+ALGORITHMS = [
+    "array_sort", "fibonacci", "game_of_life",
+    "matrix_multiplication", "prime_factors", "is_leap_year"
+]
 
 worker_processes = []
-websocket_clients = set()
+websocket_clients = set()  # DashboardClients receiving live updates
+joining_clients = set()  # DashboardClients waiting for their snapshot (sent by the broadcast loop)
 tcp_server = None
 websocket_server = None
+broadcast_task = None
+aggregator = ResultAggregator()
+rollups = RollupStore()  # 1 s / 10 s / 1 min history per key for late joiners and history requests
+steady_state = SteadyStateDetector()
+telemetry = TelemetryAggregator()  # GC / scheduler data of workers started with --telemetry
+result_log = None
+result_log_task = None
+worker_sessions = set()  # Sessions that completed the hello handshake (addressable by commands)
+scheduler = None
+scheduler_task = None
+core_map = None     # CPU placement of orchestrator and workers (--pin-cores)
+worker_metadata = {}  # Field -> {series: value} reported by workers; mirrored into the result log
+worker_nice = None  # Nice level for launched workers (--nice)
+baseline_name = None       # Baseline to compare this run against at shutdown (--baseline)
+save_baseline_name = None  # Name to save this run's summary under at shutdown (--save-baseline)
+comparisons = None         # Result of the baseline comparison, once it ran
+profiles = None           # ProfileCollector of this session (created in main)
+profile_task = None        # Free-running --profile windows
+split_nodes = False        # Keep the results of every node apart (--split-nodes)
+node_clocks = {}           # (node, series) -> NodeClock; kept across reconnects
+startup = None             # StartupBarrier of the launched workers (not with --no-launch)
+startup_task = None        # Releases the barrier once every launched worker is ready
 
 # --- WebSocket Broadcasting ---
-async def broadcast_message(message_str):
-    """Sends a message to all connected WebSocket clients concurrently."""
-    if websocket_clients:
-        await asyncio.gather(
-            *(ws.send(message_str) for ws in websocket_clients),
-            return_exceptions=True
-        )
+async def broadcast_message(message_str, lang=None):
+    """Queues a message for every dashboard (subscribed to `lang`, if given); never waits on them."""
+    for client in websocket_clients:
+        client.offer_event(message_str, lang)
 
 async def broadcast_status(level, text):
     """Sends a structured status message to all dashboards."""
     await broadcast_message(json.dumps({"type": "status", "level": level, "message": text}))
 
+async def broadcast_loop(interval=BROADCAST_INTERVAL):
+    """Publishes the aggregated deltas as one frame per tick, decoupled from ingest."""
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    while True:
+        next_tick += interval
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+        deltas = aggregator.drain()
+        now = time.time()
+        if deltas:
+            rollups.add(deltas, now)
+        # Built before anything awaits, so it covers exactly the deltas drained so far.
+        joining = list(joining_clients)
+        joining_clients.clear()
+        snapshot = build_snapshot(now, interval) if joining else None
+        if deltas:
+            for event in steady_state.update(deltas, aggregator.histograms, now, aggregator.samples):
+                await announce_steady_state(event)
+            frame = build_results_frame(deltas, aggregator.histograms, now, interval, aggregator.elements)
+            annotate_steady_state(frame)
+            annotate_telemetry(frame)
+            frame_str = json.dumps(frame, separators=(",", ":"))
+            for client in websocket_clients:
+                client.offer_results(frame, frame_str)
+        if joining:
+            admit_clients(joining, snapshot)
+        # A slow tick (e.g. a long event loop stall) skips ahead instead of bursting.
+        next_tick = max(next_tick, loop.time())
+
+def build_snapshot(now, interval):
+    """Everything a newly connected dashboard needs: cumulative totals per key plus recent history."""
+    totals = {
+        key: [hist.count, hist.sum * 1e-9, hist.min * 1e-9, hist.max * 1e-9]
+        for key, hist in aggregator.histograms.items() if hist.count
+    }
+    snapshot = build_results_frame(totals, aggregator.histograms, now, interval, aggregator.elements)
+    annotate_steady_state(snapshot)
+    annotate_telemetry(snapshot)
+    resolution = rollups.resolutions[0][0]
+    snapshot.update({
+        "type": "snapshot",
+        "resolutions": [r for r, _ in rollups.resolutions],
+        "history": {"resolution": resolution, "series": rollups.window(resolution, now - SNAPSHOT_HISTORY_SEC)},
+        "tests": [
+            {"lang": lang, "algo": algo, "phase": phase, "test_id": test_id}
+            for (lang, algo), (phase, test_id) in sorted(scheduler.phases.items())
+        ] if scheduler else [],
+    })
+    return snapshot
+
+def admit_clients(clients, snapshot):
+    """Queues the snapshot for new (or resubscribed) dashboards; from the next tick on they get the live deltas."""
+    for client in clients:
+        client.offer_snapshot(client.snapshot_message(snapshot))
+        websocket_clients.add(client)
+
+def answer_history_request(request):
+    """Serves {"type": "history", "resolution": 10 | "auto", "start"/"end" or "seconds", "lang"?, "algo"?}
+    from the rollups."""
+    now = time.time()
+    end = float(request.get("end", now))
+    start = float(request["start"]) if "start" in request else end - float(request.get("seconds", SNAPSHOT_HISTORY_SEC))
+    resolution = request.get("resolution", "auto")
+    if resolution == "auto":
+        resolution = rollups.pick_resolution(end - start)
+    series = rollups.window(resolution, start, end, request.get("lang"), request.get("algo"))
+    return json.dumps({
+        "type": "history", "id": request.get("id"), "resolution": resolution, "start": start, "end": end,
+        "series": series,
+    }, separators=(",", ":"))
+
+async def broadcast_test_phase(event):
+    """Announces a scheduler phase change on the console and to all dashboards."""
+    if event["variant"] != event["algo"]:
+        for lang in event["series"]:  # A sized key processes as many elements per run as its algorithm
+            aggregator.set_elements(lang, event["variant"], aggregator.elements.get((lang, event["algo"]), 1))
+    for lang in event["series"]:
+        # The tick that straddles the end of a measurement phase holds only part of a block.
+        if event["phase"] == PHASE_MEASURE:
+            steady_state.resume((lang, event["variant"]))
+        elif event["phase"] == PHASE_DONE:
+            steady_state.end((lang, event["variant"]))
+    print(f"🧪 [{event['test_id']}] {event['lang']}/{event['variant']}: {event['phase']}")
+    await broadcast_message(json.dumps(event))
+
+# --- Steady-State Analysis ---
+def steady_histogram(key):
+    """Steady-state-only histogram of a key (None until it first became steady)."""
+    return steady_state.steady_histogram(key, aggregator.histograms[key])
+
+def annotate_steady_state(frame):
+    """Adds each key's current phase and its steady-state percentiles to a results frame."""
+    for entry in frame["results"]:
+        key = (entry["lang"], entry["algo"])
+        entry["phase"] = steady_state.phase(key)
+        steady = steady_histogram(key)
+        if steady is not None and steady.count:
+            entry["steady"] = {"count": steady.count, **steady.percentiles(1e-9)}
+
+def annotate_telemetry(frame):
+    """Adds the tail attribution of keys with telemetry to a results frame."""
+    for entry in frame["results"]:
+        key = (entry["lang"], entry["algo"])
+        if key in telemetry.totals:
+            entry["telemetry"] = telemetry.summary(key, aggregator.histograms[key])
+
+async def announce_steady_state(event):
+    """Reports a steady-state start or changepoint to the console, dashboards and result log."""
+    change = "changepoint -> transient" if event.get("changepoint") else event["phase"]
+    print(f"📈 {event['lang']}/{event['algo']}: {change} (mean {format_duration(event['mean'])})")
+    await broadcast_message(json.dumps(event), event["lang"])
+    key = (event["lang"], event["algo"])
+    record_worker_metadata("phases", f"{key[0]}/{key[1]}", steady_state.phases(key))
+
+# --- Worker Sessions ---
+def series_name(lang, mode=None, node=None):
+    """Dashboard/statistics label for a language, tagged with a non-default execution mode
+    (and with the worker's node under --split-nodes)."""
+    label = f"{lang} [{mode}]" if mode and mode != "threads" else str(lang)
+    if node and split_nodes:
+        label = f"{label} @{node}"
+    return sys.intern(label)
+
+class WorkerSession:
+    """Per-connection state negotiated through the optional `hello` handshake."""
+
+    def __init__(self, addr, writer=None):
+        self.addr = addr
+        self.writer = writer
+        self.language = None  # Language as announced by the worker
+        self.lang = None  # Series name (language plus execution mode tag)
+        self.mode = None
+        self.encoding = "json"
+        self.controllable = False  # Worker waits for RUN_TEST commands
+        self.commands = set()  # Commands the worker understands (hello)
+        self.params = {}  # Algorithm -> RUN_TEST params the worker understands (hello)
+        self.algorithms = []  # Wire algo id -> interned algorithm name
+        self.node = None  # Node identity (hello), the peer address for workers that send none
+        self.clock = None  # NodeClock shared by all connections of this node and series
+        self.clock_task = None
+        self.barrier = False  # Worker waits for START after sending ready (hello_ack "barrier")
+
+    def register(self, names):
+        """Interns algorithm names; their position is the id used in binary frames."""
+        self.algorithms.extend(sys.intern(str(name)) for name in names)
+
+    def algorithm(self, algo_id):
+        try:
+            return self.algorithms[algo_id]
+        except IndexError:
+            raise ProtocolError(f"Unknown algorithm id {algo_id}") from None
+
+    async def send(self, message):
+        """Sends one control message (always a JSON line, whatever the result encoding)."""
+        try:
+            self.writer.write((json.dumps(message) + "\n").encode())
+            await self.writer.drain()
+        except (ConnectionError, RuntimeError) as e:
+            print(f"⚠️  [TCP] Could not send {message.get('command')} to {self.lang} worker: {e}")
+
+async def accept_hello(session, hello, writer):
+    """Registers the worker's names and answers with the negotiated encoding."""
+    layout = hello.get("histogram")
+    if layout is not None and layout != bucket_layout():
+        # Its snapshots would land in the wrong buckets; refuse it before anything is merged.
+        raise ProtocolError(f"Histogram layout {layout} of the {hello['lang']} worker does not match "
+                            f"the orchestrator's {bucket_layout()}")
+    session.mode = hello.get("mode")
+    session.language = sys.intern(str(hello["lang"]))
+    session.node = str(hello.get("node") or session.addr[0])
+    session.lang = series_name(hello["lang"], session.mode, session.node)
+    session.clock = node_clocks.setdefault((session.node, session.lang), NodeClock(session.node))
+    session.register(hello.get("algorithms", ()))
+    session.encoding = choose_encoding(hello.get("encodings"))
+    # Under a test plan, workers that understand RUN_TEST wait for it instead of running freely.
+    session.commands = set(hello.get("commands") or ())
+    session.params = hello.get("params") or {}
+    session.controllable = scheduler is not None and "RUN_TEST" in session.commands
+    register_elements(session.lang, hello.get("elements") or {})
+    for field in ("affinity", "runtime"):
+        if hello.get(field):
+            record_worker_metadata(field, session.lang, hello[field])
+    # Freely running workers that understand START are held until every launched worker is ready;
+    # scheduled ones wait for RUN_TEST anyway, and the plan starts only after the release.
+    session.barrier = (startup is not None and startup.holding and "START" in session.commands
+                       and not session.controllable)
+    if startup is not None:
+        startup.connect(session.language)
+        if "START" not in session.commands:
+            startup.mark_ready(session.language, held=session.controllable)  # Cannot report readiness; ready now
+    ack = {"type": "hello_ack", "encoding": session.encoding, "control": session.controllable,
+           "barrier": session.barrier}
+    writer.write((json.dumps(ack) + "\n").encode())
+    await writer.drain()
+    worker_sessions.add(session)
+    print(f"🤝 [TCP] {session.lang} worker on node {session.node} ({session.addr[0]}) negotiated "
+          f"'{session.encoding}' encoding{' (scheduled)' if session.controllable else ''}.")
+    if "PING" in session.commands:
+        session.clock_task = asyncio.get_running_loop().create_task(sync_clock(session))
+
+# --- Node Clocks ---
+async def sync_clock(session):
+    """Sends PING to a worker: a burst right after the handshake, then every CLOCK_SYNC_INTERVAL."""
+    seq = 0
+    while session in worker_sessions:
+        seq += 1
+        await session.send(ping_command(seq))
+        await asyncio.sleep(CLOCK_BURST_INTERVAL if seq < CLOCK_BURST else CLOCK_SYNC_INTERVAL)
+
+def handle_pong(session, pong):
+    """Folds a worker's answer to PING into its node's clock offset."""
+    arrival = time.time()
+    clock = session.clock
+    first = not clock.synced
+    clock.add(float(pong["t0"]), float(pong["t1"]), float(pong["t2"]), arrival)
+    if first:
+        print(f"🕒 [TCP] Node {session.node}: clock offset {clock.offset * 1e3:+.3f} ms "
+              f"(round trip {clock.delay * 1e3:.3f} ms).")
+
+# --- Startup Barrier ---
+def handle_ready(session, info):
+    """A worker finished initializing: hold it at the barrier, or start it at once if that was released."""
+    if startup is None:
+        return
+    held = session.barrier and startup.holding
+    # Scheduled workers idle until their first RUN_TEST, which waits for the release as well.
+    startup.mark_ready(session.language, info, held or session.controllable, session if held else None)
+    if session.barrier and not held:
+        asyncio.get_running_loop().create_task(session.send(START_COMMAND))
+
+def note_legacy_ready(payload):
+    """Workers without a hello start measuring right away; their first result counts as ready."""
+    lang = (payload["payload"] if "payload" in payload else payload).get("lang")
+    if lang not in startup.ready:
+        startup.connect(lang)
+        startup.mark_ready(lang)
+
+async def release_workers():
+    """Waits until every launched worker is ready, then starts all held workers at once."""
+    late = await startup.release()
+    if late:
+        print(f"⚠️  Not ready after {startup.timeout:.0f}s: {', '.join(late)}. Starting the others.")
+    print_startup()
+    if result_log:
+        result_log.set_metadata(startup=startup.summary())
+    await broadcast_status("info", "All workers ready; started together." if not late
+                           else f"Started without {', '.join(late)} (not ready in time).")
+
+async def wait_for_startup():
+    """Returns once the launched workers were released (at once without a barrier)."""
+    if startup_task is not None:
+        await startup_task
+
+def print_startup():
+    """Prints spawn -> connect / ready per launched language."""
+    summary = startup.summary() if startup else {}
+    if not summary:
+        return
+    print("\n--- Worker Startup (spawn -> ready) ---")
+    print(f"{'Language':<16} {'Connect':>10} {'Ready':>10} {'Init':>10} {'Held':>10}  Status")
+    for lang, info in summary.items():
+        print(f"{lang:<16} {format_duration(info['spawn_to_connect_s']):>10} "
+              f"{format_duration(info['spawn_to_ready_s']):>10} {format_duration(info['worker_init_s']):>10} "
+              f"{format_duration(info['held_s']):>10}  {info['status']}")
+
+def register_elements(lang, elements):
+    """Stores the problem instances per run announced by a worker (default 1)."""
+    elements = {sys.intern(str(algo)): int(n) for algo, n in elements.items()}
+    for algo, n in elements.items():
+        aggregator.set_elements(lang, algo, n)
+    if elements:
+        record_worker_metadata("elements", lang, elements)
+
+def record_worker_metadata(field, lang, value):
+    """Stores per-series worker information (for reports and the result log manifest)."""
+    recorded = worker_metadata.setdefault(field, {})
+    recorded[lang] = value
+    if result_log:
+        result_log.set_metadata(**{field: dict(recorded)})
+
+# --- Result Ingest ---
+def record_result(lang, algo, duration, iterations=1, worker_timestamp=NO_TIMESTAMP):
+    """Feeds one result (seconds per iteration) to the aggregator and the result log.
+
+    `worker_timestamp` is when the worker finished the sample, already on the
+    orchestrator's clock; the log keeps it next to the arrival time.
+    """
+    if scheduler:
+        if not scheduler.accepts(lang, algo):
+            return  # Warmup or not under test
+        algo = scheduler.variant(lang, algo)
+    aggregator.add(lang, algo, duration, iterations)
+    if result_log:
+        result_log.append(lang, algo, time.time(), round(duration * 1e9), iterations, worker_timestamp)
+
+def record_results_ns(lang, algo, durations_ns, iterations=None, worker_timestamps=None):
+    """Feeds a group of nanosecond results to the aggregator and the result log."""
+    if scheduler:
+        if not scheduler.accepts(lang, algo):
+            return
+        algo = scheduler.variant(lang, algo)
+    aggregator.add_ns(lang, algo, durations_ns, iterations)
+    if result_log:
+        result_log.append_many(lang, algo, time.time(), durations_ns, iterations, worker_timestamps)
+
+def record_histogram(lang, algo, hist):
+    """Feeds runs a worker could only deliver as a histogram (its ring overflowed).
+
+    They reach the statistics but not the result log, which stores individual
+    records; their count is kept in the log's "snapshot_runs" metadata instead.
+    """
+    if scheduler:
+        if not scheduler.accepts(lang, algo):
+            return
+        algo = scheduler.variant(lang, algo)
+    aggregator.add_histogram(lang, algo, hist)
+    counts = dict(worker_metadata.get("snapshot_runs", {}).get(lang, {}))
+    counts[algo] = counts.get(algo, 0) + hist.count
+    record_worker_metadata("snapshot_runs", lang, counts)
+
+def ingest_snapshot(lang, snapshot):
+    """Handles a `data_snapshot`: runs that never arrived as individual records."""
+    for result in snapshot["results"]:
+        try:
+            hist = LogHistogram.from_dict(result["histogram"])
+        except ValueError as e:
+            raise ProtocolError(f"Unusable snapshot histogram: {e}") from None
+        print(f"⚠️  {lang}/{result['algo']}: {hist.count} runs arrived as a histogram only "
+              f"({result.get('overwritten', 0)} samples overwritten before they could be sent).")
+        record_histogram(lang, result["algo"], hist)
+
+def ingest_telemetry(lang, message):
+    """Handles a `data_telemetry` message; results outside measurement phases are dropped."""
+    if scheduler:
+        message = {**message, "results": [
+            {**r, "algo": scheduler.variant(lang, r["algo"])}
+            for r in message["results"] if scheduler.accepts(lang, r["algo"])
+        ]}
+    telemetry.add(lang, message)
+
+def ingest_calibration(lang, message):
+    """Handles a `data_calibration`: raw vs corrected ns per iteration and noise-floor drops per algorithm.
+
+    Kept per series and algorithm (not per sweep variant) in the "calibration" worker metadata.
+    """
+    calibration = {algo: dict(info) for algo, info in worker_metadata.get("calibration", {}).get(lang, {}).items()}
+    for result in message["results"]:
+        info = calibration.setdefault(result["algo"], {"samples": 0, "floor_samples": 0})
+        first_floor = not info["floor_samples"] and result["floor_samples"]
+        info.update(
+            samples=info["samples"] + result["samples"],
+            floor_samples=info["floor_samples"] + result["floor_samples"],
+            timer_overhead_ns=message.get("timer_overhead_ns"),
+            loop_overhead_ns=result["loop_overhead_ns"],
+            raw_ns=result["raw_ns"], corrected_ns=result["corrected_ns"],
+        )
+        if first_floor:
+            print(f"⚠️  {lang}/{result['algo']}: {result['floor_samples']} samples at the timer's noise floor "
+                  f"were dropped (overhead {result['loop_overhead_ns']:.1f} ns/iteration).")
+    record_worker_metadata("calibration", lang, calibration)
+
+async def announce_profiles(lang, algos):
+    """Writes updated profiles off the loop, then reports them on the console and to all dashboards."""
+    await profiles.flush()
+    for algo in algos:
+        summary = profiles.summary((lang, algo))
+        hottest = ", ".join(f"{frame.split(':', 1)[-1]} {share:.0%}" for frame, share in summary["top"][:3])
+        print(f"🔬 {lang}/{algo}: {summary['samples']} stack samples -> {summary['file']} (self time: {hottest})")
+        await broadcast_message(json.dumps({"type": "profile", "lang": lang, "algo": algo, **summary}), lang)
+
+def ingest_profile(lang, message):
+    """Handles a `data_profile`: collapsed stacks of one finished profile (filed per sweep variant)."""
+    if scheduler:
+        test_id = message.get("plan_test_id")
+        scheduler.profile_received(lang, test_id)
+        message = {**message, "results": [
+            {**r, "algo": scheduler.profile_variant(lang, r["algo"], test_id)} for r in message["results"]
+        ]}
+    updated = [algo for _, algo in profiles.add(lang, message)]
+    if updated:
+        asyncio.get_running_loop().create_task(announce_profiles(lang, updated))
+
+def ingest_payload(payload, session=None):
+    """Folds one decoded worker message into the aggregator.
+
+    Accepts both the v1 per-result line ({"lang", "algo", "duration"}) and the
+    batched `data_batch` frame from DESIGN_v2_0.md 5.2, plus `data_snapshot`,
+    `data_telemetry`, `data_profile` and `data_calibration`. Messages of a session that sent a
+    hello belong to its series; their worker timestamps are clock corrected.
+    """
+    lang = session.lang if session is not None and session.lang else payload_series(payload)
+    if payload.get("type") == "data_snapshot":
+        ingest_snapshot(lang, payload["payload"])
+    elif payload.get("type") == "data_telemetry":
+        ingest_telemetry(lang, payload["payload"])
+    elif payload.get("type") == "data_profile":
+        ingest_profile(lang, payload["payload"])
+    elif payload.get("type") == "data_calibration":
+        ingest_calibration(lang, payload["payload"])
+    elif payload.get("type") == "data_batch":
+        batch = payload["payload"]
+        default_algo = batch.get("algo")
+        clock = session.clock if session is not None else None
+        arrival = time.time()
+        for result in batch["results"]:
+            worker_timestamp = result.get("timestamp")
+            if worker_timestamp is None:
+                worker_timestamp = NO_TIMESTAMP
+            elif clock is not None:
+                worker_timestamp = clock.correct(float(worker_timestamp))
+            record_result(lang, result.get("algo", default_algo), result["duration"], result.get("iterations", 1),
+                          worker_timestamp)
+        if clock is not None and batch["results"]:
+            clock.note_arrival(arrival, worker_timestamp)
+    else:
+        record_result(lang, payload["algo"], payload["duration"])
+
+def payload_series(payload):
+    """Series name of a JSON result message (v1 line or data_batch)."""
+    if payload.get("type") in ("data_batch", "data_snapshot", "data_telemetry", "data_profile", "data_calibration"):
+        batch = payload["payload"]
+        return series_name(batch["lang"], batch.get("mode"))
+    return series_name(payload["lang"])
+
+def ingest_frame(session, body):
+    """Handles one length-prefixed frame from a worker using the binary encoding."""
+    kind = body[0]
+    if kind == KIND_RECORDS:
+        algo_id, durations, iterations, timestamps = decode_records(body)
+        if timestamps is not None and len(timestamps):
+            timestamps = session.clock.correct_many(timestamps)
+            session.clock.note_arrival(time.time(), timestamps[-1])
+        record_results_ns(session.lang, session.algorithm(algo_id), durations, iterations, timestamps)
+    elif kind == KIND_JSON:
+        payload = decode_json(body)
+        try:
+            if payload.get("type") == "register":
+                session.register(payload["algorithms"])
+            elif payload.get("type") == "pong":
+                handle_pong(session, payload["payload"])
+            elif payload.get("type") == "ready":
+                handle_ready(session, payload.get("payload") or {})
+            else:
+                ingest_payload(payload, session)
+        except (AttributeError, KeyError, TypeError):
+            raise ProtocolError(f"Malformed JSON frame: {payload!r:.200}") from None
+    else:
+        raise ProtocolError(f"Unknown frame kind {kind}")
+
+async def read_binary_frames(reader, session):
+    """Reads length-prefixed frames until the worker disconnects."""
+    header_size = FRAME_HEADER.size
+    while True:
+        (length,) = FRAME_HEADER.unpack(await reader.readexactly(header_size))
+        if not 0 < length <= MAX_FRAME_SIZE:
+            raise ProtocolError(f"Invalid frame length {length}")
+        ingest_frame(session, await reader.readexactly(length))
+
 # --- Server Implementations ---
 async def handle_tcp_client(reader, writer):
     """Handles a single, persistent TCP connection from a benchmark worker."""
     client_addr = writer.get_extra_info('peername')
     print(f"✅ [TCP] Worker connected from {client_addr}")
+    session = WorkerSession(client_addr, writer)
     try:
         while not reader.at_eof():
             data = await reader.readline()
@@ -57,16 +581,39 @@ async def handle_tcp_client(reader, writer):
             if message:
                 try:
                     payload = json.loads(message)
-                    payload["timestamp"] = time.time()
-                    await broadcast_message(json.dumps(payload))
+                    if payload.get("type") == "hello":
+                        await accept_hello(session, payload, writer)
+                        if session.encoding == "binary":
+                            break  # The rest of the stream is length-prefixed frames
+                    elif payload.get("type") == "pong" and session.clock is not None:
+                        handle_pong(session, payload["payload"])
+                    elif payload.get("type") == "ready":
+                        handle_ready(session, payload.get("payload") or {})
+                    else:
+                        if session.language is None:
+                            if scheduler:
+                                # Workers without a hello cannot take commands; the plan only gates them.
+                                scheduler.note_legacy(payload_series(payload))
+                            if startup is not None:
+                                note_legacy_ready(payload)
+                        ingest_payload(payload, session)
                 except json.JSONDecodeError:
                     print(f"❌ [TCP] Invalid JSON from {client_addr}: {message}")
+                except (KeyError, TypeError):
+                    print(f"❌ [TCP] Malformed payload from {client_addr}: {message}")
+        if session.encoding == "binary":
+            await read_binary_frames(reader, session)
     except (ConnectionResetError, asyncio.IncompleteReadError):
         # Connection closed by client or forcibly terminated
         pass
+    except ProtocolError as e:
+        print(f"❌ [TCP] Protocol error from worker {client_addr}: {e}")
     except Exception as e:
         print(f"❌ [TCP] Unexpected error with worker {client_addr}: {e}")
     finally:
+        worker_sessions.discard(session)
+        if session.clock_task:
+            session.clock_task.cancel()
         print(f"ℹ️  [TCP] Worker {client_addr} disconnected.")
         try:
             writer.close()
@@ -76,25 +623,59 @@ async def handle_tcp_client(reader, writer):
 
 async def websocket_handler(websocket):
     """Handles a single dashboard client connection."""
+    from websockets.exceptions import ConnectionClosed
     print(f"✅ [WebSocket] Dashboard connected: {websocket.remote_address}")
-    websocket_clients.add(websocket)
+    client = DashboardClient(websocket, BROADCAST_INTERVAL)
+    client.start()
+    joining_clients.add(client)  # Joins the live stream once the broadcast loop queued its snapshot
     try:
-        await websocket.wait_closed()
+        async for message in websocket:
+            try:
+                request = json.loads(message)
+                if request.get("type") == "history":
+                    client.offer_event(answer_history_request(request))
+                elif request.get("type") == "subscribe":
+                    client.subscribe(Subscription.from_request(request, BROADCAST_INTERVAL))
+                    websocket_clients.discard(client)
+                    joining_clients.add(client)  # Fresh snapshot for the new subscription
+                else:
+                    raise ValueError(f"unknown request type {request.get('type')!r}")
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                client.offer_event(json.dumps({"type": "status", "level": "error", "message": f"Bad request: {e}"}))
+    except ConnectionClosed:
+        pass
     finally:
         print(f"ℹ️  [WebSocket] Dashboard disconnected: {websocket.remote_address}")
-        websocket_clients.remove(websocket)
+        joining_clients.discard(client)
+        websocket_clients.discard(client)
+        client.stop()
 
 # --- Main Application Logic ---
-def launch_workers(abort_on_fail=False):
-    """Launches all benchmark workers as subprocesses."""
+def launch_workers(abort_on_fail=False, languages=None):
+    """Launches the benchmark workers (all, or only `languages`) as subprocesses.
+
+    Popen does not wait for a worker to initialize, so all of them boot in
+    parallel; the startup barrier then starts them together.
+    """
     print("\n--- Launching Workers ---")
     loop = asyncio.get_running_loop()
     for lang, command in WORKER_COMMANDS.items():
+        if languages is not None and lang not in languages:
+            continue
         try:
             creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
-            proc = subprocess.Popen(command, creationflags=creationflags)
+            env = {**os.environ, **(core_map.environment(lang) if core_map else {})}
+            env[LAUNCH_TIME_ENV] = repr(time.monotonic())
+            proc = subprocess.Popen(command, creationflags=creationflags, env=env)
+            if core_map:
+                core_map.place(lang, proc.pid)
+            elif worker_nice:
+                place_process(proc.pid, nice=worker_nice)
             worker_processes.append(proc)
-            print(f"🚀 Launched {lang} worker (PID: {proc.pid})")
+            if startup is not None:
+                startup.spawn(lang, proc)
+            cores = f" on cores {core_map.workers[lang]}" if core_map else ""
+            print(f"🚀 Launched {lang} worker (PID: {proc.pid}){cores}")
         except Exception as e:
             error_msg = f"Failed to launch {lang} worker: {e}"
             print(f"❌ ERROR: {error_msg}")
@@ -103,6 +684,65 @@ def launch_workers(abort_on_fail=False):
                 terminate_workers()
                 raise RuntimeError("Aborted due to worker launch failure.")
 
+def print_summary():
+    """Prints run counts and latency percentiles per (lang, algo) to the console.
+
+    Percentiles cover steady-state data only once a stream has become steady
+    (marked with '*'); before that they cover everything.
+    """
+    if not aggregator.histograms:
+        return
+    print("\n--- Result Summary ---")
+    print(f"{'Language':<26} {'Algorithm':<22} {'Runs':>12} {'Steady':>12} {'p50':>10} {'p90':>10} {'p99':>10} "
+          f"{'p99.9':>10} {'p50/elem':>10}")
+    for (lang, algo), total in sorted(aggregator.histograms.items()):
+        steady = steady_histogram((lang, algo))
+        hist = steady if steady is not None and steady.count else total
+        p = hist.percentiles(1e-9)
+        elements = aggregator.elements.get((lang, algo), 1)
+        steady_runs = f"{steady.count}*" if hist is steady else "-"
+        print(f"{lang:<26} {algo:<22} {total.count:>12} {steady_runs:>12} "
+              f"{format_duration(p['p50']):>10} {format_duration(p['p90']):>10} "
+              f"{format_duration(p['p99']):>10} {format_duration(p['p999']):>10} "
+              f"{format_duration(p['p50'] / elements):>10}")
+    print_tail_attribution()
+
+def print_tail_attribution():
+    """Prints which share of each key's p99 tail coincided with GC or scheduler events (--telemetry)."""
+    if not telemetry.totals:
+        return
+    print("\n--- Tail Attribution (runs >= p99) ---")
+    print(f"{'Language':<26} {'Algorithm':<22} {'GC':>8} {'Sched':>8} {'GC runs':>10} {'GC pause':>10} "
+          f"{'Invol.CS':>10} {'Alloc peak':>12}")
+    for key in sorted(telemetry.totals):
+        if key not in aggregator.histograms:
+            continue
+        summary = telemetry.summary(key, aggregator.histograms[key])
+        gc_share, sched_share = summary.get("p99_gc_share"), summary.get("p99_scheduler_share")
+        peak = summary["alloc_peak_bytes"]
+        print(f"{key[0]:<26} {key[1]:<22} "
+              f"{f'{gc_share:.0%}' if gc_share is not None else '-':>8} "
+              f"{f'{sched_share:.0%}' if sched_share is not None else '-':>8} "
+              f"{summary['gc_collections']:>10} {format_duration(summary['gc_pause_ns'] * 1e-9):>10} "
+              f"{summary['nivcsw']:>10} {f'{peak / 1024:.1f} KiB' if peak is not None else '-':>12}")
+
+def node_summary():
+    """Clock offset and arrival lag per (node, series) of the workers that sent a hello."""
+    return {f"{node}/{lang}": clock.to_dict() for (node, lang), clock in sorted(node_clocks.items())}
+
+def print_nodes():
+    """Prints the clock offsets of a multi-node run (or of any run with --split-nodes)."""
+    if not node_clocks or (len({node for node, _ in node_clocks}) < 2 and not split_nodes):
+        return
+    print("\n--- Nodes (offset = worker clock - orchestrator clock) ---")
+    print(f"{'Node':<20} {'Series':<30} {'Offset':>12} {'±':>10} {'Pings':>6} {'Lag p50':>10} {'Lag p99':>10}")
+    for (node, lang), clock in sorted(node_clocks.items()):
+        info = clock.to_dict()
+        offset = f"{info['offset_s'] * 1e3:+.3f} ms" if clock.synced else "unsynced"
+        uncertainty = format_duration(info["uncertainty_s"]) if clock.synced else "-"
+        print(f"{node:<20} {lang:<30} {offset:>12} {uncertainty:>10} {info['exchanges']:>6} "
+              f"{format_duration(info['arrival_lag_p50_s']):>10} {format_duration(info['arrival_lag_p99_s']):>10}")
+
 def terminate_workers():
     """Terminates all running worker subprocesses."""
     print("\n--- Terminating Worker Processes ---")
@@ -116,38 +756,277 @@ def terminate_workers():
             p.kill()
     print("All worker processes terminated.")
 
-async def main():
-    """Sets up and runs the main application event loop."""
-    global tcp_server, websocket_server
+def dashboard_uri(args):
+    """The dashboard's file URI, telling it where the WebSocket listens unless that is the default."""
+    uri = DASHBOARD_PATH.as_uri()
+    host = args.dashboard_bind if args.dashboard_bind not in ("", "0.0.0.0", "::") else WEBSOCKET_HOST
+    if (host, args.dashboard_port) != (WEBSOCKET_HOST, WEBSOCKET_PORT):
+        uri += "?" + urlencode({"host": f"[{host}]" if ":" in host else host, "port": args.dashboard_port})
+    return uri
+
+def open_dashboard(args):
+    """Opens the dashboard in the default browser."""
+    uri = dashboard_uri(args)
+    try:
+        webbrowser.open(uri)
+    except Exception as e:
+        print(f"⚠️  Could not open dashboard in browser: {e}\n   Manually open: {uri}")
+
+def import_websockets():
     try:
         import websockets
     except ImportError:
         print("❌ ERROR: `pip install websockets` is required.")
         sys.exit(1)
+    return websockets
+
+async def profile_loop(window=PROFILE_WINDOW_SEC):
+    """Free-running --profile: profiles every capable worker in back-to-back windows."""
+    profiling = set()
+    while True:
+        for session in list(worker_sessions):
+            if "PROFILE" in session.commands:
+                if session in profiling:
+                    await session.send(profile_command("stop"))
+                await session.send(profile_command("start"))
+                profiling.add(session)
+        profiling &= worker_sessions
+        await asyncio.sleep(window)
+
+async def run_plan():
+    """Runs the loaded test plan to completion."""
+    await wait_for_startup()
+    await scheduler.run()
+    await broadcast_status("info", "Test plan finished.")
+    print("\n--- Test plan finished. Press Ctrl+C to stop. ---")
+    print_summary()
+
+def compare_with_baseline():
+    """Compares this run against --baseline once and prints the ranked differences."""
+    global comparisons
+    if not baseline_name or comparisons is not None:
+        return
+    try:
+        entries, _ = load_baseline(baseline_name)
+        comparisons = compare_runs(entries, entries_from_state(aggregator, steady_state))
+    except (RuntimeError, ValueError) as e:
+        print(f"⚠️  Cannot compare against baseline {baseline_name}: {e}")
+        comparisons = []
+        return
+    print_comparisons(comparisons, f"Comparison against baseline {baseline_name}")
+
+def save_run_baseline():
+    """Saves this run's per-key histograms (steady state where reached) as --save-baseline."""
+    if not save_baseline_name or not aggregator.histograms:
+        return
+    metadata = {**worker_metadata, "result_log": str(result_log.directory) if result_log else None}
+    if core_map:
+        metadata["core_map"] = core_map.to_dict()
+    path = save_baseline(save_baseline_name, entries_from_state(aggregator, steady_state), metadata)
+    print(f"💾 Baseline written to {path}")
+
+def scaling_analysis():
+    """Power-law fits and crossovers of the sized keys of this run (None without any)."""
+    return analyze(medians_from_rows(result_rows(aggregator, steady_state)))
+
+def write_reports(args):
+    """Writes the JSON (and optionally CSV) report of a finished headless run."""
+    rows = result_rows(aggregator, steady_state, scheduler, telemetry)
+    environment = environment_metadata(RUNTIME_VERSION_COMMANDS)
+    if core_map:
+        environment["usable_cores"] = len(core_map.available)
+        environment["core_map"] = core_map.to_dict()
+    report = build_report(rows, environment, plan={
+        "mode": scheduler.mode, "tests": [step._asdict() for step in scheduler.steps]
+    }, extra={
+        "outcomes": scheduler.outcomes,
+        "workers": worker_metadata,
+        "telemetry": telemetry.to_dict(aggregator.histograms) if telemetry.totals else None,
+        "result_log": str(result_log.directory) if result_log else None,
+        "baseline": baseline_name,
+        "comparison": comparisons_to_dicts(comparisons) if comparisons else None,
+        "profiles": profiles.to_dict() if profiles and profiles.stacks else None,
+        "scaling": analyze(medians_from_rows(rows)),
+        "nodes": node_summary() or None,
+        "startup": startup.summary() if startup else None,
+    })
+    json_path = args.report or REPORT_ROOT / f"report-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    write_json(report, json_path)
+    print(f"📄 Report written to {json_path}")
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"📄 CSV written to {args.csv}")
+
+async def run_headless(args):
+    """Runs the test plan without dashboards, writes the report and shuts down.
+
+    Returns the process exit code: 0, 2 if any test had to be skipped, or 3 if
+    the comparison against --baseline found regressions.
+    """
+    await wait_for_startup()
+    await scheduler.run()
+    # Let the broadcast loop fold the last tick into the steady-state analysis.
+    await asyncio.sleep(2 * BROADCAST_INTERVAL)
+    compare_with_baseline()
+    write_reports(args)
+    await shutdown()
+    skipped = [test_id for test_id, outcome in scheduler.outcomes.items() if outcome != "done"]
+    if skipped:
+        print(f"⚠️  Skipped tests (no worker): {', '.join(skipped)}")
+        return 2
+    return 3 if comparisons and has_regressions(comparisons) else 0
+
+def setup_baselines(args):
+    global baseline_name, save_baseline_name
+    baseline_name, save_baseline_name = args.baseline, args.save_baseline
+
+def setup_nodes(args):
+    global split_nodes
+    split_nodes = args.split_nodes
+
+def setup_affinity(args, languages):
+    """Plans the core map for the workers in `languages` and moves the orchestrator onto the housekeeping cores."""
+    global core_map, worker_nice
+    worker_nice = args.nice
+    if not args.pin_cores:
+        return
+    if not affinity_supported():
+        print("⚠️  CPU pinning needs os.sched_setaffinity (Linux). Running without affinity.")
+        return
+    core_map = CoreMap.plan(languages, housekeeping=args.housekeeping_cores, nice=args.nice)
+    # Threads started from here on (result log writer, ...) inherit this placement.
+    pin_current_process(core_map.housekeeping)
+    print(f"📌 Orchestrator on cores {core_map.housekeeping}")
+    if core_map.shared:
+        print("⚠️  Not enough cores for dedicated worker blocks; workers share cores.")
+
+async def main(args):
+    """Sets up and runs the main application event loop."""
+    global tcp_server, websocket_server, broadcast_task, result_log, result_log_task, scheduler, scheduler_task
+    global profile_task, startup, startup_task, profiles
+    websockets = None if args.headless else import_websockets()
+    setup_baselines(args)
+    setup_nodes(args)
+    profiles = ProfileCollector(new_session_dir(PROFILE_ROOT))  # Written on the first data_profile
+
+    # --- Optional test plan (RUN_TEST scheduling with warmup/measure phases)
+    if args.plan:
+        try:
+            plan_mode, steps = load_plan(args.plan, list(WORKER_COMMANDS), ALGORITHMS)
+        except PlanError as e:
+            print(f"❌ ERROR: {e}")
+            sys.exit(1)
+        scheduler = Scheduler(plan_mode, steps, worker_sessions, broadcast_test_phase, profile_all=args.profile)
+        print(f"📋 Loaded test plan {args.plan}: {len(steps)} tests, {plan_mode}.")
+
+    # --- CPU placement, planned for the workers this run launches (with a plan only the languages it tests)
+    plan_languages = {step.language for step in scheduler.steps} if scheduler else None
+    launched = [] if args.no_launch else [
+        lang for lang in WORKER_COMMANDS if plan_languages is None or lang in plan_languages
+    ]
+    setup_affinity(args, launched)
+
+    # --- Persist every result to an append-only, segmented log
+    if not args.no_log:
+        session_dir = new_session_dir(RESULT_LOG_ROOT)
+        result_log = ResultLogWriter(session_dir, RESULT_LOG_SEGMENT_BYTES)
+        result_log_task = asyncio.create_task(result_log.run())
+        print(f"💾 Recording results to {session_dir}")
+        if core_map:
+            result_log.set_metadata(core_map=core_map.to_dict())
+        if scheduler:
+            result_log.set_metadata(plan={"mode": scheduler.mode, "tests": [step._asdict() for step in scheduler.steps]})
 
     # --- Start TCP server (persistent handlers for each worker)
-    tcp_server = await asyncio.start_server(handle_tcp_client, TCP_HOST, TCP_PORT)
-    print(f"✅ TCP Server listening on {TCP_PORT}")
+    tcp_server = await asyncio.start_server(handle_tcp_client, args.bind, args.port)
+    print(f"✅ TCP Server listening on {args.bind}:{args.port}")
 
-    # --- Start WebSocket server
-    websocket_server = await websockets.serve(websocket_handler, WEBSOCKET_HOST, WEBSOCKET_PORT)
-    print(f"✅ WebSocket Server listening on {WEBSOCKET_PORT}")
+    # --- Start WebSocket server (not in headless runs)
+    if not args.headless:
+        websocket_server = await websockets.serve(websocket_handler, args.dashboard_bind, args.dashboard_port)
+        print(f"✅ WebSocket Server listening on {args.dashboard_bind}:{args.dashboard_port}")
 
-    # --- Launch workers (once, at orchestrator startup)
-    launch_workers(abort_on_fail=False)
+    # --- Start the coalescing broadcaster (one frame per tick; also drives steady-state analysis)
+    broadcast_task = asyncio.create_task(broadcast_loop())
 
-    try:
-        webbrowser.open(DASHBOARD_PATH.as_uri())
-    except Exception as e:
-        print(f"⚠️  Could not open dashboard in browser: {e}\n   Manually open: {DASHBOARD_PATH}")
+    # --- Launch workers (once, at orchestrator startup; with a plan only the languages it tests)
+    #     and start them together once all of them reported ready
+    if not args.no_launch:
+        startup = StartupBarrier(args.startup_timeout)
+        launch_workers(abort_on_fail=False, languages=launched)
+        startup_task = asyncio.create_task(release_workers())
+
+    if args.headless:
+        return await run_headless(args)
+
+    if not args.no_browser:
+        open_dashboard(args)
+
+    if scheduler:
+        scheduler_task = asyncio.create_task(run_plan())
+    elif args.profile:
+        profile_task = asyncio.create_task(profile_loop())
 
     print("\n--- Orchestrator is running. Press Ctrl+C to stop. ---")
     await asyncio.Event().wait()
 
+async def replay_main(args):
+    """Streams a recorded session back to the dashboards instead of running workers."""
+    global websocket_server, broadcast_task
+    websockets = import_websockets()
+    setup_baselines(args)
+    try:
+        reader = ResultLogReader(args.replay)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"❌ ERROR: Cannot open result log {args.replay}: {e}")
+        sys.exit(1)
+
+    for lang, elements in reader.metadata.get("elements", {}).items():
+        register_elements(lang, elements)
+
+    websocket_server = await websockets.serve(websocket_handler, args.dashboard_bind, args.dashboard_port)
+    print(f"✅ WebSocket Server listening on {args.dashboard_bind}:{args.dashboard_port}")
+    broadcast_task = asyncio.create_task(broadcast_loop())
+    if not args.no_browser:
+        open_dashboard(args)
+
+    await asyncio.sleep(REPLAY_START_DELAY)
+    print(f"⏯️  Replaying {args.replay} at {args.speed}x speed...")
+    await replay(reader, aggregator.add_ns, speed=args.speed, step=BROADCAST_INTERVAL)
+    await broadcast_status("info", "Replay finished.")
+    print("\n--- Replay finished. Press Ctrl+C to stop. ---")
+    await asyncio.Event().wait()
+
 async def shutdown():
     """Performs a graceful shutdown of all tasks and processes."""
     print("\n--- Shutting Down Gracefully ---")
     terminate_workers()
+    if startup_task:
+        startup_task.cancel()
+    if scheduler_task:
+        scheduler_task.cancel()
+    if profile_task:
+        profile_task.cancel()
+    if broadcast_task:
+        broadcast_task.cancel()
+    if result_log_task:
+        result_log_task.cancel()
+    if profiles:
+        profiles.close()
+    if result_log:
+        if telemetry.totals:
+            result_log.set_metadata(telemetry=telemetry.to_dict(aggregator.histograms))
+        if profiles and profiles.stacks:
+            result_log.set_metadata(profiles=profiles.to_dict())
+        if node_clocks:
+            result_log.set_metadata(nodes=node_summary())
+        result_log.close()
+        print(f"💾 Result log written to {result_log.directory}")
+    print_summary()
+    print_nodes()
+    print_scaling(scaling_analysis())
+    compare_with_baseline()
+    save_run_baseline()
     # Closing servers
     if websocket_server:
         websocket_server.close()
@@ -158,13 +1037,70 @@ async def shutdown():
         await tcp_server.wait_closed()
         print("✅ TCP server closed.")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="P-RAF orchestrator")
+    parser.add_argument("--no-log", action="store_true",
+                        help="do not record results to the append-only result log")
+    parser.add_argument("--replay", metavar="SESSION_DIR",
+                        help="replay a recorded session to the dashboard instead of running workers")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed factor (default: 1.0 = real time)")
+    parser.add_argument("--pin-cores", action="store_true",
+                        help="pin the orchestrator and each worker to dedicated CPU cores (Linux)")
+    parser.add_argument("--housekeeping-cores", type=int, default=DEFAULT_HOUSEKEEPING_CORES,
+                        help="cores reserved for the orchestrator and worker sender threads (default: 1)")
+    parser.add_argument("--nice", type=int, default=None,
+                        help="nice level for launched workers (negative values need privileges)")
+    parser.add_argument("--plan", metavar="PLAN_JSON",
+                        help="run a test plan (RUN_TEST with warmup/measure phases) instead of free-running workers")
+    parser.add_argument("--headless", action="store_true",
+                        help="run --plan without dashboard or browser, write a report and exit")
+    parser.add_argument("--report", metavar="JSON_PATH",
+                        help="report path for --headless (default: reports/report-<timestamp>.json)")
+    parser.add_argument("--csv", metavar="CSV_PATH",
+                        help="additionally write the --headless results as CSV")
+    parser.add_argument("--save-baseline", metavar="NAME",
+                        help="save this run's results as baseline NAME (baselines/NAME.json) at shutdown")
+    parser.add_argument("--baseline", metavar="NAME",
+                        help="compare this run against baseline NAME at shutdown (and in the --headless report)")
+    parser.add_argument("--profile", action="store_true",
+                        help="sample worker stacks (PROFILE) during every measurement phase, or in "
+                             f"{PROFILE_WINDOW_SEC:.0f}s windows without a plan; writes profiles/<session>/*.folded")
+    parser.add_argument("--bind", metavar="HOST", default=TCP_HOST,
+                        help=f"address the worker port listens on (default: {TCP_HOST}; 0.0.0.0 accepts "
+                             "workers from other machines - the port is unauthenticated)")
+    parser.add_argument("--dashboard-bind", metavar="HOST", default=WEBSOCKET_HOST,
+                        help=f"address the dashboard WebSocket listens on (default: {WEBSOCKET_HOST})")
+    parser.add_argument("--port", type=int, default=TCP_PORT,
+                        help=f"worker port (default: {TCP_PORT})")
+    parser.add_argument("--dashboard-port", type=int, default=WEBSOCKET_PORT,
+                        help=f"dashboard WebSocket port (default: {WEBSOCKET_PORT})")
+    parser.add_argument("--no-launch", action="store_true",
+                        help="do not start the local workers; only serve workers that connect on their own")
+    parser.add_argument("--startup-timeout", type=float, default=STARTUP_TIMEOUT, metavar="SECONDS",
+                        help="longest wait for all launched workers to report ready before the others are "
+                             f"started anyway (default: {STARTUP_TIMEOUT:.0f})")
+    parser.add_argument("--no-browser", action="store_true",
+                        help="do not open the dashboard in a browser")
+    parser.add_argument("--split-nodes", action="store_true",
+                        help="keep the results of every worker node apart (series 'Python @node') "
+                             "instead of aggregating nodes per language")
+    args = parser.parse_args(argv)
+    if args.headless and not args.plan:
+        parser.error("--headless needs a test plan (--plan)")
+    if args.headless and args.replay:
+        parser.error("--headless and --replay cannot be combined")
+    return args
+
 if __name__ == "__main__":
+    args = parse_args()
     print("="*44)
     print("  Processor-Runtime Analysis Framework (P-RAF)")
     print("="*44)
 
+    exit_code = 0
     try:
-        asyncio.run(main())
+        exit_code = asyncio.run(replay_main(args) if args.replay else main(args)) or 0
     except KeyboardInterrupt:
         print("\nCtrl+C detected. Shutting down...")
         try:
@@ -173,3 +1109,4 @@ if __name__ == "__main__":
             pass
     finally:
         print("P-RAF has shut down. Goodbye!")
+    sys.exit(exit_code)
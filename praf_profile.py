@@ -0,0 +1,129 @@
+# =========================
+#   P-RAF: Sampling Profiles (PROFILE command, data_profile)
+# =========================
+#
+# Workers that list "PROFILE" in their hello's commands sample the stacks of
+# their algorithm threads on request:
+#
+#   {"command": "PROFILE", "payload": {"action": "start", "algorithms": ["game_of_life"], "interval": 0.005}}
+#   {"command": "PROFILE", "payload": {"action": "stop", "algorithms": ["game_of_life"]}}
+#
+# On stop they answer with a `data_profile` message holding collapsed-stack
+# counts per algorithm. A stop sent by a test plan carries the test's
+# "plan_test_id", which the worker echoes back: the answer may arrive after the
+# next step (another size of the same algorithm) has begun, and the id tells
+# which sweep variant the stacks belong to. The collector merges all profiles of a (series, algo)
+# and rewrites one file per key (on a writer thread, off the event loop) in the collapsed format
+#
+#   threading.py:_bootstrap;...;benchmark.py:game_of_life 1523
+#
+# which flamegraph.pl, speedscope (https://www.speedscope.app) and inferno
+# turn into flame graphs directly.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROFILE_INTERVAL = 0.005    # Seconds between stack samples requested from workers
+PROFILE_WINDOW_SEC = 10.0   # Free-running --profile: length of one profile window
+TOP_FRAMES = 5              # Hottest functions printed per received profile
+
+
+def profile_command(action, algorithms=None, interval=PROFILE_INTERVAL, plan_test_id=None):
+    """A PROFILE start/stop command (all algorithms of the worker unless `algorithms` is given)."""
+    payload = {"action": action}
+    if algorithms is not None:
+        payload["algorithms"] = list(algorithms)
+    if action == "start":
+        payload["interval"] = interval
+    if plan_test_id is not None:
+        payload["plan_test_id"] = plan_test_id
+    return {"command": "PROFILE", "payload": payload}
+
+
+def file_slug(text):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in text).strip("_")
+
+
+def top_frames(stacks, limit=TOP_FRAMES):
+    """[(frame, share of samples)] of the functions with the most self time (leaf frames)."""
+    leaves = {}
+    for stack, count in stacks.items():
+        leaf = stack.rsplit(";", 1)[-1]
+        leaves[leaf] = leaves.get(leaf, 0) + count
+    total = sum(leaves.values())
+    ranked = sorted(leaves.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [(frame, count / total) for frame, count in ranked] if total else []
+
+
+class ProfileCollector:
+    """Merged collapsed stacks per (series, algo), mirrored to one .folded file per key."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.stacks = {}    # (lang, algo) -> {collapsed stack: samples}
+        self.seconds = {}   # (lang, algo) -> seconds profiled
+        self._dirty = set()  # Keys whose file is out of date (see `flush`)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="praf-profile")
+
+    def path(self, key):
+        lang, algo = key
+        return self.directory / f"{file_slug(lang)}__{file_slug(algo)}.folded"
+
+    def add(self, lang, payload):
+        """Merges one `data_profile` payload of series `lang` (in memory only); returns the keys it updated."""
+        updated = []
+        for result in payload["results"]:
+            stacks = result["stacks"]
+            if not stacks:
+                continue
+            key = (lang, result["algo"])
+            merged = self.stacks.setdefault(key, {})
+            for stack, count in stacks.items():
+                merged[stack] = merged.get(stack, 0) + int(count)
+            self.seconds[key] = self.seconds.get(key, 0.0) + float(payload.get("duration", 0.0))
+            self._dirty.add(key)
+            updated.append(key)
+        return updated
+
+    def _take_pending(self):
+        """{path: file content} of the keys changed since the last write."""
+        pending = {}
+        for key in self._dirty:
+            stacks = sorted(self.stacks[key].items(), key=lambda item: item[1], reverse=True)
+            pending[self.path(key)] = "".join(f"{stack} {count}\n" for stack, count in stacks)
+        self._dirty = set()
+        return pending
+
+    async def flush(self):
+        """Hands the changed files to the writer thread without blocking the loop."""
+        pending = self._take_pending()
+        if pending:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._write, pending)
+
+    def close(self):
+        """Writes the files that are still out of date and stops the writer thread."""
+        pending = self._take_pending()
+        if pending:
+            self._executor.submit(self._write, pending).result()
+        self._executor.shutdown(wait=True)
+
+    # --- Writer thread ---
+    def _write(self, pending):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path, text in pending.items():
+            path.write_text(text, encoding="utf-8")
+
+    def summary(self, key):
+        stacks = self.stacks[key]
+        return {
+            "samples": sum(stacks.values()),
+            "seconds": round(self.seconds.get(key, 0.0), 3),
+            "file": str(self.path(key)),
+            "top": [[frame, round(share, 4)] for frame, share in top_frames(stacks)],
+        }
+
+    def to_dict(self):
+        """JSON-friendly summary per key (for reports and the result log manifest)."""
+        return {f"{lang}/{algo}": self.summary((lang, algo)) for lang, algo in sorted(self.stacks)}
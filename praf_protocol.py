@@ -0,0 +1,107 @@
+# =========================
+#   P-RAF: Binary Wire Protocol (Worker -> Orchestrator)
+# =========================
+#
+# A worker opts in by sending a JSON `hello` line right after connecting:
+#
+#   {"type": "hello", "lang": "Python", "encodings": ["binary", "json"],
+#    "algorithms": ["array_sort", "fibonacci", ...]}
+#
+# The orchestrator answers with one JSON line naming the negotiated encoding:
+#
+#   {"type": "hello_ack", "encoding": "binary"}
+#
+# The position of a name in `algorithms` is its integer id on the wire. With
+# "json" the connection keeps using newline-delimited JSON. With "binary" every
+# following message is a length-prefixed frame:
+#
+#   frame   := uint32 body_length | body            (little endian)
+#   body    := uint8 kind | ...
+#   RECORDS := kind=1 | uint8 flags | uint16 algo_id | uint32 count | count * record
+#   record  := int64 duration_ns [| int64 iterations] [| float64 timestamp]
+#
+# `duration_ns` is the per-iteration duration of one sample and `iterations`
+# (FLAG_ITERATIONS) the inner batch size it was measured over; without the
+# flag every record is a single run. FLAG_TIMESTAMP adds the worker's clock.
+#   JSON    := kind=2 | utf-8 JSON message (e.g. {"type": "register", "algorithms": [...]})
+#
+# Every record field is 8 bytes wide, so a whole frame decodes with a single
+# `array.frombytes` and strided slices - no per-record tuples or dicts.
+
+import json
+import struct
+import sys
+from array import array
+
+FRAME_HEADER = struct.Struct("<I")
+RECORDS_HEADER = struct.Struct("<BBHI")
+
+KIND_RECORDS = 1
+KIND_JSON = 2
+
+FLAG_TIMESTAMP = 0x01
+FLAG_ITERATIONS = 0x02
+
+SUPPORTED_ENCODINGS = ("binary", "json")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+_NEEDS_BYTESWAP = sys.byteorder != "little"
+
+
+class ProtocolError(Exception):
+    """Raised when a worker sends a frame that does not follow the wire format."""
+
+
+def choose_encoding(requested):
+    """Picks the first encoding from the worker's preference list that we support."""
+    for encoding in requested or ():
+        if encoding in SUPPORTED_ENCODINGS:
+            return encoding
+    return "json"
+
+
+def record_fields(flags):
+    """Number of 8-byte fields per record for the given flags."""
+    return 1 + bool(flags & FLAG_ITERATIONS) + bool(flags & FLAG_TIMESTAMP)
+
+
+def decode_records(body):
+    """
+    Decodes a RECORDS frame body in bulk.
+
+    Returns (algo_id, durations_ns, iterations, timestamps) where durations_ns
+    and iterations are array('q'), timestamps an array('d'); the optional
+    columns are None when the frame does not carry them.
+    """
+    if len(body) < RECORDS_HEADER.size:
+        raise ProtocolError("Truncated records header")
+    _, flags, algo_id, count = RECORDS_HEADER.unpack_from(body)
+    fields = record_fields(flags)
+    data = memoryview(body)[RECORDS_HEADER.size:]
+    if len(data) != count * fields * 8:
+        raise ProtocolError(f"Expected {count} records, got {len(data)} bytes")
+
+    ints = array("q")
+    ints.frombytes(data)
+    if _NEEDS_BYTESWAP:
+        ints.byteswap()
+    if fields == 1:
+        return algo_id, ints, None, None
+
+    iterations = ints[1::fields] if flags & FLAG_ITERATIONS else None
+    timestamps = None
+    if flags & FLAG_TIMESTAMP:
+        floats = array("d")
+        floats.frombytes(data)
+        if _NEEDS_BYTESWAP:
+            floats.byteswap()
+        timestamps = floats[fields - 1::fields]
+    return algo_id, ints[0::fields], iterations, timestamps
+
+
+def decode_json(body):
+    """Decodes a JSON frame body."""
+    try:
+        return json.loads(bytes(body[1:]).decode("utf-8"))
+    except ValueError as e:
+        raise ProtocolError(f"Invalid JSON frame: {e}") from None
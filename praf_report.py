@@ -0,0 +1,162 @@
+# =========================
+#   P-RAF: Machine-Readable Run Reports
+# =========================
+#
+# Builds the JSON/CSV report of a headless run from the orchestrator's
+# incremental state (aggregator histograms, steady-state analysis, scheduler
+# measurement windows) plus a description of the machine it ran on.
+
+import csv
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from praf_histogram import REPORTED_PERCENTILES
+from praf_scheduler import split_variant
+
+REPORT_VERSION = 1
+TELEMETRY_COLUMNS = [  # Empty unless the worker ran with --telemetry
+    "gc_collections", "gc_pause_s", "nvcsw", "nivcsw", "minflt", "majflt", "alloc_peak_bytes",
+    "p99_gc_share", "p99_scheduler_share",
+]
+VERSION_PROBE_TIMEOUT = 5.0
+
+CSV_COLUMNS = [
+    "lang", "algo", "size", "test_id", "runs", "elements", "measured_sec", "runs_per_sec", "elements_per_sec",
+    "mean_s", "min_s", "max_s", *(f"{name}_s" for name, _ in REPORTED_PERCENTILES),
+    "steady_runs", *(f"steady_{name}_s" for name, _ in REPORTED_PERCENTILES), "changepoints",
+    *TELEMETRY_COLUMNS,
+]
+
+
+# --- Environment ---
+def cpu_model():
+    """Human-readable CPU model name, or None if the platform does not tell."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    if sys.platform == "darwin":
+        version = probe_version(["sysctl", "-n", "machdep.cpu.brand_string"])
+        if version:
+            return version
+    return platform.processor() or None
+
+
+def probe_version(command):
+    """First output line of a `--version`-style command, or None if it cannot run."""
+    try:
+        proc = subprocess.run(command, capture_output=True, text=True, timeout=VERSION_PROBE_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = (proc.stdout or proc.stderr).strip()  # `java -version` prints to stderr
+    return output.splitlines()[0] if output else None
+
+
+def environment_metadata(version_commands):
+    """Machine, OS and runtime versions; `version_commands` maps a runtime to its probe."""
+    usable = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_model": cpu_model(),
+        "logical_cores": os.cpu_count(),
+        "usable_cores": usable,
+        "orchestrator_python": sys.version.split()[0],
+        "runtimes": {name: probe_version(command) for name, command in version_commands.items()},
+    }
+
+
+# --- Results ---
+def format_duration(seconds):
+    """Human-readable duration for console output."""
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def _percentiles(hist, prefix=""):
+    values = hist.percentiles(1e-9) if hist is not None and hist.count else {}
+    return {f"{prefix}{name}": values.get(name) for name, _ in REPORTED_PERCENTILES}
+
+
+def _telemetry_columns(telemetry, key, hist):
+    summary = telemetry.summary(key, hist) if telemetry else None
+    if summary is None:
+        return dict.fromkeys(TELEMETRY_COLUMNS)
+    return {
+        **{column: summary.get(column) for column in TELEMETRY_COLUMNS},
+        "gc_pause_s": summary["gc_pause_ns"] * 1e-9,
+    }
+
+
+def result_rows(aggregator, steady_state, scheduler=None, telemetry=None):
+    """One dict per (lang, algo) with counts, throughput and percentiles (seconds)."""
+    rows = []
+    for key, hist in sorted(aggregator.histograms.items()):
+        if not hist.count:
+            continue
+        lang, algo = key
+        elements = aggregator.elements.get(key, 1)
+        measured = scheduler.measured.get(key) if scheduler else None
+        steady = steady_state.steady_histogram(key, hist)
+        phases = steady_state.phases(key)
+        rows.append({
+            "lang": lang,
+            "algo": algo,
+            "size": split_variant(algo)[1],  # Problem size of sized tests ("<algorithm>@<size>")
+            "test_id": scheduler.phases[key][1] if scheduler and key in scheduler.phases else None,
+            "runs": hist.count,
+            "elements": elements,
+            "measured_sec": measured,
+            "runs_per_sec": hist.count / measured if measured else None,
+            "elements_per_sec": hist.count * elements / measured if measured else None,
+            "mean_s": hist.mean() * 1e-9,
+            "min_s": hist.min * 1e-9,
+            "max_s": hist.max * 1e-9,
+            **{f"{name}_s": value for name, value in _percentiles(hist).items()},
+            "steady_runs": steady.count if steady is not None else 0,
+            **{f"{name}_s": value for name, value in _percentiles(steady, "steady_").items()},
+            "changepoints": sum(1 for phase in phases[1:] if phase["phase"] == "transient"),
+            **_telemetry_columns(telemetry, key, hist),
+            "phases": phases,
+        })
+    return rows
+
+
+def build_report(rows, environment, plan=None, extra=None):
+    return {
+        "version": REPORT_VERSION,
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment,
+        "plan": plan,
+        **(extra or {}),
+        "results": rows,
+    }
+
+
+def write_json(report, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+def write_csv(rows, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,277 @@
+# =========================
+#   P-RAF: Append-only Result Log
+# =========================
+#
+# Every result the orchestrator ingests is appended to a session directory:
+#
+#   results/<session>/manifest.json                    language/algorithm id tables
+#   results/<session>/<lang_id>-<algo_id>-<seq>.seg    one stream of segments per key
+#
+# Segment names hold the manifest ids, not the names: 000-002-000001.seg is the
+# first segment of languages[0] / algorithms[2].
+#
+# A segment is a 16 byte header followed by fixed-width 32 byte records
+# (float64 timestamp, int64 duration_ns, uint16 lang id, uint16 algo id,
+# uint32 iterations - the batch size the per-iteration duration was measured over -
+# and float64 worker_timestamp). `timestamp` is the orchestrator's arrival time;
+# `worker_timestamp` is when the worker finished the sample, moved onto the
+# orchestrator's clock with the node's measured offset (see praf_clock.py), or
+# NaN for workers that do not send timestamps. Version 1 logs (24 byte records,
+# no worker_timestamp) can still be read.
+# Each (lang, algo) key gets its own segments, rotated by size. Because the
+# records of one key arrive in timestamp order, a reader can memory-map a
+# segment and answer key and time-range queries with plain slices - NumPy views
+# of the file, no copies.
+#
+# Writes only append to in-memory buffers on the event loop; a single
+# background thread moves them to disk, so disk latency never blocks ingest.
+
+import asyncio
+import json
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+MAGIC = b"PRAFLOG\0"
+FORMAT_VERSION = 2
+SEGMENT_HEADER = struct.Struct("<8sHH4x")
+RECORD = struct.Struct("<dqHHId")
+RECORD_V1 = struct.Struct("<dqHHI")
+NO_TIMESTAMP = float("nan")
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0
+MANIFEST_NAME = "manifest.json"
+
+
+def new_session_dir(root):
+    """Returns a fresh, timestamped session directory below `root`."""
+    return Path(root) / time.strftime("%Y%m%d-%H%M%S")
+
+
+class ResultLogWriter:
+    """Buffers results on the event loop and appends them to rotating segments."""
+
+    def __init__(self, directory, segment_bytes=DEFAULT_SEGMENT_BYTES, metadata=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = max(segment_bytes, SEGMENT_HEADER.size + RECORD.size)
+        self.metadata = dict(metadata or {})
+        self.languages = []
+        self.algorithms = []
+        self._lang_ids = {}
+        self._algo_ids = {}
+        self._buffers = {}
+        self._manifest_dirty = True
+        self._segments = {}  # (lang_id, algo_id) -> [sequence, bytes written]
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="praf-resultlog")
+
+    def _ids(self, lang, algo):
+        lang_id = self._lang_ids.get(lang)
+        if lang_id is None:
+            lang_id = self._lang_ids[lang] = len(self.languages)
+            self.languages.append(lang)
+            self._manifest_dirty = True
+        algo_id = self._algo_ids.get(algo)
+        if algo_id is None:
+            algo_id = self._algo_ids[algo] = len(self.algorithms)
+            self.algorithms.append(algo)
+            self._manifest_dirty = True
+        return lang_id, algo_id
+
+    def _buffer(self, key):
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = bytearray()
+        return buf
+
+    def append(self, lang, algo, timestamp, duration_ns, iterations=1, worker_timestamp=NO_TIMESTAMP):
+        """Appends one result (in memory only; see `flush`)."""
+        key = self._ids(lang, algo)
+        self._buffer(key).extend(RECORD.pack(timestamp, duration_ns, key[0], key[1], iterations, worker_timestamp))
+
+    def append_many(self, lang, algo, timestamp, durations_ns, iterations=None, worker_timestamps=None):
+        """Appends a group of results that arrived together."""
+        key = self._ids(lang, algo)
+        pack = RECORD.pack
+        lang_id, algo_id = key
+        if iterations is None:
+            iterations = repeat(1)
+        if worker_timestamps is None:
+            worker_timestamps = repeat(NO_TIMESTAMP)
+        self._buffer(key).extend(b"".join(
+            pack(timestamp, d, lang_id, algo_id, n, w) for d, n, w in zip(durations_ns, iterations, worker_timestamps)
+        ))
+
+    def set_metadata(self, **values):
+        """Adds session metadata to the manifest (e.g. the CPU core map)."""
+        self.metadata.update(values)
+        self._manifest_dirty = True
+
+    def _take_pending(self):
+        buffers, self._buffers = self._buffers, {}
+        manifest = None
+        if self._manifest_dirty:
+            manifest = {
+                "version": FORMAT_VERSION,
+                "record_size": RECORD.size,
+                "languages": list(self.languages),
+                "algorithms": list(self.algorithms),
+                "metadata": dict(self.metadata),
+            }
+            self._manifest_dirty = False
+        return buffers, manifest
+
+    async def flush(self):
+        """Hands the buffered records to the writer thread without blocking the loop."""
+        buffers, manifest = self._take_pending()
+        if buffers or manifest:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._write, buffers, manifest)
+
+    async def run(self, interval=DEFAULT_FLUSH_INTERVAL):
+        """Periodically flushes until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def close(self):
+        """Writes everything that is still buffered and stops the writer thread."""
+        buffers, manifest = self._take_pending()
+        self._executor.submit(self._write, buffers, manifest).result()
+        self._executor.shutdown(wait=True)
+
+    # --- Writer thread ---
+    def _segment_path(self, key, sequence):
+        return self.directory / f"{key[0]:03d}-{key[1]:03d}-{sequence:06d}.seg"
+
+    def _write(self, buffers, manifest):
+        if manifest is not None:
+            tmp = self.directory / (MANIFEST_NAME + ".tmp")
+            tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+            os.replace(tmp, self.directory / MANIFEST_NAME)
+        for key, data in buffers.items():
+            view = memoryview(data)
+            while view:
+                state = self._segments.get(key)
+                if state is None or state[1] + RECORD.size > self.segment_bytes:
+                    sequence = state[0] + 1 if state else 1
+                    with open(self._segment_path(key, sequence), "wb") as f:
+                        f.write(SEGMENT_HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size))
+                    state = self._segments[key] = [sequence, SEGMENT_HEADER.size]
+                room = (self.segment_bytes - state[1]) // RECORD.size * RECORD.size
+                chunk = view[:room]
+                with open(self._segment_path(key, state[0]), "ab") as f:
+                    f.write(chunk)
+                state[1] += len(chunk)
+                view = view[len(chunk):]
+
+
+def record_dtype(record_size=RECORD.size):
+    """The NumPy dtype matching RECORD (or RECORD_V1, by size)."""
+    import numpy as np
+    fields = [
+        ("timestamp", "<f8"),
+        ("duration_ns", "<i8"),
+        ("lang_id", "<u2"),
+        ("algo_id", "<u2"),
+        ("iterations", "<u4"),
+    ]
+    if record_size == RECORD.size:
+        fields.append(("worker_timestamp", "<f8"))
+    return np.dtype(fields)
+
+
+class ResultLogReader:
+    """Memory-maps the segments of a session and serves zero-copy queries (needs NumPy)."""
+
+    def __init__(self, directory):
+        try:
+            import numpy as np
+        except ImportError:
+            raise RuntimeError("Reading result logs requires NumPy (`pip install numpy`).") from None
+        self._np = np
+        self.directory = Path(directory)
+        manifest = json.loads((self.directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.record_size = manifest.get("record_size")
+        if self.record_size not in (RECORD.size, RECORD_V1.size):
+            raise ValueError(f"Unsupported record size in {self.directory}")
+        self.languages = manifest["languages"]
+        self.algorithms = manifest["algorithms"]
+        self.metadata = manifest.get("metadata", {})
+        self._dtype = record_dtype(self.record_size)
+        self._segments = {}  # (lang, algo) -> [memmap, ...] in sequence order
+        for path in sorted(self.directory.glob("*.seg")):
+            lang_id, algo_id, _ = (int(part) for part in path.stem.split("-"))
+            records = self._map(path)
+            if records is not None and len(records):
+                key = (self.languages[lang_id], self.algorithms[algo_id])
+                self._segments.setdefault(key, []).append(records)
+
+    def _map(self, path):
+        with open(path, "rb") as f:
+            magic, version, record_size = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+        if magic != MAGIC or record_size != self.record_size:
+            raise ValueError(f"{path} is not a P-RAF result segment")
+        count = (path.stat().st_size - SEGMENT_HEADER.size) // record_size
+        if not count:
+            return None
+        return self._np.memmap(path, dtype=self._dtype, mode="r", offset=SEGMENT_HEADER.size, shape=(count,))
+
+    def keys(self):
+        return sorted(self._segments)
+
+    def time_range(self):
+        """(first, last) timestamp over all segments, or (None, None) for an empty log."""
+        firsts = [segs[0]["timestamp"][0] for segs in self._segments.values()]
+        lasts = [segs[-1]["timestamp"][-1] for segs in self._segments.values()]
+        if not firsts:
+            return None, None
+        return float(min(firsts)), float(max(lasts))
+
+    def query(self, start=None, end=None, lang=None, algo=None):
+        """
+        Yields (lang, algo, records) for every matching segment.
+
+        `records` is a slice of the memory-mapped segment restricted to
+        start <= timestamp < end; no data is copied.
+        """
+        for (key_lang, key_algo), segments in sorted(self._segments.items()):
+            if lang is not None and key_lang != lang:
+                continue
+            if algo is not None and key_algo != algo:
+                continue
+            for records in segments:
+                timestamps = records["timestamp"]
+                if end is not None and timestamps[0] >= end:
+                    break
+                if start is not None and timestamps[-1] < start:
+                    continue
+                lo = 0 if start is None else int(self._np.searchsorted(timestamps, start, side="left"))
+                hi = len(records) if end is None else int(self._np.searchsorted(timestamps, end, side="left"))
+                if hi > lo:
+                    yield key_lang, key_algo, records[lo:hi]
+
+
+async def replay(reader, sink, speed=1.0, step=0.1):
+    """
+    Streams a recorded session back in (scaled) real time.
+
+    Every `step` wall-clock seconds the next `step * speed` seconds of recorded
+    results are handed to `sink(lang, algo, durations_ns, iterations)`.
+    """
+    start, last = reader.time_range()
+    if start is None:
+        return
+    loop = asyncio.get_running_loop()
+    cursor = start
+    next_tick = loop.time()
+    while cursor <= last:
+        window_end = cursor + step * speed
+        for lang, algo, records in reader.query(cursor, window_end):
+            sink(lang, algo, records["duration_ns"].tolist(), records["iterations"].clip(1).tolist())
+        cursor = window_end
+        next_tick += step
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
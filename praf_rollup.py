@@ -0,0 +1,108 @@
+# =========================
+#   P-RAF: Time-Series Rollups (late joiners, history requests)
+# =========================
+#
+# The broadcast loop hands every tick's deltas to a RollupStore. Per
+# (lang, algo) it keeps one fixed-size ring per resolution:
+#
+#   1 s  x 300 slots    the last 5 minutes
+#   10 s x 360 slots    the last hour
+#   60 s x 240 slots    the last 4 hours
+#
+# A slot holds count, sum, min and max of the runs whose tick fell into it
+# (the same fields as a `results` delta), in preallocated arrays: memory per
+# key is fixed no matter how long a run lasts. Slots are reused once their
+# time has passed the ring's reach, so reading a window never touches raw
+# samples and costs at most one pass over the ring.
+
+from array import array
+
+RESOLUTIONS = ((1, 300), (10, 360), (60, 240))  # (seconds per slot, slots kept)
+SNAPSHOT_HISTORY_SEC = 120  # History sent to a newly connected dashboard (finest resolution)
+
+
+class RollupRing:
+    """count/sum/min/max per time slot of one key at one resolution."""
+
+    __slots__ = ("resolution", "size", "latest", "slots", "counts", "sums", "mins", "maxs")
+
+    def __init__(self, resolution, size):
+        self.resolution = resolution
+        self.size = size
+        self.latest = -1                      # Newest slot number written
+        self.slots = array("q", [-1]) * size  # Slot number each position currently holds
+        self.counts = array("d", bytes(8 * size))
+        self.sums = array("d", bytes(8 * size))
+        self.mins = array("d", bytes(8 * size))
+        self.maxs = array("d", bytes(8 * size))
+
+    def add(self, timestamp, count, total, low, high):
+        slot = int(timestamp // self.resolution)
+        i = slot % self.size
+        if self.slots[i] != slot:
+            if slot < self.latest - self.size + 1:
+                return  # Older than anything the ring still holds
+            self.slots[i] = slot
+            self.counts[i], self.sums[i], self.mins[i], self.maxs[i] = count, total, low, high
+        else:
+            self.counts[i] += count
+            self.sums[i] += total
+            if low < self.mins[i]:
+                self.mins[i] = low
+            if high > self.maxs[i]:
+                self.maxs[i] = high
+        if slot > self.latest:
+            self.latest = slot
+
+    def window(self, start=None, end=None):
+        """[[slot start, count, sum, min, max], ...] of the non-empty slots in start <= t < end."""
+        if self.latest < 0:
+            return []
+        first = max(0, self.latest - self.size + 1)  # Unwritten positions hold slot -1
+        if start is not None:
+            first = max(first, int(start // self.resolution))
+        last = self.latest if end is None else min(self.latest, int(-(-end // self.resolution)) - 1)
+        points = []
+        for slot in range(first, last + 1):
+            i = slot % self.size
+            if self.slots[i] == slot:
+                points.append([slot * self.resolution, self.counts[i], self.sums[i], self.mins[i], self.maxs[i]])
+        return points
+
+
+class RollupStore:
+    """Rollup rings per (lang, algo), fed with the broadcast loop's per-tick deltas."""
+
+    def __init__(self, resolutions=RESOLUTIONS):
+        self.resolutions = tuple(resolutions)
+        self.series = {}  # (lang, algo) -> [RollupRing per resolution]
+
+    def add(self, deltas, timestamp):
+        """Folds one tick of {(lang, algo): [count, sum, min, max]} in."""
+        for key, (count, total, low, high) in deltas.items():
+            rings = self.series.get(key)
+            if rings is None:
+                rings = self.series[key] = [RollupRing(r, n) for r, n in self.resolutions]
+            for ring in rings:
+                ring.add(timestamp, count, total, low, high)
+
+    def pick_resolution(self, span):
+        """The finest resolution that still covers `span` seconds (the coarsest one otherwise)."""
+        for resolution, size in self.resolutions:
+            if resolution * size >= span:
+                return resolution
+        return self.resolutions[-1][0]
+
+    def window(self, resolution, start=None, end=None, lang=None, algo=None):
+        """[{"lang", "algo", "points"}] of all matching keys at one of the store's resolutions."""
+        try:
+            level = [r for r, _ in self.resolutions].index(resolution)
+        except ValueError:
+            raise ValueError(f"unknown resolution {resolution!r} (have {[r for r, _ in self.resolutions]})") from None
+        series = []
+        for (key_lang, key_algo), rings in sorted(self.series.items()):
+            if (lang is None or key_lang == lang) and (algo is None or key_algo == algo):
+                points = rings[level].window(start, end)
+                if points:
+                    series.append({"lang": key_lang, "algo": key_algo, "points": points})
+        return series
@@ -0,0 +1,205 @@
+# =========================
+#   P-RAF: Empirical Complexity Fitting (problem-size sweeps)
+# =========================
+#
+# Sized tests are recorded as "<algorithm>@<size>" keys (see praf_scheduler.py).
+# Per (series, algorithm) this takes the median time per element at every
+# measured size and fits a power law by least squares in log-log space:
+#
+#   t(n) = c * n^k        log t = log c + k * log n
+#
+# `exponent` k is the empirical complexity (1: linear, 2: quadratic, ...),
+# with its standard error and the fit's r^2. For every pair of series that
+# share an algorithm it reports the crossovers - the sizes where the faster
+# series changes - interpolated between measured sizes, plus the crossover
+# of the two fitted curves (flagged when it lies outside the measured range).
+#
+#   python praf_scaling.py REPORT.json          # --headless report
+#   python praf_scaling.py SESSION_DIR          # result log session (NumPy)
+#   python praf_scaling.py BASELINE [--json OUT]
+
+import argparse
+import json
+import math
+import sys
+from collections import namedtuple
+from itertools import combinations
+from pathlib import Path
+
+from praf_report import format_duration
+from praf_scheduler import SIZE_PARAMS, split_variant
+
+MIN_FIT_POINTS = 3  # Sizes needed for a fit (two points always fit perfectly)
+
+ScalingFit = namedtuple("ScalingFit", [
+    "lang", "algo", "param", "points", "exponent", "exponent_stderr", "coefficient", "r_squared",
+])
+Crossover = namedtuple("Crossover", [
+    "algo", "faster_below", "faster_above", "size", "method", "extrapolated",
+])
+
+
+# --- Inputs ---
+def medians_from_rows(rows):
+    """{(lang, algo): {size: median s per element}} from report rows (steady-state medians preferred)."""
+    medians = {}
+    for row in rows:
+        algo, size = split_variant(row["algo"])
+        median = row.get("steady_p50_s") or row.get("p50_s")
+        if size is not None and median:
+            medians.setdefault((row["lang"], algo), {})[size] = median / (row.get("elements") or 1)
+    return medians
+
+
+def medians_from_entries(entries):
+    """The same from praf_baseline entries (baselines, result log sessions)."""
+    medians = {}
+    for (lang, key), entry in entries.items():
+        algo, size = split_variant(key)
+        median = entry.histogram.quantile(0.5)
+        if size is not None and median:
+            medians.setdefault((lang, algo), {})[size] = median * 1e-9 / entry.elements
+    return medians
+
+
+# --- Fitting ---
+def fit_power_law(points):
+    """(exponent, its standard error, coefficient, r^2) of t = c * n^k over [(n, t), ...]."""
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(t) for _, t in points]
+    count = len(points)
+    mean_x, mean_y = sum(xs) / count, sum(ys) / count
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    residual = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys))
+    stderr = math.sqrt(residual / (count - 2) / sxx) if count > 2 else None
+    r_squared = 1 - residual / syy if syy else 1.0
+    return slope, stderr, math.exp(intercept), r_squared
+
+
+def fit_all(medians):
+    fits = []
+    for (lang, algo), by_size in sorted(medians.items()):
+        points = sorted(by_size.items())
+        if len(points) < MIN_FIT_POINTS:
+            continue
+        exponent, stderr, coefficient, r_squared = fit_power_law(points)
+        fits.append(ScalingFit(lang, algo, SIZE_PARAMS.get(algo), len(points), exponent, stderr, coefficient,
+                               r_squared))
+    return fits
+
+
+# --- Crossovers ---
+def measured_crossovers(algo, lang_a, points_a, lang_b, points_b):
+    """Sizes where the faster of two series changes, interpolated log-log between common sizes."""
+    common = sorted(set(points_a) & set(points_b))
+    ratios = [(n, math.log(points_a[n] / points_b[n])) for n in common]
+    crossovers = []
+    for (n0, r0), (n1, r1) in zip(ratios, ratios[1:]):
+        if r0 == 0 or (r0 < 0) == (r1 < 0):
+            continue
+        # The log ratio is linear in log n between the two sizes.
+        size = math.exp(math.log(n0) + (math.log(n1) - math.log(n0)) * r0 / (r0 - r1))
+        below, above = (lang_a, lang_b) if r0 < 0 else (lang_b, lang_a)
+        crossovers.append(Crossover(algo, below, above, size, "measured", False))
+    return crossovers
+
+
+def fitted_crossover(fit_a, fit_b, low, high):
+    """Size where the two fitted curves meet, or None if they are parallel."""
+    if math.isclose(fit_a.exponent, fit_b.exponent):
+        return None
+    size = math.exp((math.log(fit_b.coefficient) - math.log(fit_a.coefficient)) / (fit_a.exponent - fit_b.exponent))
+    # Below the crossover the series with the larger exponent is faster.
+    below, above = (fit_a, fit_b) if fit_a.exponent > fit_b.exponent else (fit_b, fit_a)
+    return Crossover(fit_a.algo, below.lang, above.lang, size, "fitted", not low <= size <= high)
+
+
+def crossovers(medians, fits):
+    fits_by_key = {(f.lang, f.algo): f for f in fits}
+    by_algo = {}
+    for lang, algo in medians:
+        by_algo.setdefault(algo, []).append(lang)
+    found = []
+    for algo, langs in sorted(by_algo.items()):
+        for lang_a, lang_b in combinations(sorted(langs), 2):
+            points_a, points_b = medians[(lang_a, algo)], medians[(lang_b, algo)]
+            found += measured_crossovers(algo, lang_a, points_a, lang_b, points_b)
+            fit_a, fit_b = fits_by_key.get((lang_a, algo)), fits_by_key.get((lang_b, algo))
+            if fit_a and fit_b:
+                sizes = sorted(set(points_a) | set(points_b))
+                crossover = fitted_crossover(fit_a, fit_b, sizes[0], sizes[-1])
+                if crossover:
+                    found.append(crossover)
+    return found
+
+
+def analyze(medians):
+    """{"fits": [...], "crossovers": [...]} as JSON-friendly dicts (None without sized results)."""
+    if not medians:
+        return None
+    fits = fit_all(medians)
+    return {
+        "points": {f"{lang}/{algo}": {str(n): t for n, t in sorted(by_size.items())}
+                   for (lang, algo), by_size in sorted(medians.items())},
+        "fits": [fit._asdict() for fit in fits],
+        "crossovers": [c._asdict() for c in crossovers(medians, fits)],
+    }
+
+
+# --- Output ---
+def print_scaling(analysis):
+    if not analysis:
+        return
+    print("\n--- Scaling (median time per element vs problem size) ---")
+    print(f"{'Language':<26} {'Algorithm':<22} {'Param':<10} {'Sizes':>5} {'Exponent':>13} {'r^2':>6} "
+          f"{'t(n) = c * n^k, c':>18}")
+    for fit in analysis["fits"]:
+        exponent = f"{fit['exponent']:.2f}"
+        if fit["exponent_stderr"] is not None:
+            exponent += f"±{fit['exponent_stderr']:.2f}"
+        print(f"{fit['lang']:<26} {fit['algo']:<22} {fit['param'] or '-':<10} {fit['points']:>5} "
+              f"{exponent:>13} {fit['r_squared']:>6.3f} "
+              f"{format_duration(fit['coefficient']):>18}")
+    for c in analysis["crossovers"]:
+        where = "fitted, extrapolated" if c["extrapolated"] else c["method"]
+        print(f"✂️  {c['algo']}: {c['faster_below']} faster below n ≈ {c['size']:.4g}, "
+              f"{c['faster_above']} above ({where})")
+
+
+def load_medians(source):
+    """Medians of a --headless report, a result log session or a baseline."""
+    path = Path(source)
+    if path.is_file() and path.suffix == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if "version" in data and isinstance(data.get("results"), list):  # praf_report.py report
+            return medians_from_rows(data["results"])
+    from praf_baseline import load_entries
+    return medians_from_entries(load_entries(source))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="P-RAF complexity fitting for problem-size sweeps")
+    parser.add_argument("source", help="--headless report JSON, result log session directory or baseline")
+    parser.add_argument("--json", metavar="PATH", help="also write the analysis as JSON")
+    args = parser.parse_args(argv)
+    try:
+        analysis = analyze(load_medians(args.source))
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+    if not analysis:
+        print("⚠️  No sized results (\"<algorithm>@<size>\" keys) to fit; run a plan with a \"sweep\".")
+        return 1
+    print_scaling(analysis)
+    if args.json:
+        Path(args.json).write_text(json.dumps(analysis, indent=2), encoding="utf-8")
+        print(f"📄 Scaling analysis written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
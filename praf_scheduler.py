@@ -0,0 +1,337 @@
+# =========================
+#   P-RAF: Test Plan Scheduler
+#   (RUN_TEST / SHUTDOWN control protocol, DESIGN_v2_0.md 5.1)
+# =========================
+#
+# A test plan is a JSON file:
+#
+#   {
+#     "mode": "sequential",            # or "concurrent"
+#     "warmup_sec": 5,                 # defaults for every test
+#     "measure_sec": 20,
+#     "languages": ["Python", "Rust"], # cross product with "algorithms" ...
+#     "algorithms": ["fibonacci"],
+#     "tests": [                       # ... unless tests are listed explicitly
+#       {"language": "Java", "algorithm": "matrix_multiplication",
+#        "warmup_sec": 15, "measure_sec": 60, "params": {"dimension": 100}},
+#       {"language": "Python", "algorithm": "game_of_life", "profile": true}
+#     ],
+#     "sweep": {                       # problem-size sweeps, appended to the tests
+#       "algorithms": ["matrix_multiplication", "array_sort"],
+#       "points": 5,                   # geometric sizes per algorithm
+#       "ranges": {"matrix_multiplication": {"min": 8, "max": 128}}
+#     }
+#   }
+#
+# With "profile" (per test or plan-wide), workers that support it sample the
+# algorithm's stacks during the measurement phase (PROFILE, see praf_profile.py).
+#
+# A test whose params set the algorithm's size param (SIZE_PARAMS) is recorded
+# under its own key, "<algorithm>@<size>" (e.g. "matrix_multiplication@64"),
+# so every size gets its own statistics, steady-state analysis and report row
+# (praf_scaling.py fits them). Such tests only run on workers that list the
+# param in their hello; the others would silently run their default size.
+#
+# Every test runs through a warmup and a measurement phase. Workers that
+# understand commands receive RUN_TEST over their existing TCP connection and
+# only run the requested algorithm; older workers keep running freely. Either
+# way the orchestrator only accepts results of a key while it is measuring, so
+# warmup samples never reach the dashboard or the statistics.
+
+import asyncio
+import json
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from praf_profile import profile_command
+
+PLAN_MODES = ("sequential", "concurrent")
+DEFAULT_WARMUP_SEC = 5.0
+DEFAULT_MEASURE_SEC = 20.0
+WORKER_WAIT_TIMEOUT = 30.0   # Seconds a test waits for a matching worker before it is skipped
+WORKER_POLL_INTERVAL = 0.25
+PROFILE_RESULT_TIMEOUT = 5.0 # Seconds SHUTDOWN waits for the data_profile answers of stopped profiles
+
+PHASE_WARMUP = "warmup"
+PHASE_MEASURE = "measure"
+PHASE_DONE = "done"
+PHASE_SKIPPED = "skipped"
+
+SHUTDOWN_COMMAND = {"command": "SHUTDOWN"}
+
+# Problem-size param of each algorithm (RUN_TEST params) and the default sweep range.
+SIZE_PARAMS = {
+    "array_sort": "length",
+    "fibonacci": "n",
+    "game_of_life": "grid",
+    "matrix_multiplication": "dimension",
+    "prime_factors": "max_value",
+}
+SWEEP_RANGES = {
+    "array_sort": (16, 16384),
+    "fibonacci": (16, 4096),
+    "game_of_life": (8, 128),
+    "matrix_multiplication": (8, 128),
+    "prime_factors": (1000, 1000000000),
+}
+DEFAULT_SWEEP_POINTS = 5
+VARIANT_SEPARATOR = "@"
+
+TestStep = namedtuple("TestStep", [
+    "test_id", "language", "algorithm", "warmup_sec", "measure_sec", "params", "profile", "variant"
+])
+
+
+class PlanError(ValueError):
+    """Raised for unreadable or invalid test plans."""
+
+
+def variant_name(algorithm, params):
+    """Key the results of a test are recorded under: "<algorithm>@<size>" if it sets the size param."""
+    param = SIZE_PARAMS.get(algorithm)
+    if param is None or params.get(param) is None:
+        return algorithm
+    return f"{algorithm}{VARIANT_SEPARATOR}{int(params[param])}"
+
+
+def split_variant(name):
+    """(algorithm, size or None) of a result key."""
+    algorithm, _, size = name.partition(VARIANT_SEPARATOR)
+    return algorithm, int(size) if size else None
+
+
+def geometric_sizes(low, high, points):
+    """`points` integer sizes from `low` to `high` (both included), evenly spaced on a log scale."""
+    if points < 2 or high <= low:
+        return [int(low)]
+    ratio = (high / low) ** (1 / (points - 1))
+    return sorted({round(low * ratio ** i) for i in range(points)})
+
+
+def sweep_tests(sweep, languages, algorithms):
+    """Expands a plan's "sweep" section into one test per language, algorithm and size."""
+    points = int(sweep.get("points", DEFAULT_SWEEP_POINTS))
+    ranges = sweep.get("ranges", {})
+    tests = []
+    for algo in sweep.get("algorithms", [a for a in algorithms if a in SIZE_PARAMS]):
+        if algo not in SIZE_PARAMS:
+            raise PlanError(f"Algorithm {algo!r} has no size param to sweep")
+        low, high = SWEEP_RANGES[algo]
+        custom = ranges.get(algo, {})
+        sizes = geometric_sizes(float(custom.get("min", low)), float(custom.get("max", high)),
+                                int(custom.get("points", points)))
+        for lang in sweep.get("languages", languages):
+            for size in sizes:
+                tests.append({"language": lang, "algorithm": algo, "params": {SIZE_PARAMS[algo]: size}})
+    return tests
+
+
+def load_plan(path, languages, algorithms):
+    """Reads a JSON test plan and returns (mode, [TestStep, ...])."""
+    try:
+        plan = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise PlanError(f"Cannot read test plan {path}: {e}") from None
+    if not isinstance(plan, dict):
+        raise PlanError(f"Test plan {path} must be a JSON object")
+    mode = plan.get("mode", "sequential")
+    if mode not in PLAN_MODES:
+        raise PlanError(f"Unknown plan mode {mode!r} (expected one of {', '.join(PLAN_MODES)})")
+
+    tests = plan.get("tests")
+    if tests is None and "sweep" not in plan:
+        tests = [
+            {"language": lang, "algorithm": algo}
+            for lang in plan.get("languages", languages)
+            for algo in plan.get("algorithms", algorithms)
+        ]
+    tests = list(tests or [])
+    if "sweep" in plan:
+        try:
+            tests += sweep_tests(plan["sweep"], plan.get("languages", languages), algorithms)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise PlanError(f"Invalid sweep in {path}: {e}") from None
+    prefix = plan.get("test_id", time.strftime("test-%Y%m%d-%H%M%S"))
+    steps = []
+    for index, test in enumerate(tests, 1):
+        try:
+            algorithm = str(test["algorithm"])
+            params = {**plan.get("params", {}), **test.get("params", {})}
+            steps.append(TestStep(
+                test_id=str(test.get("test_id", f"{prefix}-{index:03d}")),
+                language=str(test["language"]),
+                algorithm=algorithm,
+                warmup_sec=float(test.get("warmup_sec", plan.get("warmup_sec", DEFAULT_WARMUP_SEC))),
+                measure_sec=float(test.get("measure_sec", plan.get("measure_sec", DEFAULT_MEASURE_SEC))),
+                params=params,
+                profile=bool(test.get("profile", plan.get("profile", False))),
+                variant=variant_name(algorithm, params),
+            ))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise PlanError(f"Invalid test #{index} in {path}: {test!r}") from None
+    if not steps:
+        raise PlanError(f"Test plan {path} contains no tests")
+    if mode == "concurrent":
+        # One worker runs one size of an algorithm at a time.
+        keys = [(step.language, step.algorithm) for step in steps if step.variant != step.algorithm]
+        if len(keys) != len(set(keys)):
+            raise PlanError(f"Test plan {path}: sized tests of one language and algorithm need sequential mode")
+    return mode, steps
+
+
+def run_test_command(step):
+    """The RUN_TEST message for one step (DESIGN_v2_0.md 5.1)."""
+    return {
+        "command": "RUN_TEST",
+        "payload": {
+            "test_id": step.test_id,
+            "language": step.language,
+            "algorithm": step.algorithm,
+            "warmup_sec": step.warmup_sec,
+            "measure_sec": step.measure_sec,
+            "params": step.params,
+        },
+    }
+
+
+class Scheduler:
+    """
+    Runs a test plan against the connected worker sessions and gates ingest.
+
+    `sessions` is the orchestrator's live set of WorkerSession objects;
+    `notify(event)` is awaited for every phase change. With `profile_all`
+    every measurement phase is profiled, not only those of "profile" tests.
+    """
+
+    def __init__(self, mode, steps, sessions, notify, profile_all=False):
+        self.mode = mode
+        self.steps = steps
+        self.sessions = sessions
+        self.notify = notify
+        self.profile_all = profile_all
+        self.phases = {}         # (series, algo) -> (phase, test_id)
+        self.seen = set()        # Languages that sent results without a hello (legacy workers)
+        self.rejected = 0        # Results dropped because their key was not measuring
+        self.measured = {}       # (series, algo) -> seconds spent in measurement phases
+        self.outcomes = {}       # test_id -> final phase (done / skipped)
+        self.variants = {}       # (series, algo) -> key its results are recorded under (sized tests)
+        self.awaiting = set()    # (series, test_id) of stopped profiles whose data_profile is still out
+
+    def accepts(self, lang, algo):
+        """True if results of (lang, algo) belong to a measurement phase right now."""
+        state = self.phases.get((lang, algo))
+        if state is not None and state[0] == PHASE_MEASURE:
+            return True
+        self.rejected += 1
+        return False
+
+    def variant(self, lang, algo):
+        """The key accepted results of (lang, algo) are recorded under (see variant_name)."""
+        return self.variants.get((lang, algo), algo)
+
+    def profile_variant(self, lang, algo, test_id=None):
+        """The key a profile of (lang, algo) is filed under: the variant of the test that stopped it."""
+        for step in self.steps:
+            if step.test_id == test_id and step.algorithm == algo:
+                return step.variant
+        return self.variant(lang, algo)
+
+    def profile_received(self, lang, test_id):
+        """Notes the data_profile of series `lang` answering the stop of test `test_id` (None: any)."""
+        self.awaiting = {(l, t) for l, t in self.awaiting if l != lang or test_id not in (None, t)}
+
+    def note_legacy(self, lang):
+        """Remembers a language whose worker cannot be addressed (no hello, no commands)."""
+        self.seen.add(lang)
+
+    def _matching(self, step):
+        return [
+            s for s in self.sessions
+            if step.language in (s.language, s.lang) and step.algorithm in s.algorithms
+        ]
+
+    async def _wait_for_workers(self, step):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + WORKER_WAIT_TIMEOUT
+        while True:
+            sessions = self._matching(step)
+            if sessions or step.language in self.seen or loop.time() >= deadline:
+                return sessions
+            await asyncio.sleep(WORKER_POLL_INTERVAL)
+
+    async def _set_phase(self, step, series, phase):
+        for lang in series:
+            self.phases[(lang, step.algorithm)] = (phase, step.test_id)
+            if step.variant != step.algorithm:
+                self.phases[(lang, step.variant)] = (phase, step.test_id)
+        await self.notify({
+            "type": "test_phase",
+            "test_id": step.test_id,
+            "lang": step.language,
+            "algo": step.algorithm,
+            "variant": step.variant,
+            "series": sorted(series),
+            "phase": phase,
+            "timestamp": time.time(),
+        })
+
+    async def run_step(self, step):
+        sessions = await self._wait_for_workers(step)
+        legacy = step.language in self.seen
+        if step.variant != step.algorithm:
+            param = SIZE_PARAMS[step.algorithm]
+            unsized = [s for s in sessions if param not in s.params.get(step.algorithm, ())]
+            for session in unsized:
+                print(f"⚠️  {session.lang} worker does not support param {param!r} of {step.algorithm}; "
+                      f"skipping it for {step.test_id}.")
+            sessions = [s for s in sessions if s not in unsized]
+            legacy = False  # Workers without a hello cannot be sized either
+        if not sessions and not legacy:
+            self.outcomes[step.test_id] = PHASE_SKIPPED
+            await self._set_phase(step, [], PHASE_SKIPPED)
+            return
+        series = {s.lang for s in sessions}
+        if legacy:
+            series.add(step.language)
+        for lang in series:
+            self.variants[(lang, step.algorithm)] = step.variant
+        for session in sessions:
+            if session.controllable:
+                await session.send(run_test_command(step))
+        await self._set_phase(step, series, PHASE_WARMUP)
+        await asyncio.sleep(step.warmup_sec)
+        profiled = [
+            s for s in sessions if (step.profile or self.profile_all) and s.controllable and "PROFILE" in s.commands
+        ]
+        await self._set_phase(step, series, PHASE_MEASURE)
+        for session in profiled:
+            await session.send(profile_command("start", [step.algorithm]))
+        started = time.monotonic()
+        await asyncio.sleep(step.measure_sec)
+        for session in profiled:
+            self.awaiting.add((session.lang, step.test_id))
+            await session.send(profile_command("stop", [step.algorithm], plan_test_id=step.test_id))
+        await self._set_phase(step, series, PHASE_DONE)
+        elapsed = time.monotonic() - started
+        for lang in series:
+            key = (lang, step.variant)
+            self.measured[key] = self.measured.get(key, 0.0) + elapsed
+        self.outcomes[step.test_id] = PHASE_DONE
+
+    async def run(self):
+        """Runs all steps (one at a time or all at once), then shuts the workers down."""
+        if self.mode == "concurrent":
+            await asyncio.gather(*(self.run_step(step) for step in self.steps))
+        else:
+            for step in self.steps:
+                await self.run_step(step)
+        # Workers answer a profile stop asynchronously; SHUTDOWN would cut the last answers off.
+        deadline = time.monotonic() + PROFILE_RESULT_TIMEOUT
+        while self.awaiting and time.monotonic() < deadline:
+            connected = {s.lang for s in self.sessions}
+            self.awaiting = {(lang, test_id) for lang, test_id in self.awaiting if lang in connected}
+            await asyncio.sleep(WORKER_POLL_INTERVAL / 5)
+        for session in list(self.sessions):
+            if session.controllable:
+                await session.send(SHUTDOWN_COMMAND)
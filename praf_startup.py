@@ -0,0 +1,102 @@
+# =========================
+#   P-RAF: Synchronized Worker Startup (READY / START barrier)
+# =========================
+#
+# The orchestrator spawns all launched workers at once and holds them at a
+# start barrier: a worker that lists "START" in its hello's commands gets
+# "barrier": true in its hello_ack, initializes, connects and then sends
+#
+#   {"type": "ready", "payload": {"lang": "Python", "init_s": 0.41}}
+#
+# and keeps its algorithms idle. Once every spawned language is ready (or
+# exited, or STARTUP_TIMEOUT passed), START goes to all held workers in the
+# same instant, so no runtime measures while another one is still booting.
+# Under a test plan the first test also waits for the barrier.
+#
+# Spawn -> ready is kept per language as the startup metric. Launched workers
+# get the spawn time (time.monotonic(), system-wide on one host) in
+# PRAF_LAUNCH_MONOTONIC, so their own "init_s" covers interpreter startup too. Workers without
+# a hello cannot be held; their first result counts as ready. Workers that
+# connect after the release start right away and are marked "late".
+
+import asyncio
+import time
+
+STARTUP_TIMEOUT = 60.0       # Seconds to wait for all launched workers before releasing anyway
+STARTUP_POLL_INTERVAL = 0.02
+START_COMMAND = {"command": "START"}
+LAUNCH_TIME_ENV = "PRAF_LAUNCH_MONOTONIC"
+
+
+class StartupBarrier:
+    """Tracks spawn, connect and ready times of launched workers and releases them together."""
+
+    def __init__(self, timeout=STARTUP_TIMEOUT):
+        self.timeout = timeout
+        self.spawned = {}     # language -> (monotonic spawn time, Popen)
+        self.connected = {}   # language -> monotonic time of the first hello
+        self.ready = {}       # language -> (monotonic time, worker-reported payload, held)
+        self.held = []        # Sessions waiting for START
+        self.released_at = None
+
+    @property
+    def holding(self):
+        return self.released_at is None
+
+    def spawn(self, lang, proc):
+        self.spawned[lang] = (time.monotonic(), proc)
+
+    def connect(self, lang):
+        self.connected.setdefault(lang, time.monotonic())
+
+    def mark_ready(self, lang, info=None, held=False, session=None):
+        """Records that `lang` is ready; `held` if it stays idle until the release.
+
+        A `session` given while the barrier holds gets START on release.
+        """
+        if lang not in self.ready:
+            self.ready[lang] = (time.monotonic(), info or {}, held)
+        if session is not None and self.holding:
+            self.held.append(session)
+
+    def pending(self):
+        """Spawned languages that are neither ready nor exited."""
+        return [lang for lang, (_, proc) in self.spawned.items() if lang not in self.ready and proc.poll() is None]
+
+    async def release(self):
+        """Waits for every spawned worker (at most `timeout`), then sends START to all held workers at once.
+
+        Returns the languages that were still pending.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        while self.pending() and loop.time() < deadline:
+            await asyncio.sleep(STARTUP_POLL_INTERVAL)
+        late = self.pending()
+        self.released_at = time.monotonic()
+        held, self.held = self.held, []
+        await asyncio.gather(*(session.send(START_COMMAND) for session in held))
+        return late
+
+    def summary(self):
+        """Per language: spawn -> connect / ready, time held at the barrier, worker-side init time and status."""
+        result = {}
+        for lang in sorted(set(self.spawned) | set(self.ready)):
+            spawned = self.spawned.get(lang)
+            ready = self.ready.get(lang)
+            connected = self.connected.get(lang)
+            since = lambda t: round(t - spawned[0], 4) if spawned and t is not None else None  # noqa: E731
+            if ready is None:
+                status = "exited" if spawned and spawned[1].poll() is not None else "not ready"
+            elif self.released_at is not None and ready[0] > self.released_at:
+                status = "late"
+            else:
+                status = "held" if ready[2] else "unheld"
+            result[lang] = {
+                "spawn_to_connect_s": since(connected),
+                "spawn_to_ready_s": since(ready[0] if ready else None),
+                "held_s": round(self.released_at - ready[0], 4) if status == "held" else None,
+                "worker_init_s": ready[1].get("init_s") if ready else None,
+                "status": status,
+            }
+        return result
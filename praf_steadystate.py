@@ -0,0 +1,228 @@
+# =========================
+#   P-RAF: Steady-State & Changepoint Detection
+# =========================
+#
+# Runs once per broadcast tick on the aggregator's deltas. Every (lang, algo)
+# stream is cut into blocks of at least STEADY_BLOCK_RUNS runs; a block's mean
+# duration is the unit of analysis.
+#
+#   transient -> steady   the last STEADY_WINDOW block means have a coefficient
+#                         of variation below STEADY_CV_THRESHOLD and the two
+#                         halves of the window differ by less than
+#                         STEADY_DRIFT_THRESHOLD (JIT done, caches warm); the
+#                         steady phase starts with that window
+#   steady -> transient   a two-sided CUSUM on the block means, normalized by
+#                         the steady phase's mean and spread, exceeds
+#                         CUSUM_THRESHOLD (GC regime change, throttling, ...)
+#                         and the next block deviates the same way; a single
+#                         block that trips the alarm is an outlier and is
+#                         taken back out of the sums
+#
+# A stream whose measurement phase ended (test plans) is closed: its open block
+# and the partial tick that straddles the end are not analyzed, so the
+# truncated tail of a test cannot be mistaken for a changepoint.
+#
+# The statistics of a stream's steady phases are cut out of the aggregator's
+# cumulative histograms (weighted by iterations, and one count per timed
+# sample) with snapshots taken at block boundaries, so ingest does not do any
+# extra work.
+
+import math
+from collections import deque
+
+from praf_histogram import LogHistogram
+
+STEADY_BLOCK_RUNS = 10        # Minimum runs per block (slow algorithms span several ticks)
+STEADY_WINDOW = 10            # Blocks that must agree before a stream counts as steady
+STEADY_CV_THRESHOLD = 0.10    # Maximum coefficient of variation of the window's block means
+STEADY_DRIFT_THRESHOLD = 0.05 # Maximum relative difference between the window's halves (slow trends)
+CUSUM_DRIFT = 1.0             # Allowed drift k, in reference standard deviations (block means wander)
+CUSUM_THRESHOLD = 5.0         # Decision interval h, in reference standard deviations
+MIN_RELATIVE_SIGMA = 0.05     # Floor for the reference spread, relative to the mean (half the CV threshold)
+
+PHASE_TRANSIENT = "transient"
+PHASE_STEADY = "steady"
+
+
+def coefficient_of_variation(values):
+    mean = sum(values) / len(values)
+    if mean <= 0:
+        return math.inf
+    variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    return math.sqrt(variance) / mean
+
+
+def relative_drift(values):
+    """Relative difference between the means of the first and second half of `values`."""
+    half = len(values) // 2
+    first = sum(values[i] for i in range(half)) / half
+    second = sum(values[i] for i in range(half, len(values))) / (len(values) - half)
+    return abs(second - first) / first if first > 0 else math.inf
+
+
+def is_stable(values):
+    return coefficient_of_variation(values) < STEADY_CV_THRESHOLD and relative_drift(values) < STEADY_DRIFT_THRESHOLD
+
+
+class StreamState:
+    """Phase tracking for one (lang, algo) stream."""
+
+    def __init__(self, timestamp):
+        self.phase = PHASE_TRANSIENT
+        self.block_count = 0
+        self.block_sum = 0.0
+        self.means = deque(maxlen=STEADY_WINDOW)
+        # Copies of the cumulative (weighted, per-sample) histograms at the last
+        # STEADY_WINDOW + 1 block boundaries; the oldest marks where the current window starts.
+        self.snapshots = deque([(timestamp, (None, None))], maxlen=STEADY_WINDOW + 1)
+        self.steady_start = None     # (timestamp, snapshots) of the running steady phase
+        self.reference = None        # (mean, sigma) of the running steady phase
+        self.cusum_high = 0.0
+        self.cusum_low = 0.0
+        self.suspect = None          # (cusum_high, cusum_low, direction, mean) before/of a block that tripped the alarm
+        self.ended = False           # Measurement phase over: deltas are no longer analyzed
+        self.closed = (LogHistogram(), LogHistogram())  # Merged (weighted, per-sample) finished steady phases
+        self.phases = [{"phase": PHASE_TRANSIENT, "start": timestamp, "end": None}]
+
+    def _begin(self, phase, timestamp):
+        self.phases[-1]["end"] = timestamp
+        self.phases.append({"phase": phase, "start": timestamp, "end": None})
+        self.phase = phase
+
+    def close_block(self, histogram, timestamp, samples=None):
+        """Ends the current block; returns a phase-change event dict or None.
+
+        `samples` is the stream's per-sample histogram, if it keeps one.
+        """
+        mean = self.block_sum / self.block_count
+        self.block_count, self.block_sum = 0, 0.0
+        self.means.append(mean)
+        snapshot = (histogram.copy(), samples.copy() if samples is not None else None)
+        self.snapshots.append((timestamp, snapshot))
+
+        if self.phase == PHASE_TRANSIENT:
+            if len(self.means) == STEADY_WINDOW and is_stable(self.means):
+                start, start_snapshot = self.snapshots[0]
+                window_mean = sum(self.means) / len(self.means)
+                sigma = max(window_mean * coefficient_of_variation(self.means), window_mean * MIN_RELATIVE_SIGMA)
+                self.reference = (window_mean, sigma)
+                self.steady_start = (start, start_snapshot)
+                self.cusum_high = self.cusum_low = 0.0
+                self._begin(PHASE_STEADY, start)
+                return {"phase": PHASE_STEADY, "start": start, "mean": window_mean}
+            return None
+
+        reference_mean, sigma = self.reference
+        z = (mean - reference_mean) / sigma
+        if self.suspect is not None:
+            high, low, direction, suspect_mean = self.suspect
+            self.suspect = None
+            if z * direction > CUSUM_DRIFT:
+                return self._changepoint(reference_mean, suspect_mean, mean)
+            # The alarm block was an outlier: take it back out of the sums.
+            self.cusum_high, self.cusum_low = high, low
+        high = max(0.0, self.cusum_high + z - CUSUM_DRIFT)
+        low = max(0.0, self.cusum_low - z - CUSUM_DRIFT)
+        direction = 1 if high > CUSUM_THRESHOLD else -1 if low > CUSUM_THRESHOLD else 0
+        if direction:
+            self.suspect = (self.cusum_high, self.cusum_low, direction, mean)
+        self.cusum_high, self.cusum_low = high, low
+        return None
+
+    def _changepoint(self, reference_mean, suspect_mean, mean):
+        # The shift began with the suspect block: cut the steady phase at the boundary before it.
+        end, end_snapshot = self.snapshots[-3]
+        for closed, current, start in zip(self.closed, end_snapshot, self.steady_start[1]):
+            if current is not None:
+                closed.merge(current.since(start))
+        self.steady_start = self.reference = None
+        # Restart the window with both blocks of the new regime (and their three boundaries).
+        self.means.clear()
+        self.means.extend((suspect_mean, mean))
+        self.snapshots = deque(list(self.snapshots)[-3:], maxlen=STEADY_WINDOW + 1)
+        self._begin(PHASE_TRANSIENT, end)
+        return {
+            "phase": PHASE_TRANSIENT, "start": end, "changepoint": True,
+            "previous_mean": reference_mean, "mean": (suspect_mean + mean) / 2,
+        }
+
+    def end(self):
+        """The measurement phase is over: drop the open block and an unconfirmed alarm."""
+        self.ended = True
+        self.block_count, self.block_sum = 0, 0.0
+        self.suspect = None
+
+    def resume(self):
+        """A new measurement phase of the same stream begins."""
+        self.ended = False
+        self.block_count, self.block_sum = 0, 0.0
+
+    def steady_histogram(self, histogram, which=0):
+        """All steady-state values so far (finished phases plus the running one).
+
+        `which` selects the weighted (0) or the per-sample (1) histogram.
+        """
+        steady = self.closed[which].copy()
+        if self.steady_start is not None:
+            steady.merge(histogram.since(self.steady_start[1][which]))
+        return steady
+
+
+class SteadyStateDetector:
+    """Online steady-state / changepoint analysis over all (lang, algo) streams."""
+
+    def __init__(self):
+        self.streams = {}
+
+    def update(self, deltas, histograms, timestamp, samples=None):
+        """Feeds one tick of aggregator deltas; returns the phase-change events.
+
+        `samples` holds the aggregator's per-sample histograms, cut the same way.
+        """
+        events = []
+        for key, (count, total, _, _) in deltas.items():
+            state = self.streams.get(key)
+            if state is None:
+                state = self.streams[key] = StreamState(timestamp)
+            if state.ended:
+                continue
+            state.block_count += count
+            state.block_sum += total
+            if state.block_count < STEADY_BLOCK_RUNS:
+                continue
+            event = state.close_block(histograms[key], timestamp, samples.get(key) if samples else None)
+            if event is not None:
+                event.update(type="steady_state", lang=key[0], algo=key[1], timestamp=timestamp,
+                             index=len(state.phases) - 1)
+                events.append(event)
+        return events
+
+    def end(self, key):
+        """Closes `key` at the end of its measurement phase; later deltas (the partial last tick) are ignored."""
+        state = self.streams.get(key)
+        if state is not None:
+            state.end()
+
+    def resume(self, key):
+        """Re-opens a closed `key` when it is measured again."""
+        state = self.streams.get(key)
+        if state is not None:
+            state.resume()
+
+    def phase(self, key):
+        state = self.streams.get(key)
+        return state.phase if state else PHASE_TRANSIENT
+
+    def phases(self, key):
+        state = self.streams.get(key)
+        return [dict(p) for p in state.phases] if state else []
+
+    def steady_histogram(self, key, histogram, which=0):
+        """Steady-state-only histogram for `key`, or None before the stream first became steady.
+
+        With `which=1`, `histogram` is the key's per-sample histogram.
+        """
+        state = self.streams.get(key)
+        if state is None or (state.steady_start is None and not state.closed[0].count):
+            return None
+        return state.steady_histogram(histogram, which)
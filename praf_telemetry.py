@@ -0,0 +1,83 @@
+# =========================
+#   P-RAF: Runtime Telemetry (data_telemetry)
+# =========================
+#
+# Workers started with --telemetry (Python only, for now) attach resource data
+# to their results: GC collections and pause time, context switches, page
+# faults, peak allocation of an untimed probe call, and RSS / CPU time. Per
+# (lang, algo) this keeps the counter totals plus two histograms of the
+# samples worth explaining:
+#
+#   gc          samples during which a garbage collection ran
+#   scheduler   samples without a collection, but with an involuntary context
+#               switch or a major page fault (the OS took the core away)
+#
+# Both are weighted by iterations, like the aggregator's histograms, so they
+# can be held against its tail: `tail_attribution` tells which share of the
+# runs at or above p99 coincided with GC activity vs scheduler interference.
+
+from praf_histogram import LogHistogram
+
+TELEMETRY_COUNTERS = ("gc_collections", "gc_pause_ns", "nvcsw", "nivcsw", "minflt", "majflt")
+TAIL_QUANTILE = 0.99
+
+
+class TelemetryAggregator:
+    """Per-(lang, algo) telemetry totals and event histograms, per-series process stats."""
+
+    def __init__(self):
+        self.totals = {}      # (lang, algo) -> {counter: total, "samples": n}
+        self.alloc_peak = {}  # (lang, algo) -> latest peak allocation of one call (bytes)
+        self.events = {}      # (lang, algo) -> {"gc": LogHistogram, "scheduler": LogHistogram}
+        self.process = {}     # series -> latest {"rss_bytes", "cpu_user_s", "cpu_system_s"}
+
+    def add(self, lang, payload):
+        """Folds one `data_telemetry` payload of series `lang` in."""
+        if payload.get("process"):
+            self.process[lang] = payload["process"]
+        for result in payload["results"]:
+            key = (lang, result["algo"])
+            totals = self.totals.setdefault(key, dict.fromkeys(("samples", *TELEMETRY_COUNTERS), 0))
+            for field in totals:
+                totals[field] += int(result.get(field, 0))
+            if result.get("alloc_peak_bytes") is not None:
+                self.alloc_peak[key] = int(result["alloc_peak_bytes"])
+            events = self.events.setdefault(key, {"gc": LogHistogram(), "scheduler": LogHistogram()})
+            for duration_ns, iterations, gc_collections, _, nivcsw, majflt in result.get("events", ()):
+                if gc_collections:
+                    events["gc"].record(int(duration_ns), int(iterations))
+                elif nivcsw or majflt:
+                    events["scheduler"].record(int(duration_ns), int(iterations))
+
+    def tail_attribution(self, key, hist):
+        """Shares of the runs at or above p99 of `hist` that coincided with GC / scheduler events."""
+        events = self.events.get(key)
+        if events is None or not hist.count:
+            return None
+        threshold = hist.quantile(TAIL_QUANTILE)
+        tail = hist.count_at_least(threshold)
+        if not tail:
+            return None
+        return {
+            "p99_gc_share": min(1.0, events["gc"].count_at_least(threshold) / tail),
+            "p99_scheduler_share": min(1.0, events["scheduler"].count_at_least(threshold) / tail),
+        }
+
+    def summary(self, key, hist=None):
+        """Totals, allocation peak and (given the key's histogram) tail attribution of one key."""
+        if key not in self.totals:
+            return None
+        summary = {**self.totals[key], "alloc_peak_bytes": self.alloc_peak.get(key)}
+        if hist is not None:
+            summary.update(self.tail_attribution(key, hist) or {})
+        return summary
+
+    def to_dict(self, histograms):
+        """JSON-friendly state for the result log manifest and reports."""
+        return {
+            "results": {
+                f"{lang}/{algo}": self.summary((lang, algo), histograms.get((lang, algo)))
+                for lang, algo in sorted(self.totals)
+            },
+            "process": dict(self.process),
+        }
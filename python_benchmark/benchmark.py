@@ -2,35 +2,106 @@
 #   P-RAF: Python Benchmark Worker (Queue/Concurrent Version)
 # =========================
 
+import argparse
+import os
+import platform
+import signal
 import socket
+import sys
 import json
 import random
 import time
 import threading
-import queue
+from array import array
+from collections import deque
+from functools import partial
 
-ORCHESTRATOR_HOST = '127.0.0.1'
+import wire
+from execution import (
+    HOUSEKEEPING_CORES_ENV, MODES, WORKER_CORES_ENV, RunGate, assign_cores, cores_from_env, pin,
+    resolve_mode, start_processes
+)
+from profiler import PROFILE_INTERVAL, ProfileSwitch, StackSampler
+from sampling import ForwardedTally, SampleStore, bucket_layout
+from telemetry import TELEMETRY_FIELDS, AllocationProbe, SampleProbe, process_stats, summarize
+from timing import CALIBRATION_REPEATS, TARGET_SAMPLE_NS, AdaptiveTimer, Overhead, calibrate
+
+ORCHESTRATOR_HOST = '127.0.0.1'  # --host / --port for an orchestrator on another machine
 ORCHESTRATOR_PORT = 9000
+NODE_NAME = socket.gethostname()  # Node identity sent in the hello (--node)
+CLOCK_SKEW = 0.0  # Seconds added to this worker's wall clock (--clock-skew; tests offset correction)
 LANGUAGE_NAME = "Python"
+TEST_ID = f"{LANGUAGE_NAME.lower()}-{time.strftime('%Y%m%d-%H%M%S')}"
+BATCH_MAX_RESULTS = 500    # Send a data_batch once this many results are collected...
+BATCH_MAX_DELAY = 0.05     # ...or once the oldest collected result is this old (seconds)
+BATCH_POLL_INTERVAL = 0.005
+SNAPSHOT_INTERVAL = 1.0    # Seconds between checks for samples the rings overwrote
+CALIBRATION_REPORT_INTERVAL = 5.0  # Seconds between data_calibration messages (raw vs corrected durations)
+LAUNCH_TIME_ENV = "PRAF_LAUNCH_MONOTONIC"  # Orchestrator's time.monotonic() at spawn (same host)
+MODULE_LOADED = time.monotonic()  # Process start of workers launched by hand (no LAUNCH_TIME_ENV)
+WIRE_ENCODINGS = ("binary", "json")  # Preference order offered in the hello handshake
+HANDSHAKE_TIMEOUT = 2.0
+RECONNECT_DELAY = 0.1      # First retry after a failed connect; doubles up to RECONNECT_MAX_DELAY
+RECONNECT_MAX_DELAY = 2.0
+SHUTDOWN_FLUSH_TIMEOUT = 1.0  # Seconds SHUTDOWN waits for queued messages (e.g. a final profile)
+EXECUTION_MODE = "threads"  # Resolved at startup; see execution.py
+CALIBRATION = None          # Timer/loop overhead measured at startup; see timing.py
+INPUT_SEED = 42             # Same seed, same inputs on every run (--seed)
+INPUT_POOL_SIZE = 256       # Pre-generated inputs per algorithm; the timed loop cycles through them
+PROFILE = "python"          # Algorithm implementations: "python" or "numpy" (--profile)
+PROFILE_LANGUAGES = {"python": "Python", "numpy": "Python-NumPy"}
+ELEMENTS_PER_CALL = {}      # Problem instances each call processes; resolved with the profile
+TELEMETRY = False           # Per-sample GC / context switch / page fault data (--telemetry); see telemetry.py
+COMMANDS = ("RUN_TEST", "PROFILE", "PING", "START", "SHUTDOWN")  # Control commands this worker understands (DESIGN_v2_0.md 5.1)
 ALGORITHMS = [
     "array_sort", "fibonacci", "game_of_life",
     "matrix_multiplication", "prime_factors", "is_leap_year"
 ]
+ALGO_IDS = {name: algo_id for algo_id, name in enumerate(ALGORITHMS)}
+
+stores = {}                     # Algorithm name -> SampleStore (written by the algorithm only)
+tallies = {}                    # Algorithm name -> ForwardedTally (sender only)
+telemetry_samples = {}          # Algorithm name -> forwarded samples not yet summarized (sender only)
+calibration_marks = {}          # Algorithm name -> store counters at the last data_calibration (sender only)
+next_calibration_report = 0.0   # Monotonic time of the next data_calibration (sender only)
+algorithm_pids = []             # Algorithm processes (process mode), for RSS/CPU telemetry
+gates = {}                      # Algorithm name -> RunGate
+profiler = StackSampler()       # Stack sampler over the algorithm threads (thread modes)
+profile_switch = None           # Switch for the samplers of the algorithm processes (process mode)
+outbox = deque()                # Messages queued by the command reader, sent by the sender
+algorithm_cores = {}            # Algorithm name -> [core], when the orchestrator assigned cores
+housekeeping_cores = []         # Cores for the sender/collector threads
+shutdown_requested = threading.Event()
+
+# --- Algorithms (timed; each takes one pre-generated input) ---
+ARRAY_LENGTH = 40
+GRID_SIZE = 35
+GENERATIONS = 5
+MATRIX_SIZE = 50
+PRIME_MAX = 500000
 
-result_queue = queue.Queue(maxsize=1000)
+# RUN_TEST params each algorithm understands (DESIGN_v2_0.md 5.1), with their defaults.
+# The first one is its problem size, the one test plan sweeps vary.
+ALGORITHM_PARAMS = {
+    "array_sort": {"length": ARRAY_LENGTH},
+    "fibonacci": {"n": None},                # None: a mix of n in 20..35
+    "game_of_life": {"grid": GRID_SIZE},
+    "matrix_multiplication": {"dimension": MATRIX_SIZE},
+    "prime_factors": {"max_value": PRIME_MAX},
+    "is_leap_year": {},
+}
 
-def array_sort():
-    a = [random.randint(0, 99) for _ in range(40)]
+def array_sort(values):
+    a = list(values)
     a.sort()
 
-def fibonacci():
+def fibonacci(n):
     a, b = 0, 1
-    for _ in range(random.randint(20, 35)):
+    for _ in range(n):
         a, b = b, a + b
 
-def game_of_life():
-    w, h, g = 35, 35, 5
-    grid = [[random.randint(0, 1) for _ in range(h)] for _ in range(w)]
+def game_of_life(grid):
+    w, h, g = len(grid), len(grid[0]), GENERATIONS
     for _ in range(g):
         next_grid = [[0] * h for _ in range(w)]
         for x in range(w):
@@ -44,18 +115,16 @@ def game_of_life():
                 next_grid[x][y] = 1 if (il and (ln == 2 or ln == 3)) or (not il and ln == 3) else 0
         grid = next_grid
 
-def matrix_multiplication():
-    d = 50
-    a = [[random.randint(0, 9) for _ in range(d)] for _ in range(d)]
-    b = [[random.randint(0, 9) for _ in range(d)] for _ in range(d)]
+def matrix_multiplication(operands):
+    a, b = operands
+    d = len(a)
     res = [[0] * d for _ in range(d)]
     for i in range(d):
         for j in range(d):
             for k in range(d):
                 res[i][j] += a[i][k] * b[k][j]
 
-def prime_factors():
-    n = random.randint(100000, 500000)
+def prime_factors(n):
     d = 2
     fac = []
     while d * d <= n:
@@ -67,55 +136,535 @@ def prime_factors():
     if n > 1:
         fac.append(n)
 
-def is_leap_year():
-    y = random.randint(1, 9999)
+def is_leap_year(y):
     _ = (y % 4 == 0 and (y % 100 != 0 or y % 400 == 0))
 
-# Each algo thread: run forever, push result to queue
-def algo_worker(name, algo_func):
+# --- Input Pools (built before measuring, never inside the timed region) ---
+# Every algorithm gets its own RNG seeded with (seed, name), so a seed always
+# yields the same inputs. Values live in flat bytes/array buffers; the items the
+# algorithms receive are plain ints or zero-copy memoryview rows into them.
+
+def _rows(buffer, offset, count, width):
+    """Splits `count * width` values starting at `offset` into memoryview rows."""
+    return tuple(buffer[offset + r * width:offset + (r + 1) * width] for r in range(count))
+
+def array_sort_inputs(rng, size, params):
+    length = params["length"]
+    values = memoryview(bytes(rng.choices(range(100), k=size * length)))
+    return [values[i * length:(i + 1) * length] for i in range(size)]
+
+def fibonacci_inputs(rng, size, params):
+    n = params["n"]
+    return array("l", rng.choices(range(20, 36), k=size) if n is None else [n] * size)
+
+def game_of_life_inputs(rng, size, params):
+    n = params["grid"]
+    cells = n * n
+    grids = memoryview(bytes(rng.choices((0, 1), k=size * cells)))
+    return [_rows(grids, i * cells, n, n) for i in range(size)]
+
+def matrix_multiplication_inputs(rng, size, params):
+    n = params["dimension"]
+    cells = n * n
+    matrices = memoryview(bytes(rng.choices(range(10), k=size * 2 * cells)))
+    return [(_rows(matrices, 2 * i * cells, n, n), _rows(matrices, (2 * i + 1) * cells, n, n)) for i in range(size)]
+
+def prime_factors_inputs(rng, size, params):
+    high = params["max_value"]
+    return array("q", rng.choices(range(max(2, high // 5), high + 1), k=size))
+
+def is_leap_year_inputs(rng, size, params):
+    return array("H", rng.choices(range(1, 10000), k=size))
+
+PYTHON_ALGORITHMS = {
+    "array_sort": array_sort,
+    "fibonacci": fibonacci,
+    "game_of_life": game_of_life,
+    "matrix_multiplication": matrix_multiplication,
+    "prime_factors": prime_factors,
+    "is_leap_year": is_leap_year,
+}
+
+INPUT_BUILDERS = {
+    "array_sort": array_sort_inputs,
+    "fibonacci": fibonacci_inputs,
+    "game_of_life": game_of_life_inputs,
+    "matrix_multiplication": matrix_multiplication_inputs,
+    "prime_factors": prime_factors_inputs,
+    "is_leap_year": is_leap_year_inputs,
+}
+
+def load_profile(profile):
+    """Returns (algorithm functions, input builders, elements per call, pool size) of a profile."""
+    if profile == "numpy":
+        import numpy_algorithms as impl  # Only this profile needs NumPy
+        return impl.ALGORITHMS, impl.INPUT_BUILDERS, impl.ELEMENTS_PER_CALL, impl.POOL_SIZE
+    return PYTHON_ALGORITHMS, INPUT_BUILDERS, dict.fromkeys(PYTHON_ALGORITHMS, 1), INPUT_POOL_SIZE
+
+def algorithm_params(name, params=None):
+    """The defaults of ALGORITHM_PARAMS[name], overridden by the known keys of `params`."""
+    defaults = ALGORITHM_PARAMS[name]
+    unknown = set(params or ()) - set(defaults)
+    if unknown:
+        print(f"⚠️  {name} ignores unknown params: {', '.join(sorted(unknown))}")
+    return {**defaults, **{key: int(value) for key, value in (params or {}).items() if key in defaults}}
+
+def build_inputs(name, seed, profile="python", params=None):
+    """Deterministic input pool for one algorithm (and one set of params)."""
+    _, builders, _, size = load_profile(profile)
+    return builders[name](random.Random(f"{seed}:{name}"), size, algorithm_params(name, params))
+
+# Each algo thread: run in adaptive batches while its gate is open, record (ns per iteration, batch, timestamp)
+def algo_worker(name, algo_func, inputs):
+    pin(algorithm_cores.get(name))
+    profiler.register(name)
+    overhead = Overhead(CALIBRATION)
+    timer = AdaptiveTimer(algo_func, inputs, overhead)
+    gate = gates[name]
+    store = stores[name]
+    store.loop_overhead_ns.value = overhead.loop_ns
+    probe = SampleProbe() if TELEMETRY else None
+    allocations = AllocationProbe(algo_func, inputs) if TELEMETRY else None
     while True:
-        start = time.time()
-        algo_func()
-        duration = time.time() - start
-        result_queue.put({
+        gate.wait()
+        params = gate.new_params()
+        if params is not None:  # RUN_TEST with other params: new inputs, new batch size
+            inputs = build_inputs(name, INPUT_SEED, PROFILE, params)
+            timer = AdaptiveTimer(algo_func, inputs, overhead)
+            allocations = AllocationProbe(algo_func, inputs) if TELEMETRY else None
+        usage = probe.begin() if probe else None
+        duration_ns, iterations, raw_ns = timer.sample()
+        end = time.time()
+        if gate.measuring(end):  # Warmup samples are discarded
+            store.record(duration_ns, iterations, round(end * 1e9), probe.end(usage) if probe else (), raw_ns)
+            store.loop_overhead_ns.value = overhead.loop_ns
+            if allocations and allocations.due(end):
+                peak = allocations.run(end)
+                if peak is not None:
+                    store.alloc_peak_bytes.value = peak
+
+def forward(name, samples, batch):
+    """Adds drained samples to `batch` as (algo, ns per iteration, batch size, timestamp)."""
+    tallies[name].add(samples)
+    if TELEMETRY and samples:
+        telemetry_samples.setdefault(name, []).extend(samples)
+    batch.extend((name, duration_ns, iterations, timestamp_ns * 1e-9 + CLOCK_SKEW)
+                 for duration_ns, iterations, timestamp_ns, *_ in samples)
+
+def next_batch(until):
+    """Collects results until the batch is full, BATCH_MAX_DELAY passed since the first one,
+    or the monotonic time `until` is reached (the batch may then be empty)."""
+    batch = []
+    deadline = until
+    while True:
+        for name, store in stores.items():
+            room = BATCH_MAX_RESULTS - len(batch)
+            if room <= 0:
+                break
+            forward(name, store.ring.drain(limit=room), batch)
+        now = time.monotonic()
+        if batch and deadline == until:
+            deadline = min(until, now + BATCH_MAX_DELAY)
+        if len(batch) >= BATCH_MAX_RESULTS or now >= deadline:
+            return batch
+        time.sleep(BATCH_POLL_INTERVAL)
+
+def collect_unforwarded(batch):
+    """Accounts for samples the rings overwrote since the last call.
+
+    Drains each affected ring up to a consistent snapshot of its store (into
+    `batch`) and returns the histograms of the runs that never made it into a batch.
+    """
+    results = []
+    for name, store in stores.items():
+        tally = tallies[name]
+        if store.ring.overwritten == tally.overwritten:
+            continue
+        head, counts, total_ns = store.snapshot()
+        forward(name, store.ring.drain(until=head), batch)
+        histogram = tally.unforwarded(counts, total_ns)
+        overwritten, tally.overwritten = store.ring.overwritten - tally.overwritten, store.ring.overwritten
+        if histogram:
+            results.append({"algo": name, "overwritten": overwritten, "histogram": histogram})
+    return results
+
+def snapshot_message(results):
+    """A `data_snapshot` message: runs the orchestrator only gets as histograms."""
+    return {
+        "status": "success",
+        "type": "data_snapshot",
+        "payload": {"test_id": TEST_ID, "lang": LANGUAGE_NAME, "mode": EXECUTION_MODE, "results": results},
+    }
+
+def encode_batch(batch):
+    """Encodes collected results as one `data_batch` line (DESIGN_v2_0.md, 5.2)."""
+    return (json.dumps({
+        "status": "success",
+        "type": "data_batch",
+        "payload": {
+            "test_id": TEST_ID,
             "lang": LANGUAGE_NAME,
-            "algo": name,
-            "duration": duration
+            "mode": EXECUTION_MODE,
+            "results": [
+                {"algo": algo, "duration": duration_ns * 1e-9, "iterations": iterations, "timestamp": timestamp}
+                for algo, duration_ns, iterations, timestamp in batch
+            ]
+        }
+    }, separators=(",", ":")) + "\n").encode("utf-8")
+
+def telemetry_message():
+    """A `data_telemetry` message for the samples forwarded since the last one (plus RSS/CPU)."""
+    results = []
+    for name, samples in telemetry_samples.items():
+        peak = stores[name].alloc_peak_bytes.value
+        results.append({"algo": name, **summarize(samples), "alloc_peak_bytes": peak if peak >= 0 else None})
+    telemetry_samples.clear()
+    return {
+        "status": "success",
+        "type": "data_telemetry",
+        "payload": {
+            "test_id": TEST_ID, "lang": LANGUAGE_NAME, "mode": EXECUTION_MODE,
+            "process": process_stats(algorithm_pids), "results": results,
+        },
+    }
+
+def calibration_message():
+    """A `data_calibration` message: per algorithm, the overhead in use and, since the last one,
+    raw vs corrected ns per iteration and the samples dropped at the noise floor (None if nothing ran)."""
+    results = []
+    for name, store in stores.items():
+        current = (store.samples.value, store.iterations.value, store.total_ns.value, store.raw_total_ns.value,
+                   store.floor_samples.value)
+        samples, iterations, total_ns, raw_total_ns, floor = (
+            now - before for now, before in zip(current, calibration_marks.get(name, (0,) * len(current)))
+        )
+        if not samples and not floor:
+            continue
+        calibration_marks[name] = current
+        results.append({
+            "algo": name, "loop_overhead_ns": round(store.loop_overhead_ns.value, 2),
+            "samples": samples, "floor_samples": floor,
+            "raw_ns": round(raw_total_ns / iterations, 2) if iterations else None,
+            "corrected_ns": round(total_ns / iterations, 2) if iterations else None,
         })
+    if not results:
+        return None
+    return {
+        "status": "success",
+        "type": "data_calibration",
+        "payload": {
+            "test_id": TEST_ID, "lang": LANGUAGE_NAME, "mode": EXECUTION_MODE,
+            "timer_overhead_ns": CALIBRATION.timer_overhead_ns, "results": results,
+        },
+    }
+
+def next_messages(until):
+    """The next batch of records, followed by snapshot, calibration and telemetry messages when there are any."""
+    global next_calibration_report
+    batch = next_batch(until)
+    messages = []
+    if time.monotonic() >= until:
+        snapshot = collect_unforwarded(batch)  # May forward a few more records
+        if snapshot:
+            messages.append(("message", snapshot_message(snapshot)))
+        if time.monotonic() >= next_calibration_report:
+            next_calibration_report = time.monotonic() + CALIBRATION_REPORT_INTERVAL
+            calibration = calibration_message()
+            if calibration:
+                messages.append(("message", calibration))
+    if TELEMETRY and telemetry_samples:
+        messages.append(("message", telemetry_message()))
+    while outbox:
+        messages.append(("message", outbox.popleft()))
+    if batch:
+        messages.insert(0, ("batch", batch))
+    return messages
+
+def encode_message(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+def encode_batch_binary(batch):
+    """Encodes collected results as one RECORDS frame per algorithm."""
+    grouped = {}
+    for algo, duration_ns, iterations, timestamp in batch:
+        columns = grouped.get(algo)
+        if columns is None:
+            columns = grouped[algo] = ([], [], [])
+        columns[0].append(duration_ns)
+        columns[1].append(iterations)
+        columns[2].append(timestamp)
+    return b"".join(
+        wire.encode_records(ALGO_IDS[algo], durations, iterations, timestamps)
+        for algo, (durations, iterations, timestamps) in grouped.items()
+    )
+
+def runtime_info():
+    """Interpreter (and NumPy) versions, reported in the hello for run reports."""
+    info = {"implementation": platform.python_implementation(), "version": platform.python_version()}
+    if PROFILE == "numpy":
+        import numpy
+        info["numpy"] = numpy.__version__
+    return info
+
+def negotiate(sock, reader):
+    """Sends the hello handshake and returns the orchestrator's hello_ack ({} from older ones).
+
+    "encoding" is the agreed result encoding. "control" is true when the
+    orchestrator runs a test plan and will start algorithms with RUN_TEST;
+    "barrier" when it holds free-running workers until START. Otherwise
+    everything runs freely.
+    """
+    sock.sendall(wire.encode_hello(
+        LANGUAGE_NAME, ALGORITHMS, WIRE_ENCODINGS, mode=EXECUTION_MODE, node=NODE_NAME,
+        timing={"clock": "perf_counter_ns", "target_sample_ns": TARGET_SAMPLE_NS, **CALIBRATION._asdict()},
+        inputs={"seed": INPUT_SEED, "pool_size": INPUT_POOL_SIZE, "profile": PROFILE},
+        elements=ELEMENTS_PER_CALL,
+        histogram=bucket_layout(),
+        commands=list(COMMANDS),
+        params={name: list(ALGORITHM_PARAMS[name]) for name in ALGORITHMS},
+        telemetry=list(TELEMETRY_FIELDS) if TELEMETRY else None,
+        runtime=runtime_info(),
+        affinity={"algorithms": algorithm_cores, "housekeeping": housekeeping_cores} if algorithm_cores else None
+    ))
+    sock.settimeout(HANDSHAKE_TIMEOUT)
+    try:
+        reply = json.loads(reader.readline())
+        if reply.get("type") == "hello_ack":
+            return reply
+    except (OSError, ValueError):
+        pass  # Older orchestrators do not answer; stay on JSON lines.
+    finally:
+        sock.settimeout(None)
+    return {}
+
+def profile_message(counts, duration, plan_test_id=None):
+    """A `data_profile` message with the collapsed stacks of one finished profile."""
+    return {
+        "status": "success",
+        "type": "data_profile",
+        "payload": {
+            "test_id": TEST_ID, "lang": LANGUAGE_NAME, "mode": EXECUTION_MODE,
+            "plan_test_id": plan_test_id,
+            "interval": (profile_switch or profiler).interval,
+            "duration": round(duration, 3),
+            "results": [
+                {"algo": name, "samples": sum(stacks.values()), "stacks": stacks}
+                for name, stacks in counts.items() if stacks
+            ],
+        },
+    }
+
+def handle_profile(payload):
+    """PROFILE start/stop: sample the algorithm stacks; on stop, queue the counts for the sender."""
+    action = payload.get("action")
+    names = payload.get("algorithms")  # Default: all algorithms
+    if action == "start":
+        (profile_switch or profiler).start(float(payload.get("interval", PROFILE_INTERVAL)), names)
+        print(f"🔬 {LANGUAGE_NAME} profiler started ({', '.join(names) if names else 'all algorithms'}).")
+    elif action == "stop":
+        def finish(counts, duration):
+            outbox.append(profile_message(counts, duration, payload.get("plan_test_id")))
+            print(f"🔬 {LANGUAGE_NAME} profiler stopped after {duration:.1f}s.")
 
-# Sender thread: keep one socket, send all results, reconnect if needed
+        if profile_switch is not None:
+            profile_switch.stop(names, finish)  # Counts arrive on the collector thread; do not block the reader
+        else:
+            finish(*profiler.stop(names))
+    else:
+        raise ValueError(f"unknown PROFILE action {action!r}")
+
+def process_start():
+    """Monotonic time this worker was launched: the orchestrator's spawn time, else when this module loaded."""
+    launched = float(os.environ.get(LAUNCH_TIME_ENV) or "inf")
+    return launched if launched <= MODULE_LOADED else MODULE_LOADED
+
+def ready_message():
+    """Sent once inputs are built and the connection is up; the orchestrator's barrier waits for it."""
+    return {"type": "ready", "payload": {
+        "lang": LANGUAGE_NAME, "mode": EXECUTION_MODE, "pid": os.getpid(),
+        "init_s": round(time.monotonic() - process_start(), 4),
+    }}
+
+def wall_clock():
+    """This worker's wall clock (time.time(), shifted by --clock-skew), as used for result timestamps."""
+    return time.time() + CLOCK_SKEW
+
+def pong_message(payload, received):
+    """The answer to PING: the orchestrator's send time plus our receive and send times."""
+    return {"type": "pong", "payload": {**payload, "t1": received, "t2": wall_clock()}}
+
+def handle_command(message, reply=None):
+    """Applies one orchestrator command (RUN_TEST / PROFILE / PING / START / SHUTDOWN).
+
+    `reply` sends a message right away, bypassing the result queue (PING).
+    """
+    command = message.get("command")
+    if command == "PING":
+        received = wall_clock()
+        if reply is not None:
+            reply(pong_message(message["payload"], received))
+    elif command == "RUN_TEST":
+        payload = message["payload"]
+        gate = gates.get(payload["algorithm"])
+        if gate is None:
+            print(f"⚠️  {LANGUAGE_NAME} worker cannot run unknown algorithm {payload['algorithm']!r}.")
+            return
+        params = payload.get("params") or {}
+        gate.open(float(payload.get("warmup_sec", 0)), float(payload["measure_sec"]), params)
+        print(f"🧪 {payload.get('test_id')}: {payload['algorithm']}{f' {params}' if params else ''} "
+              f"(warmup {payload.get('warmup_sec', 0)}s, measure {payload['measure_sec']}s)")
+    elif command == "START":
+        for gate in gates.values():
+            gate.open_forever()
+        print(f"🏁 {LANGUAGE_NAME} worker released by the startup barrier.")
+    elif command == "PROFILE":
+        handle_profile(message.get("payload") or {})
+    elif command == "SHUTDOWN":
+        print(f"🛑 {LANGUAGE_NAME} worker received SHUTDOWN.")
+        shutdown_requested.set()
+    else:
+        print(f"⚠️  {LANGUAGE_NAME} worker ignoring unknown command {command!r}.")
+
+# Command reader: one per connection, ends when the connection does
+def command_reader(reader, reply):
+    try:
+        for line in reader:
+            try:
+                handle_command(json.loads(line), reply)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                print(f"⚠️  {LANGUAGE_NAME} worker got a malformed command ({e}): {line[:200]!r}")
+    except (OSError, ValueError):
+        pass  # Socket closed; the sender reconnects
+
+def send_now(sock, lock, encode, message):
+    """Writes one message between the sender's writes (failures surface in the sender)."""
+    try:
+        with lock:
+            sock.sendall(encode(message))
+    except OSError:
+        pass
+
+# Sender thread: keep one socket, send batches of results, reconnect if needed.
+# While it is disconnected the algorithms keep recording; the rings overwrite
+# their oldest samples and the next snapshot accounts for them.
 def sender():
+    pin(housekeeping_cores)  # Keep I/O off the measurement cores
+    tallies.update((name, ForwardedTally()) for name in stores)
+    pending = []  # (kind, data) messages not sent yet; retried after reconnecting
+    next_snapshot = time.monotonic() + SNAPSHOT_INTERVAL
+    retry_delay = RECONNECT_DELAY
     while True:
         try:
             with socket.create_connection((ORCHESTRATOR_HOST, ORCHESTRATOR_PORT)) as sock:
-                sock_file = sock.makefile("w", encoding="utf-8", newline="\n")
-                print(f"✅ Python sender connected to orchestrator.")
+                retry_delay = RECONNECT_DELAY
+                reader = sock.makefile("rb")
+                ack = negotiate(sock, reader)
+                encoding, control, barrier = ack.get("encoding", "json"), ack.get("control"), ack.get("barrier")
+                if encoding == "binary":
+                    encoders = {"batch": encode_batch_binary, "message": wire.encode_json}
+                else:
+                    encoders = {"batch": encode_batch, "message": encode_message}
+                if not control and not barrier:
+                    for gate in gates.values():
+                        gate.open_forever()
+                send_lock = threading.Lock()  # Shared with the command reader's replies
+                reply = partial(send_now, sock, send_lock, encoders["message"])
+                threading.Thread(target=command_reader, args=(reader, reply), daemon=True).start()
+                if ack:
+                    reply(ready_message())
+                waiting = ", waiting for RUN_TEST" if control else ", waiting for START" if barrier else ""
+                print(f"✅ {LANGUAGE_NAME} sender connected to orchestrator ({encoding} encoding{waiting}).")
                 while True:
-                    result = result_queue.get()
+                    if not pending:
+                        pending = next_messages(next_snapshot)
+                        if time.monotonic() >= next_snapshot:
+                            next_snapshot = time.monotonic() + SNAPSHOT_INTERVAL
                     try:
-                        sock_file.write(json.dumps(result) + "\n")
-                        sock_file.flush()
+                        while pending:
+                            kind, data = pending[0]
+                            encoded = encoders[kind](data)
+                            with send_lock:
+                                sock.sendall(encoded)
+                            pending.pop(0)
                     except Exception as e:
-                        print(f"⚠️  Python sender write error: {e}. Reconnecting...")
+                        print(f"⚠️  {LANGUAGE_NAME} sender write error: {e}. Reconnecting...")
                         break  # Will reconnect outer loop
         except Exception as e:
-            print(f"⚠️  Python sender connect error: {e}. Retrying in 2s...")
-            time.sleep(2)
+            print(f"⚠️  {LANGUAGE_NAME} sender connect error: {e}. Retrying in {retry_delay:g}s...")
+            time.sleep(retry_delay)
+            retry_delay = min(2 * retry_delay, RECONNECT_MAX_DELAY)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="P-RAF Python benchmark worker")
+    parser.add_argument("--mode", choices=MODES, default="threads",
+                        help="how algorithms run concurrently (default: threads)")
+    parser.add_argument("--seed", type=int, default=INPUT_SEED,
+                        help=f"seed for the pre-generated algorithm inputs (default: {INPUT_SEED})")
+    parser.add_argument("--profile", choices=sorted(PROFILE_LANGUAGES), default=PROFILE,
+                        help="pure-Python or vectorized NumPy algorithms (default: python)")
+    parser.add_argument("--telemetry", action="store_true",
+                        help="attach GC, context switch, page fault, allocation and RSS data to the results")
+    parser.add_argument("--host", default=ORCHESTRATOR_HOST,
+                        help=f"orchestrator address (default: {ORCHESTRATOR_HOST})")
+    parser.add_argument("--port", type=int, default=ORCHESTRATOR_PORT,
+                        help=f"orchestrator worker port (default: {ORCHESTRATOR_PORT})")
+    parser.add_argument("--node", default=NODE_NAME,
+                        help="node identity reported to the orchestrator (default: the host name)")
+    parser.add_argument("--clock-skew", type=float, default=CLOCK_SKEW, metavar="SECONDS",
+                        help="shift this worker's clock, to test offset correction with several local 'nodes'")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    print("✅ Starting P-RAF Python worker (queue version)...")
-    algo_funcs = [
-        array_sort, fibonacci, game_of_life,
-        matrix_multiplication, prime_factors, is_leap_year
-    ]
-    # Algo threads
-    threads = []
-    for name, func in zip(ALGORITHMS, algo_funcs):
-        t = threading.Thread(target=algo_worker, args=(name, func), daemon=True)
-        t.start()
-        threads.append(t)
-    # Sender thread
+    args = parse_args()
+    EXECUTION_MODE = resolve_mode(args.mode)
+    INPUT_SEED = args.seed
+    PROFILE = args.profile
+    TELEMETRY = args.telemetry
+    ORCHESTRATOR_HOST, ORCHESTRATOR_PORT = args.host, args.port
+    NODE_NAME, CLOCK_SKEW = args.node, args.clock_skew
+    LANGUAGE_NAME = PROFILE_LANGUAGES[PROFILE]
+    TEST_ID = f"{LANGUAGE_NAME.lower()}-{time.strftime('%Y%m%d-%H%M%S')}"
+    try:
+        algorithm_impls, _, ELEMENTS_PER_CALL, INPUT_POOL_SIZE = load_profile(PROFILE)
+    except ImportError as e:
+        print(f"❌ ERROR: The {PROFILE} profile needs an extra package ({e}). Try `pip install numpy`.")
+        sys.exit(1)
+    print(f"✅ Starting P-RAF {LANGUAGE_NAME} worker ({EXECUTION_MODE} mode, node {NODE_NAME})...")
+    CALIBRATION = calibrate()
+    print(f"⏱️  Calibrated: timer overhead {CALIBRATION.timer_overhead_ns} ns, "
+          f"loop overhead {CALIBRATION.loop_overhead_ns:.1f} ns/iteration "
+          f"(median of {CALIBRATION_REPEATS}, spread {CALIBRATION.loop_overhead_spread_ns:.1f} ns)")
+    algo_funcs = [algorithm_impls[name] for name in ALGORITHMS]
+    # Algorithms stay idle until the orchestrator either starts a test or lets them run freely.
+    gates.update((name, RunGate()) for name in ALGORITHMS)
+    stores.update((name, SampleStore(extra_fields=len(TELEMETRY_FIELDS) if TELEMETRY else 0)) for name in ALGORITHMS)
+    algorithm_cores.update(assign_cores(ALGORITHMS, cores_from_env(WORKER_CORES_ENV)))
+    housekeeping_cores.extend(cores_from_env(HOUSEKEEPING_CORES_ENV))
+    if algorithm_cores:
+        print(f"📌 Algorithm cores: {algorithm_cores}, housekeeping: {housekeeping_cores or 'unpinned'}")
+    if EXECUTION_MODE == "processes":
+        # Let SIGTERM from the orchestrator run the normal exit path, which
+        # terminates the daemonic algorithm processes as well.
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        profile_switch = ProfileSwitch(ALGORITHMS)
+        # Each process builds its own pool from the seed (same inputs as in thread mode).
+        algorithm_pids.extend(start_processes(
+            ((name, func, partial(build_inputs, name, INPUT_SEED, PROFILE)) for name, func in zip(ALGORITHMS, algo_funcs)),
+            CALIBRATION, gates, stores, algorithm_cores, TELEMETRY, profile_switch
+        ))
+    else:
+        # Algo threads (inputs are generated up front, before any timing starts)
+        pools = [build_inputs(name, INPUT_SEED, PROFILE) for name in ALGORITHMS]
+        print(f"🎲 Built input pools ({INPUT_POOL_SIZE} inputs per algorithm, seed {INPUT_SEED}).")
+        for name, func, inputs in zip(ALGORITHMS, algo_funcs, pools):
+            t = threading.Thread(target=algo_worker, args=(name, func, inputs), daemon=True)
+            t.start()
+    # Sender thread; the main thread waits for SHUTDOWN (or a signal)
     s = threading.Thread(target=sender, daemon=True)
     s.start()
-    for t in threads:
-        t.join()
+    shutdown_requested.wait()
+    flush_deadline = time.monotonic() + SHUTDOWN_FLUSH_TIMEOUT
+    while (outbox or (profile_switch is not None and profile_switch.collecting)) and time.monotonic() < flush_deadline:
+        time.sleep(BATCH_POLL_INTERVAL)
+    time.sleep(2 * BATCH_MAX_DELAY)  # Let the sender finish writing what it took from the outbox
+    print(f"✅ {LANGUAGE_NAME} worker shut down.")
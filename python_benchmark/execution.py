@@ -0,0 +1,178 @@
+# =========================
+#   P-RAF: Python Worker Execution Modes
+# =========================
+#
+#   threads        one threading.Thread per algorithm (GIL-bound on CPython)
+#   processes      one multiprocessing.Process per algorithm; samples travel
+#                  through a shared-memory SampleStore, never through pickling
+#   free-threaded  threads on an interpreter running without the GIL (3.13t+)
+
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+from telemetry import AllocationProbe, SampleProbe
+from timing import AdaptiveTimer, Overhead
+
+MODES = ("threads", "processes", "free-threaded")
+
+PARENT_CHECK_INTERVAL = 1.0    # Seconds between orphan checks in child processes
+GATE_POLL_INTERVAL = 0.05      # Seconds an idle algorithm waits before checking its gate again
+WORKER_CORES_ENV = "PRAF_WORKER_CORES"            # Set by the orchestrator's --pin-cores
+HOUSEKEEPING_CORES_ENV = "PRAF_HOUSEKEEPING_CORES"
+
+
+def gil_disabled():
+    """True when running on a free-threaded interpreter with the GIL switched off."""
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check is not None and not check()
+
+
+def resolve_mode(requested):
+    """Returns the mode that will actually run (and is reported with every result)."""
+    if requested == "free-threaded" and not gil_disabled():
+        print("⚠️  Free-threaded mode needs a GIL-free interpreter (e.g. python3.13t). Falling back to threads.")
+        return "threads"
+    if requested == "threads" and gil_disabled():
+        return "free-threaded"
+    return requested
+
+
+# --- CPU Placement ---
+def cores_from_env(name):
+    """Parses a comma-separated core list from the environment ([] if unset)."""
+    return [int(core) for core in os.environ.get(name, "").split(",") if core.strip()]
+
+
+def assign_cores(names, cores):
+    """One core per algorithm, round-robin over `cores` ({} without cores)."""
+    if not cores:
+        return {}
+    return {name: [cores[i % len(cores)]] for i, name in enumerate(names)}
+
+
+def pin(cores):
+    """Restricts the calling thread (on Linux affinity is per thread) to `cores`."""
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, cores)
+        return True
+    except OSError:
+        return False
+
+
+class RunGate:
+    """
+    When one algorithm may run, from when on its samples count, and with which params.
+
+    The orchestrator's RUN_TEST opens the gate for a warmup plus a measurement
+    window; samples that finish during warmup are discarded by the caller.
+    Both values live in shared memory, so threads and processes see updates.
+    Params that differ from the previous test's go through a queue; the
+    algorithm picks them up with `new_params()` and rebuilds its inputs while
+    the warmup runs.
+    """
+
+    def __init__(self):
+        self.measure_from = multiprocessing.RawValue("d", math.inf)
+        self.until = multiprocessing.RawValue("d", 0.0)  # Closed until opened
+        self.params_version = multiprocessing.RawValue("q", 0)
+        self._params = multiprocessing.SimpleQueue()
+        self._published = {}  # Opener side: params of the last RUN_TEST ({} = defaults)
+        self._seen = 0        # Algorithm side: params versions consumed
+
+    def open(self, warmup_sec, measure_sec, params=None):
+        params = params or {}
+        if params != self._published:
+            self._published = params
+            self._params.put(params)
+            self.params_version.value += 1
+        now = time.time()
+        self.measure_from.value = now + warmup_sec
+        self.until.value = now + warmup_sec + measure_sec
+
+    def open_forever(self):
+        """Free-running mode for orchestrators without a test plan."""
+        self.measure_from.value = 0.0
+        self.until.value = math.inf
+
+    def wait(self):
+        """Blocks while the gate is closed."""
+        while time.time() >= self.until.value:
+            time.sleep(GATE_POLL_INTERVAL)
+
+    def measuring(self, timestamp):
+        return self.measure_from.value <= timestamp < self.until.value
+
+    def new_params(self):
+        """The latest params published since the last call (algorithm side), or None."""
+        version = self.params_version.value
+        params = None
+        while self._seen < version:
+            params = self._params.get()
+            self._seen += 1
+        return params
+
+
+def process_algo_main(name, algo_func, make_inputs, calibration, gate, store, parent_pid, cores=None,
+                      telemetry=False, profile_switch=None):
+    """Entry point of an algorithm process: time the algorithm while its gate is open, record into its store."""
+    pin(cores)
+    if profile_switch is not None:
+        profile_switch.follow(name)
+    # Inputs are built here rather than pickled over: pools can be megabytes.
+    inputs = make_inputs()
+    overhead = Overhead(calibration)
+    timer = AdaptiveTimer(algo_func, inputs, overhead)
+    store.loop_overhead_ns.value = overhead.loop_ns
+    probe = SampleProbe() if telemetry else None
+    allocations = AllocationProbe(algo_func, inputs) if telemetry else None
+    next_parent_check = time.time() + PARENT_CHECK_INTERVAL
+    while True:
+        if time.time() >= gate.until.value:
+            time.sleep(GATE_POLL_INTERVAL)
+            end = time.time()
+        else:
+            params = gate.new_params()
+            if params is not None:  # RUN_TEST with other params: new inputs, new batch size
+                inputs = make_inputs(params=params)
+                timer = AdaptiveTimer(algo_func, inputs, overhead)
+                allocations = AllocationProbe(algo_func, inputs) if telemetry else None
+            usage = probe.begin() if probe else None
+            duration_ns, iterations, raw_ns = timer.sample()
+            end = time.time()
+            if gate.measuring(end):
+                store.record(duration_ns, iterations, round(end * 1e9), probe.end(usage) if probe else (), raw_ns)
+                store.loop_overhead_ns.value = overhead.loop_ns
+                if allocations and allocations.due(end):
+                    peak = allocations.run(end)
+                    if peak is not None:
+                        store.alloc_peak_bytes.value = peak
+        if end >= next_parent_check:
+            # Exit when the worker that started us is gone (e.g. force-killed).
+            if os.getppid() != parent_pid:
+                return
+            next_parent_check = end + PARENT_CHECK_INTERVAL
+
+
+def start_processes(algorithms, calibration, gates, stores, cores=None, telemetry=False, profile_switch=None):
+    """Starts one process per (name, func, make_inputs), recording into `stores[name]`; returns their pids.
+
+    `cores` optionally maps algorithm names to the cores their process is pinned to;
+    `profile_switch` (profiler.ProfileSwitch) lets the PROFILE command sample them.
+    """
+    cores = cores or {}
+    pids = []
+    for name, func, make_inputs in algorithms:
+        proc = multiprocessing.Process(
+            target=process_algo_main,
+            args=(name, func, make_inputs, calibration, gates[name], stores[name], os.getpid(), cores.get(name),
+                  telemetry, profile_switch),
+            name=f"praf-{name}", daemon=True
+        )
+        proc.start()
+        pids.append(proc.pid)
+    return pids
@@ -0,0 +1,121 @@
+# =========================
+#   P-RAF: Python-NumPy Worker Profile
+# =========================
+#
+# The same six algorithms, vectorized with NumPy. Each call processes a whole
+# batch of problem instances (ELEMENTS_PER_CALL of them: years, numbers,
+# arrays, grids or matrix pairs), so the per-element time can be compared
+# directly with the pure-Python profile, which handles one instance per call.
+
+import numpy as np
+
+POOL_SIZE = 16  # Pre-generated calls per algorithm (each call is already a large batch)
+POOL_BYTES = 64 << 20  # Large problem sizes get fewer pre-generated calls (at least 2)
+
+GENERATIONS = 5
+
+ELEMENTS_PER_CALL = {
+    "array_sort": 1024,
+    "fibonacci": 4096,
+    "game_of_life": 16,
+    "matrix_multiplication": 16,
+    "prime_factors": 1024,
+    "is_leap_year": 4096,
+}
+
+NEIGHBOUR_OFFSETS = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if not (i == 0 and j == 0)]
+
+
+# --- Algorithms (timed; each takes one batch of inputs) ---
+def array_sort(arrays):
+    np.sort(arrays, axis=1)
+
+def fibonacci(ns):
+    a = np.zeros(len(ns), dtype=np.int64)
+    b = np.ones(len(ns), dtype=np.int64)
+    for i in range(int(ns.max())):
+        active = ns > i
+        a, b = np.where(active, b, a), np.where(active, a + b, b)
+
+def game_of_life(grids):
+    for _ in range(GENERATIONS):
+        neighbours = sum(np.roll(grids, offset, axis=(1, 2)) for offset in NEIGHBOUR_OFFSETS)
+        grids = ((neighbours == 3) | ((grids == 1) & (neighbours == 2))).astype(np.uint8)
+
+def matrix_multiplication(operands):
+    a, b = operands
+    np.matmul(a, b)  # float64, so every product goes through BLAS
+
+def prime_factors(numbers):
+    n = numbers.astype(np.int64)
+    counts = np.zeros(len(n), dtype=np.int64)  # Prime factors found, with multiplicity
+    d = 2
+    while d * d <= n.max():
+        divisible = n % d == 0
+        while divisible.any():
+            n[divisible] //= d
+            counts += divisible
+            divisible = n % d == 0
+        d += 1 if d == 2 else 2
+    counts += n > 1
+
+def is_leap_year(years):
+    (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+# --- Input Pools ---
+# Built from the worker's per-algorithm `random.Random`, so the profile is as
+# reproducible as the pure-Python one. Each item is a view into one array.
+# `params` are the worker's ALGORITHM_PARAMS, merged with the RUN_TEST params.
+
+def _generator(rng):
+    return np.random.default_rng(rng.getrandbits(64))
+
+def _calls(size, call_bytes):
+    return max(2, min(size, POOL_BYTES // call_bytes))
+
+def array_sort_inputs(rng, size, params):
+    n, length = ELEMENTS_PER_CALL["array_sort"], params["length"]
+    return list(_generator(rng).integers(0, 100, size=(_calls(size, n * length), n, length), dtype=np.uint8))
+
+def fibonacci_inputs(rng, size, params):
+    shape = (size, ELEMENTS_PER_CALL["fibonacci"])
+    if params["n"] is None:
+        return list(_generator(rng).integers(20, 36, size=shape, dtype=np.int64))
+    return list(np.full(shape, params["n"], dtype=np.int64))  # int64 wraps above n = 92, like Java/Rust longs
+
+def game_of_life_inputs(rng, size, params):
+    n, grid = ELEMENTS_PER_CALL["game_of_life"], params["grid"]
+    return list(_generator(rng).integers(0, 2, size=(_calls(size, n * grid * grid), n, grid, grid), dtype=np.uint8))
+
+def matrix_multiplication_inputs(rng, size, params):
+    n, d = ELEMENTS_PER_CALL["matrix_multiplication"], params["dimension"]
+    calls = _calls(size, 2 * n * d * d * 8)
+    pairs = _generator(rng).integers(0, 10, size=(calls, 2, n, d, d)).astype(np.float64)
+    return [(pair[0], pair[1]) for pair in pairs]
+
+def prime_factors_inputs(rng, size, params):
+    n, high = ELEMENTS_PER_CALL["prime_factors"], params["max_value"]
+    return list(_generator(rng).integers(max(2, high // 5), high + 1, size=(size, n), dtype=np.int64))
+
+def is_leap_year_inputs(rng, size, params):
+    return list(_generator(rng).integers(1, 10000, size=(size, ELEMENTS_PER_CALL["is_leap_year"]), dtype=np.int16))
+
+
+ALGORITHMS = {
+    "array_sort": array_sort,
+    "fibonacci": fibonacci,
+    "game_of_life": game_of_life,
+    "matrix_multiplication": matrix_multiplication,
+    "prime_factors": prime_factors,
+    "is_leap_year": is_leap_year,
+}
+
+INPUT_BUILDERS = {
+    "array_sort": array_sort_inputs,
+    "fibonacci": fibonacci_inputs,
+    "game_of_life": game_of_life_inputs,
+    "matrix_multiplication": matrix_multiplication_inputs,
+    "prime_factors": prime_factors_inputs,
+    "is_leap_year": is_leap_year_inputs,
+}
@@ -0,0 +1,215 @@
+# =========================
+#   P-RAF: Python Worker Sampling Profiler (PROFILE command)
+# =========================
+#
+# A poller thread reads sys._current_frames() every PROFILE_INTERVAL and
+# counts the stack of every algorithm thread as one collapsed line
+#
+#   threading.py:_bootstrap;...;benchmark.py:algo_worker;timing.py:sample;benchmark.py:game_of_life 17
+#
+# (root first, frames joined with ';'), which is the input format of
+# flamegraph.pl, speedscope and friends. Nothing is sampled while the profiler
+# is off. While it is on, each tick costs one frame walk per profiled thread
+# on the sampler thread; under the GIL that briefly pauses the algorithms, so
+# keep the interval coarse (the default is 200 Hz) when timings matter too.
+#
+# In process mode every algorithm process runs its own sampler, switched on
+# and off through a shared ProfileSwitch; the collapsed counts come back over
+# a queue when the profile stops. Stopping does not wait for them: a collector
+# thread gathers the counts of each stop and hands them to its callback, so the
+# worker's command reader keeps answering PING/START/SHUTDOWN meanwhile.
+
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+
+PROFILE_INTERVAL = 0.005        # Seconds between stack samples (200 Hz)
+MIN_PROFILE_INTERVAL = 0.001
+SWITCH_POLL_INTERVAL = 0.05     # Seconds between switch checks of an idle process sampler
+RESULT_TIMEOUT = 2.0            # Seconds to wait for the counts of all algorithm processes
+
+PendingStop = namedtuple("PendingStop", ["names", "counts", "duration", "deadline", "done"])
+
+
+def frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse(frame, labels):
+    """The collapsed stack (root first) of `frame`; `labels` caches code object labels."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = frame_label(code)
+        names.append(label)
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+class StackSampler:
+    """
+    Samples the stacks of registered threads into collapsed-stack counts per name.
+
+    Profiles of several algorithms may overlap (concurrent test plans): each
+    name is started and stopped on its own, the poller runs while any is active.
+    """
+
+    def __init__(self):
+        self.targets = {}     # Thread ident -> algorithm name
+        self.active = {}      # Algorithm name -> ({collapsed stack: samples}, monotonic start)
+        self.interval = PROFILE_INTERVAL
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name, ident=None):
+        """Marks the calling thread (or `ident`) as the thread of algorithm `name`."""
+        self.targets[ident or threading.get_ident()] = name
+
+    @property
+    def running(self):
+        return bool(self.active)
+
+    def start(self, interval=PROFILE_INTERVAL, names=None):
+        """Starts profiling `names` (default: all registered); names already active keep their counts."""
+        now = time.monotonic()
+        with self._lock:
+            if not self.active:
+                self.interval = max(MIN_PROFILE_INTERVAL, interval)
+            for name in (names if names is not None else self.targets.values()):
+                self.active.setdefault(name, ({}, now))
+            if self._thread is None and self.active:
+                self._thread = threading.Thread(target=self._run, name="praf-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self, names=None):
+        """Stops profiling `names` (default: all); returns ({name: {stack: samples}}, seconds sampled)."""
+        now = time.monotonic()
+        with self._lock:
+            stopped = {name: self.active.pop(name) for name in list(names or self.active) if name in self.active}
+            thread = self._thread if not self.active else None
+            if thread is not None:
+                self._thread = None
+        if thread is not None:
+            thread.join()
+        counts = {name: stacks for name, (stacks, _) in stopped.items()}
+        return counts, max((now - started for _, started in stopped.values()), default=0.0)
+
+    def _run(self):
+        labels = {}
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self.active:
+                    return
+                frames = sys._current_frames()
+                for ident, name in self.targets.items():
+                    state = self.active.get(name)
+                    frame = frames.get(ident)
+                    if state is not None and frame is not None:
+                        stack = collapse(frame, labels)
+                        stacks = state[0]
+                        stacks[stack] = stacks.get(stack, 0) + 1
+                frames = frame = None  # Do not keep the sampled frames alive until the next tick
+
+
+class ProfileSwitch:
+    """
+    Turns the samplers of the algorithm processes on and off.
+
+    One interval per algorithm lives in shared memory (0 = off); each process
+    polls its own from a follower thread and, when its profile stops, puts its
+    counts on `results`. Only the parent's collector thread reads `results`.
+    """
+
+    def __init__(self, names):
+        self.index = {name: i for i, name in enumerate(names)}
+        self.intervals = multiprocessing.RawArray("d", len(names))
+        self.interval = PROFILE_INTERVAL  # Of the current / last profile
+        self.results = multiprocessing.Queue()
+        self._pending = []                # [PendingStop] waiting for counts (parent only)
+        self._lock = threading.Lock()
+        self._collector = None
+
+    def __getstate__(self):
+        # The algorithm processes only need the switch and the queue.
+        return {"index": self.index, "intervals": self.intervals, "interval": self.interval, "results": self.results}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, _pending=[], _lock=threading.Lock(), _collector=None)
+
+    @property
+    def collecting(self):
+        """True while stopped profiles still wait for their counts."""
+        return bool(self._pending)
+
+    def start(self, interval=PROFILE_INTERVAL, names=None):
+        self.interval = max(MIN_PROFILE_INTERVAL, interval)
+        for name in (names if names is not None else self.index):
+            if name in self.index and not self.intervals[self.index[name]]:
+                self.intervals[self.index[name]] = self.interval
+
+    def stop(self, names=None, done=None):
+        """
+        Switches `names` (default: all) off and returns at once.
+
+        The collector thread calls done({name: {stack: samples}}, seconds) when
+        the counts of all of them are in, or after RESULT_TIMEOUT with those that are.
+        """
+        running = [name for name in (names or self.index) if name in self.index and self.intervals[self.index[name]]]
+        for name in running:
+            self.intervals[self.index[name]] = 0.0
+        pending = PendingStop(set(running), {}, [0.0], time.monotonic() + RESULT_TIMEOUT, done)
+        with self._lock:
+            self._pending.append(pending)
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, name="praf-profile-results", daemon=True)
+                self._collector.start()
+
+    def _collect(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._collector = None
+                    return
+                deadline = min(pending.deadline for pending in self._pending)
+            try:
+                name, stacks, seconds = self.results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                name = None
+            now = time.monotonic()
+            with self._lock:
+                for pending in self._pending:
+                    if name in pending.names and name not in pending.counts:
+                        pending.counts[name] = stacks
+                        pending.duration[0] = max(pending.duration[0], seconds)
+                        break
+                finished = [p for p in self._pending if len(p.counts) == len(p.names) or now >= p.deadline]
+            for pending in finished:
+                if pending.done is not None:
+                    pending.done(pending.counts, pending.duration[0])
+            with self._lock:  # Still `collecting` until the callbacks have run
+                self._pending = [p for p in self._pending if p not in finished]
+
+    def follow(self, name):
+        """Starts the follower thread of algorithm process `name` (call from its main thread)."""
+        sampler = StackSampler()
+        sampler.register(name)
+        threading.Thread(target=self._follow, args=(sampler, name), name="praf-profile-switch", daemon=True).start()
+
+    def _follow(self, sampler, name):
+        slot = self.index[name]
+        while True:
+            interval = self.intervals[slot]
+            if interval and not sampler.running:
+                sampler.start(interval)
+            elif not interval and sampler.running:
+                counts, seconds = sampler.stop()
+                self.results.put((name, counts.get(name, {}), seconds))
+            time.sleep(SWITCH_POLL_INTERVAL)
@@ -0,0 +1,200 @@
+# =========================
+#   P-RAF: Python Worker Sample Stores
+# =========================
+#
+# Every algorithm (thread or process) writes its samples into its own
+# SampleStore; the sender thread reads all stores on its own schedule. There
+# is exactly one writer and one reader per store, so nothing is ever locked
+# and recording never waits - not even when the orchestrator is slow or gone.
+#
+#   ring        the most recent samples, sent as individual records; when the
+#               sender falls behind, the oldest ones are overwritten
+#   histogram   cumulative, log-bucketed (same layout as praf_histogram.py),
+#               covering every sample ever recorded
+#
+# Whatever the ring overwrote is still in the histogram: the sender compares
+# it with what it forwarded and sends the difference as a `data_snapshot`, so
+# the orchestrator's run counts and distributions stay exact (at bucket
+# resolution) even across reconnects.
+
+import multiprocessing
+import time
+
+RING_CAPACITY = 4096  # Samples per algorithm ring (about 4 s at the 1 ms target sample length)
+
+# Mirrors praf_histogram.py, so snapshots merge into the orchestrator's histograms.
+# The worker stays importable without the orchestrator's modules; the layout is
+# announced in the hello and the orchestrator refuses workers whose layout differs.
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+_LINEAR_LIMIT = 2 * SUB_BUCKET_COUNT
+
+
+def bucket_index(value):
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKET_COUNT + (value >> shift)
+
+
+def bucket_bounds(index):
+    if index < _LINEAR_LIMIT:
+        return index, index
+    shift = index // SUB_BUCKET_COUNT - 1
+    top = index - shift * SUB_BUCKET_COUNT
+    return top << shift, ((top + 1) << shift) - 1
+
+
+BUCKET_COUNT = bucket_index((1 << 63) - 1) + 1
+
+
+def bucket_layout():
+    """Sent as "histogram" in the hello; must equal praf_histogram.bucket_layout()."""
+    return {"sub_bucket_bits": SUB_BUCKET_BITS, "bucket_count": BUCKET_COUNT}
+
+
+class SampleRing:
+    """
+    Single-producer/single-consumer ring of (duration_ns, iterations, timestamp_ns, *extra) samples.
+
+    The slots and both counters live in shared memory, so the same ring works
+    between threads and between processes. The producer never waits: when the
+    consumer is a full ring behind, the oldest samples are overwritten and the
+    consumer counts them in `overwritten`.
+    """
+
+    FIELDS = 3
+
+    def __init__(self, capacity=RING_CAPACITY, extra_fields=0):
+        self.capacity = capacity
+        self.fields = self.FIELDS + extra_fields
+        self.slots = multiprocessing.RawArray("q", capacity * self.fields)
+        self.head = multiprocessing.RawValue("q", 0)  # Samples written (producer)
+        self.tail = multiprocessing.RawValue("q", 0)  # Samples read (consumer)
+        self.overwritten = 0                          # Consumer side only
+
+    def push(self, duration_ns, iterations, timestamp_ns, extra=()):
+        head = self.head.value
+        offset = (head % self.capacity) * self.fields
+        self.slots[offset] = duration_ns
+        self.slots[offset + 1] = iterations
+        self.slots[offset + 2] = timestamp_ns
+        if extra:
+            self.slots[offset + 3:offset + self.fields] = extra
+        self.head.value = head + 1
+
+    def drain(self, limit=None, until=None):
+        """Returns up to `limit` unread samples written before `until` (a head value), oldest first."""
+        tail, head = self.tail.value, self.head.value if until is None else until
+        capacity, fields, slots = self.capacity, self.fields, self.slots
+        start = max(tail, head - capacity)
+        if limit is not None:
+            head = min(head, start + limit)
+        if fields == self.FIELDS:
+            samples = [
+                (slots[offset], slots[offset + 1], slots[offset + 2])
+                for offset in ((index % capacity) * fields for index in range(start, head))
+            ]
+        else:
+            samples = [
+                tuple(slots[offset:offset + fields])
+                for offset in ((index % capacity) * fields for index in range(start, head))
+            ]
+        # The producer may have lapped us while we copied: drop what it overwrote.
+        valid = max(start, self.head.value + 1 - capacity)
+        if valid > start:
+            del samples[:valid - start]
+        new_tail = max(head, valid)
+        self.overwritten += new_tail - tail - len(samples)
+        self.tail.value = new_tail
+        return samples
+
+
+class SampleStore:
+    """
+    The ring plus the cumulative histogram of one algorithm.
+
+    `record()` is called by the algorithm only; `snapshot()` by the sender only.
+    A sequence counter (odd while a sample is being recorded) lets the sender
+    read the histogram and the ring head as one consistent state without a lock.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY, extra_fields=0):
+        self.ring = SampleRing(capacity, extra_fields)
+        self.counts = multiprocessing.RawArray("q", BUCKET_COUNT)  # Runs per bucket
+        self.total_ns = multiprocessing.RawValue("q", 0)           # Sum of duration_ns * iterations
+        self.sequence = multiprocessing.RawValue("q", 0)
+        self.alloc_peak_bytes = multiprocessing.RawValue("q", -1)  # Latest allocation probe (telemetry)
+        # Timing overhead bookkeeping (see timing.py), reported in `data_calibration`
+        self.samples = multiprocessing.RawValue("q", 0)            # Samples recorded
+        self.iterations = multiprocessing.RawValue("q", 0)         # Their iterations
+        self.raw_total_ns = multiprocessing.RawValue("q", 0)       # Sum of uncorrected ns per iteration * iterations
+        self.floor_samples = multiprocessing.RawValue("q", 0)      # Samples dropped at the noise floor
+        self.loop_overhead_ns = multiprocessing.RawValue("d", 0.0)  # Overhead the algorithm currently subtracts
+
+    def record(self, duration_ns, iterations, timestamp_ns, extra=(), raw_ns=None):
+        """Records one sample; `extra` holds the ring's extra fields (e.g. telemetry).
+
+        `duration_ns` None marks a sample at the noise floor: it is counted, not recorded.
+        `raw_ns` is the uncorrected duration per iteration.
+        """
+        if duration_ns is None:
+            self.floor_samples.value += 1
+            return
+        self.samples.value += 1
+        self.iterations.value += iterations
+        self.raw_total_ns.value += (duration_ns if raw_ns is None else raw_ns) * iterations
+        self.sequence.value += 1
+        self.ring.push(duration_ns, iterations, timestamp_ns, extra)
+        self.counts[bucket_index(duration_ns)] += iterations
+        self.total_ns.value += duration_ns * iterations
+        self.sequence.value += 1
+
+    def snapshot(self):
+        """(ring head, bucket counts, total_ns) as of one instant between two samples."""
+        while True:
+            sequence = self.sequence.value
+            if not sequence % 2:
+                head, counts, total_ns = self.ring.head.value, self.counts[:], self.total_ns.value
+                if self.sequence.value == sequence:
+                    return head, counts, total_ns
+            time.sleep(0)
+
+
+class ForwardedTally:
+    """Sender-side histogram of the samples of one store that were forwarded as records."""
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total_ns = 0
+        self.overwritten = 0  # Ring overwrites already accounted for in a snapshot
+
+    def add(self, samples):
+        counts = self.counts
+        for sample in samples:
+            duration_ns, iterations = sample[0], sample[1]
+            counts[bucket_index(duration_ns)] += iterations
+            self.total_ns += duration_ns * iterations
+
+    def unforwarded(self, counts, total_ns):
+        """Histogram dict (praf_histogram.LogHistogram.to_dict layout) of recorded but never forwarded runs.
+
+        Marks them as forwarded; returns None if there are none.
+        """
+        buckets = {}
+        for index, (recorded, forwarded) in enumerate(zip(counts, self.counts)):
+            if recorded > forwarded:
+                buckets[index] = recorded - forwarded
+                self.counts[index] = recorded
+        if not buckets:
+            return None
+        total, self.total_ns = total_ns - self.total_ns, total_ns
+        low, high = min(buckets), max(buckets)
+        return {
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "count": sum(buckets.values()),
+            "sum": max(0, total),
+            "min": bucket_bounds(low)[0],
+            "max": bucket_bounds(high)[1],
+            "buckets": {str(index): count for index, count in buckets.items()},
+        }
@@ -0,0 +1,163 @@
+# =========================
+#   P-RAF: Python Worker Runtime Telemetry (--telemetry)
+# =========================
+#
+# Resource data that explains where a slow sample came from. Per sample
+# (bracketing the timed batch, outside the timed region):
+#
+#   gc_collections, gc_pause_ns   collections that ran meanwhile (gc.callbacks);
+#                                 process-wide, because a collection in any
+#                                 thread stops the others at the GIL as well
+#   nvcsw, nivcsw                 voluntary / involuntary context switches and
+#   minflt, majflt                minor / major page faults of the calling
+#                                 thread (getrusage(RUSAGE_THREAD), Linux only)
+#
+# Per algorithm, at most once per ALLOC_PROBE_INTERVAL, one extra untimed call
+# runs under tracemalloc and reports its peak allocated bytes; tracing is on
+# only for that call, so the overhead stays bounded. In thread mode the probe
+# also sees what other threads allocate during that call.
+#
+# Per batch, the sender adds the worker's RSS and CPU time (/proc, all
+# algorithm processes included).
+
+import gc
+import os
+import threading
+import time
+import tracemalloc
+from itertools import cycle
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TELEMETRY_FIELDS = ("gc_collections", "gc_pause_ns", "nvcsw", "nivcsw", "minflt", "majflt")
+ALLOC_PROBE_INTERVAL = 1.0  # Seconds between allocation probes of one algorithm
+
+_RUSAGE_THREAD = getattr(resource, "RUSAGE_THREAD", None)
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class GcMonitor:
+    """Counts garbage collections and their pause time via gc.callbacks (one per process)."""
+
+    def __init__(self):
+        self.collections = 0
+        self.pause_ns = 0
+        self._started = 0
+
+    def _callback(self, phase, _info):
+        if phase == "start":
+            self._started = time.perf_counter_ns()
+        else:
+            self.collections += 1
+            self.pause_ns += time.perf_counter_ns() - self._started
+
+    def install(self):
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+        return self
+
+
+gc_monitor = GcMonitor()
+
+
+def _thread_usage():
+    if _RUSAGE_THREAD is None:
+        return 0, 0, 0, 0
+    usage = resource.getrusage(_RUSAGE_THREAD)
+    return usage.ru_nvcsw, usage.ru_nivcsw, usage.ru_minflt, usage.ru_majflt
+
+
+class SampleProbe:
+    """Reads the TELEMETRY_FIELDS before and after one sample of the calling thread."""
+
+    def __init__(self):
+        gc_monitor.install()
+
+    def begin(self):
+        return (gc_monitor.collections, gc_monitor.pause_ns, *_thread_usage())
+
+    def end(self, start):
+        now = (gc_monitor.collections, gc_monitor.pause_ns, *_thread_usage())
+        return tuple(after - before for after, before in zip(now, start))
+
+
+_probe_lock = threading.Lock()  # tracemalloc is process-wide: one probe at a time
+
+
+class AllocationProbe:
+    """Peak bytes allocated by one untimed call, at most once per ALLOC_PROBE_INTERVAL."""
+
+    def __init__(self, func, inputs):
+        self.func = func
+        self.inputs = cycle(inputs)
+        self.next_probe = 0.0
+
+    def due(self, now):
+        return now >= self.next_probe
+
+    def run(self, now):
+        self.next_probe = now + ALLOC_PROBE_INTERVAL
+        arg = next(self.inputs)
+        with _probe_lock:
+            if tracemalloc.is_tracing():
+                return None  # Someone else traces (e.g. python -X tracemalloc): leave it alone
+            tracemalloc.start()
+            try:
+                before, _ = tracemalloc.get_traced_memory()
+                self.func(arg)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        return max(0, peak - before)
+
+
+# --- Process Statistics ---
+def _proc_stats(pid):
+    """(rss_bytes, user_s, system_s) of one process from /proc, or None."""
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+            rss_pages = int(f.read().split()[1])
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, ValueError, IndexError):
+        return None
+    # Fields 14 and 15 of /proc/<pid>/stat; the split starts at field 3.
+    return rss_pages * _PAGE_SIZE, int(fields[11]) / _CLOCK_TICKS, int(fields[12]) / _CLOCK_TICKS
+
+
+def process_stats(child_pids=()):
+    """RSS and CPU time of this worker (plus its algorithm processes)."""
+    stats = [s for s in map(_proc_stats, (os.getpid(), *child_pids)) if s is not None]
+    if not stats:
+        times = os.times()
+        return {"rss_bytes": None, "cpu_user_s": times.user, "cpu_system_s": times.system}
+    return {
+        "rss_bytes": sum(s[0] for s in stats),
+        "cpu_user_s": round(sum(s[1] for s in stats), 3),
+        "cpu_system_s": round(sum(s[2] for s in stats), 3),
+    }
+
+
+# --- Batch Summaries (sender) ---
+def summarize(samples):
+    """Totals of the telemetry columns of drained samples, plus the samples worth explaining.
+
+    Samples are (duration_ns, iterations, timestamp_ns, *TELEMETRY_FIELDS); an
+    event is a sample during which a collection ran, the thread was preempted
+    or it had to wait for a major page fault.
+    """
+    width = len(TELEMETRY_FIELDS)
+    totals = [0] * width
+    events = []
+    for sample in samples:
+        values = sample[3:3 + width]
+        for i in range(width):
+            totals[i] += values[i]
+        gc_collections, gc_pause_ns, _, nivcsw, _, majflt = values
+        if gc_collections or nivcsw or majflt:
+            events.append([sample[0], sample[1], gc_collections, gc_pause_ns, nivcsw, majflt])
+    return {"samples": len(samples), **dict(zip(TELEMETRY_FIELDS, totals)), "events": events}
@@ -0,0 +1,62 @@
+import sys
+import time
+
+import pytest
+
+import execution
+from execution import RunGate, assign_cores, resolve_mode
+
+
+@pytest.fixture(params=[True, False], ids=["gil", "no-gil"])
+def gil(request, monkeypatch):
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: request.param, raising=False)
+    return request.param
+
+
+def test_resolve_mode_reports_the_mode_that_actually_runs(gil):
+    assert resolve_mode("processes") == "processes"
+    if gil:
+        assert resolve_mode("threads") == "threads"
+        assert resolve_mode("free-threaded") == "threads"  # Falls back, with a warning
+    else:
+        assert resolve_mode("threads") == "free-threaded"
+        assert resolve_mode("free-threaded") == "free-threaded"
+
+
+def test_interpreters_without_the_gil_switch_have_the_gil(monkeypatch):
+    monkeypatch.delattr(sys, "_is_gil_enabled", raising=False)
+    assert not execution.gil_disabled()
+    assert resolve_mode("free-threaded") == "threads"
+
+
+def test_gate_opens_for_warmup_plus_measurement_then_closes():
+    gate = RunGate()
+    assert not gate.measuring(time.time())  # Closed until opened
+    gate.open(0.5, 1.0)
+    now = time.time()
+    gate.wait()  # Open: returns at once
+    assert not gate.measuring(now)  # Warmup
+    assert gate.measuring(now + 0.6) and gate.measuring(now + 1.4)
+    assert not gate.measuring(now + 1.6)
+    gate.open(0.0, 0.0)
+    assert time.time() >= gate.until.value and not gate.measuring(time.time())
+    gate.open_forever()
+    assert gate.measuring(0.0) and gate.measuring(time.time() + 1e9)
+
+
+def test_gate_publishes_params_only_when_they_change():
+    gate = RunGate()
+    gate.open(0.0, 1.0)
+    assert gate.new_params() is None  # Defaults, as before
+    gate.open(0.0, 1.0, {"length": 64})
+    gate.open(0.0, 1.0, {"length": 64})
+    gate.open(0.0, 1.0, {"length": 256})
+    assert gate.new_params() == {"length": 256}  # Only the latest counts
+    assert gate.new_params() is None
+    gate.open(0.0, 1.0)
+    assert gate.new_params() == {}
+
+
+def test_cores_are_assigned_round_robin():
+    assert assign_cores(["a", "b", "c"], [2, 3]) == {"a": [2], "b": [3], "c": [2]}
+    assert assign_cores(["a"], []) == {}
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import numpy_algorithms
+from numpy_algorithms import ALGORITHMS, ELEMENTS_PER_CALL, INPUT_BUILDERS
+
+PARAMS = {
+    "array_sort": {"length": 8},
+    "fibonacci": {"n": None},
+    "game_of_life": {"grid": 6},
+    "matrix_multiplication": {"dimension": 3},
+    "prime_factors": {"max_value": 1000},
+    "is_leap_year": {},
+}
+
+
+def build(name, seed=42, size=3):
+    return INPUT_BUILDERS[name](random.Random(f"{seed}:{name}"), size, PARAMS[name])
+
+
+def leading_dimension(item):
+    return len(item[0]) if isinstance(item, tuple) else len(item)
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+def test_every_call_processes_elements_per_call_instances(name):
+    pool = build(name)
+    assert len(pool) >= 2
+    assert all(leading_dimension(item) == ELEMENTS_PER_CALL[name] for item in pool)
+    ALGORITHMS[name](pool[0])
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+def test_inputs_depend_only_on_the_seed(name):
+    first, again, other = build(name), build(name), build(name, seed=7)
+    flatten = lambda pool: np.concatenate([np.ravel(item) for item in pool])  # noqa: E731
+    assert np.array_equal(flatten(first), flatten(again))
+    assert not np.array_equal(flatten(first), flatten(other))
+
+
+def test_large_problems_get_fewer_pre_generated_calls(monkeypatch):
+    monkeypatch.setattr(numpy_algorithms, "POOL_BYTES", 1)
+    assert len(INPUT_BUILDERS["array_sort"](random.Random(1), 16, {"length": 4096})) == 2
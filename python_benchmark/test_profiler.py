@@ -0,0 +1,40 @@
+import threading
+import time
+
+import profiler
+from profiler import ProfileSwitch
+
+
+def stop_and_wait(switch, names=None):
+    done = threading.Event()
+    collected = []
+    started = time.monotonic()
+    switch.stop(names, lambda counts, seconds: (collected.append((counts, seconds)), done.set()))
+    returned_after = time.monotonic() - started
+    assert done.wait(5)
+    return returned_after, collected[0]
+
+
+def test_stop_returns_before_the_counts_arrive(monkeypatch):
+    monkeypatch.setattr(profiler, "RESULT_TIMEOUT", 0.3)
+    switch = ProfileSwitch(["a", "b"])
+    switch.start(names=["a", "b"])
+    switch.results.put(("a", {"x;y": 3}, 1.5))
+    returned_after, (counts, seconds) = stop_and_wait(switch)
+    assert returned_after < 0.1
+    assert counts == {"a": {"x;y": 3}} and seconds == 1.5  # "b" never answered: timed out without it
+    assert not switch.collecting
+
+
+def test_overlapping_stops_get_their_own_counts():
+    switch = ProfileSwitch(["a", "b"])
+    switch.start(names=["a", "b"])
+    first, second = [], []
+    switch.stop(["a"], lambda counts, _: first.append(counts))
+    switch.stop(["b"], lambda counts, _: second.append(counts))
+    switch.results.put(("b", {"b": 1}, 1.0))
+    switch.results.put(("a", {"a": 2}, 1.0))
+    deadline = time.monotonic() + 5
+    while switch.collecting and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert first == [{"a": {"a": 2}}] and second == [{"b": {"b": 1}}]
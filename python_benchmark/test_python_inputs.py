@@ -0,0 +1,55 @@
+import pytest
+
+import benchmark
+from benchmark import ALGORITHM_PARAMS, INPUT_POOL_SIZE, PYTHON_ALGORITHMS, algorithm_params, build_inputs
+
+SMALL = {
+    "array_sort": {"length": 8},
+    "fibonacci": {"n": 12},
+    "game_of_life": {"grid": 5},
+    "matrix_multiplication": {"dimension": 3},
+    "prime_factors": {"max_value": 1000},
+    "is_leap_year": {},
+}
+
+
+def flatten(item):
+    if isinstance(item, (tuple, memoryview)) and item and not isinstance(item[0], int):
+        return [value for part in item for value in flatten(part)]
+    return list(item) if isinstance(item, (tuple, memoryview)) else [item]
+
+
+def values(pool):
+    return [value for item in pool for value in flatten(item)]
+
+
+@pytest.mark.parametrize("name", sorted(PYTHON_ALGORITHMS))
+def test_every_pool_has_pool_size_inputs_the_algorithm_accepts(name):
+    pool = build_inputs(name, 42, params=SMALL[name])
+    assert len(pool) == INPUT_POOL_SIZE
+    PYTHON_ALGORITHMS[name](pool[0])
+
+
+@pytest.mark.parametrize("name", sorted(PYTHON_ALGORITHMS))
+def test_inputs_depend_only_on_the_seed(name):
+    first, again = build_inputs(name, 42, params=SMALL[name]), build_inputs(name, 42, params=SMALL[name])
+    assert values(first) == values(again)
+    if name != "fibonacci":  # A fixed n leaves nothing to draw
+        assert values(first) != values(build_inputs(name, 7, params=SMALL[name]))
+
+
+def test_params_set_the_problem_size(monkeypatch):
+    monkeypatch.setattr(benchmark, "INPUT_POOL_SIZE", 4)
+    sorts = build_inputs("array_sort", 1, params={"length": 16})
+    assert len(sorts) == 4 and all(len(item) == 16 for item in sorts)
+    grids = build_inputs("game_of_life", 1, params={"grid": 6})
+    assert all(len(grid) == 6 and all(len(row) == 6 for row in grid) for grid in grids)
+    a, b = build_inputs("matrix_multiplication", 1, params={"dimension": 4})[0]
+    assert len(a) == len(b) == 4 and len(a[0]) == 4
+    assert all(200 <= n <= 1000 for n in build_inputs("prime_factors", 1, params={"max_value": 1000}))
+    assert set(build_inputs("fibonacci", 1)) <= set(range(20, 36))  # Default: a mix of n
+
+
+def test_algorithm_params_ignore_unknown_keys():
+    assert algorithm_params("array_sort", {"length": "64", "grid": 3}) == {"length": 64}
+    assert algorithm_params("game_of_life") == ALGORITHM_PARAMS["game_of_life"]
@@ -0,0 +1,41 @@
+import importlib.util
+import random
+from pathlib import Path
+
+import sampling
+from sampling import ForwardedTally, SampleStore
+
+
+def orchestrator_histogram():
+    # The orchestrator's module, loaded by path: the worker directory does not import it otherwise.
+    path = Path(__file__).resolve().parent.parent / "praf_histogram.py"
+    spec = importlib.util.spec_from_file_location("praf_histogram", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_bucket_math_mirrors_the_orchestrator():
+    reference = orchestrator_histogram()
+    assert sampling.bucket_layout() == reference.bucket_layout()
+    rng = random.Random(5)
+    values = list(range(300)) + [rng.getrandbits(rng.randrange(1, 63)) for _ in range(5000)] + [(1 << 63) - 1]
+    for value in values:
+        assert sampling.bucket_index(value) == reference.bucket_index(value)
+    for index in range(sampling.BUCKET_COUNT):
+        assert sampling.bucket_bounds(index) == reference.bucket_bounds(index)
+
+
+def test_snapshot_of_overwritten_samples_merges_into_a_log_histogram():
+    reference = orchestrator_histogram()
+    store = SampleStore(capacity=4)
+    for i, duration in enumerate([100, 100, 5000, 70_000, 70_000, 900]):
+        store.record(duration, 10, i)
+    tally = ForwardedTally()
+    tally.add(store.ring.drain())  # The last three; the slot the producer writes next counts as lost
+    snapshot = tally.unforwarded(store.counts, store.total_ns.value)
+    hist = reference.LogHistogram.from_dict(snapshot)
+    assert hist.count == 30 and hist.sum == 2 * 1000 + 50_000
+    assert hist.counts[reference.bucket_index(100)] == 20
+    assert hist.counts[reference.bucket_index(5000)] == 10
+    assert tally.unforwarded(store.counts, store.total_ns.value) is None
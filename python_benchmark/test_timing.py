@@ -0,0 +1,47 @@
+import timing
+from sampling import SampleStore
+from timing import AdaptiveTimer, Calibration, Overhead, calibrate
+
+
+def fixed_estimates(monkeypatch, values):
+    values = iter(values)
+    monkeypatch.setattr(timing, "measure_loop_overhead", lambda *args, **kwargs: next(values))
+
+
+def test_calibration_uses_the_median_of_its_repeats(monkeypatch):
+    fixed_estimates(monkeypatch, [31.0, 52.0, 35.0, 33.0, 90.0])
+    calibration = calibrate(repeats=5)
+    assert calibration.loop_overhead_ns == 35.0
+    assert calibration.loop_overhead_spread_ns == 59.0
+
+
+def test_recheck_keeps_a_running_median(monkeypatch):
+    overhead = Overhead(Calibration(50, 30.0, 0.0), interval=0.0)
+    assert overhead.due()
+    fixed_estimates(monkeypatch, [80.0, 32.0, 31.0])
+    assert overhead.recheck() == 55.0   # median of 30, 80
+    assert overhead.recheck() == 32.0   # median of 30, 80, 32
+    assert overhead.recheck() == 31.5
+
+
+def test_samples_at_the_noise_floor_are_not_reported_as_zero():
+    timer = AdaptiveTimer(lambda _: None, [None], Overhead(Calibration(0, 1e6, 0.0), interval=1e9))
+    duration_ns, batch, raw_ns = timer.sample()
+    assert duration_ns is None
+    assert batch == 1 and raw_ns > 0
+
+
+def test_corrected_samples_come_with_their_raw_duration():
+    timer = AdaptiveTimer(lambda _: sum(range(200)), [None], Overhead(Calibration(0, 0.0, 0.0), interval=1e9))
+    duration_ns, batch, raw_ns = timer.sample()
+    assert duration_ns == raw_ns > 0
+
+
+def test_store_counts_floor_samples_without_recording_them():
+    store = SampleStore(capacity=8)
+    store.record(None, 1000, 1)
+    store.record(40, 1000, 2, raw_ns=75)
+    assert store.floor_samples.value == 1
+    assert store.samples.value == 1 and store.iterations.value == 1000
+    assert store.raw_total_ns.value == 75_000 and store.total_ns.value == 40_000
+    assert [sample[0] for sample in store.ring.drain()] == [40]
@@ -0,0 +1,143 @@
+# =========================
+#   P-RAF: Python Worker Timing Engine
+# =========================
+#
+# `time.time()` around a single call cannot resolve algorithms that finish in
+# a few hundred nanoseconds (is_leap_year, fibonacci): clock granularity and
+# harness overhead dominate. Instead each sample
+#
+#   1. uses `time.perf_counter_ns()`,
+#   2. runs the algorithm in an inner batch sized so that the sample lasts at
+#      least TARGET_SAMPLE_NS, and
+#   3. subtracts the timer and empty-loop overhead,
+#
+# and reports the per-iteration duration together with the batch size.
+# The algorithm's inputs are prepared beforehand; the timed loop only rotates
+# through them.
+#
+# One empty-loop measurement is noisy (other runtimes booting, frequency
+# scaling), and for cheap kernels its error is as large as the result. The
+# startup calibration takes the median of CALIBRATION_REPEATS measurements,
+# and every algorithm re-measures the loop in its own thread (or process)
+# every RECHECK_INTERVAL seconds, between samples, using the median of the
+# last RECHECK_WINDOW estimates. A sample whose corrected duration is not
+# above zero cannot be told apart from the overhead: sample() returns None
+# for it instead of a clamped 0. The raw elapsed time per iteration comes
+# along either way.
+
+import statistics
+from collections import deque, namedtuple
+from itertools import cycle, islice
+from time import monotonic, perf_counter_ns
+
+TARGET_SAMPLE_NS = 1_000_000   # Every timed sample should last at least 1 ms
+MAX_BATCH = 1 << 20
+MAX_GROWTH = 16                # Batch may grow at most this much per sample
+CALIBRATION_ROUNDS = 20_000
+CALIBRATION_LOOP = 100_000
+CALIBRATION_RUNS = 5           # Empty-loop runs per measurement; the fastest one counts
+CALIBRATION_REPEATS = 9        # Measurements at startup; their median is used
+RECHECK_INTERVAL = 10.0        # Seconds between empty-loop re-measurements of a running algorithm
+RECHECK_LOOP = 20_000          # Iterations per re-measurement run (about 1 ms)
+RECHECK_WINDOW = 9             # Estimates the running median is taken over
+
+Calibration = namedtuple("Calibration", ["timer_overhead_ns", "loop_overhead_ns", "loop_overhead_spread_ns"])
+
+
+def _noop(_):
+    pass
+
+
+def measure_loop_overhead(timer_ns, loop=CALIBRATION_LOOP, runs=CALIBRATION_RUNS):
+    """One estimate of the cost of an empty loop iteration: the fastest of `runs` runs."""
+    # Same loop shape as AdaptiveTimer.sample(), calling a function that does nothing.
+    clock = perf_counter_ns
+    best = None
+    inputs = cycle((None,))
+    for _ in range(runs):
+        start = clock()
+        for arg in islice(inputs, loop):
+            _noop(arg)
+        elapsed = clock() - start - timer_ns
+        best = elapsed if best is None else min(best, elapsed)
+    return max(0.0, best / loop)
+
+
+def calibrate(repeats=CALIBRATION_REPEATS):
+    """Measures the cost of reading the clock and of one empty loop iteration (median of `repeats`)."""
+    clock = perf_counter_ns
+    timer = None
+    for _ in range(CALIBRATION_ROUNDS):
+        start = clock()
+        gap = clock() - start
+        if timer is None or gap < timer:
+            timer = gap
+    timer = max(0, timer)
+    estimates = [measure_loop_overhead(timer) for _ in range(repeats)]
+    return Calibration(timer_overhead_ns=timer, loop_overhead_ns=statistics.median(estimates),
+                       loop_overhead_spread_ns=max(estimates) - min(estimates))
+
+
+class Overhead:
+    """The overhead one algorithm's timers subtract; the loop part is re-measured every `interval`.
+
+    Belongs to the algorithm's thread or process and outlives its timers (new params, new timer).
+    """
+
+    def __init__(self, calibration, interval=RECHECK_INTERVAL):
+        self.timer_ns = calibration.timer_overhead_ns
+        self.estimates = deque([calibration.loop_overhead_ns], maxlen=RECHECK_WINDOW)
+        self.loop_ns = calibration.loop_overhead_ns
+        self.interval = interval
+        self.next_check = monotonic() + interval
+
+    def due(self):
+        return monotonic() >= self.next_check
+
+    def recheck(self):
+        """Measures the empty loop once more (never inside a timed sample); returns the new median."""
+        self.estimates.append(measure_loop_overhead(self.timer_ns, RECHECK_LOOP))
+        self.loop_ns = statistics.median(self.estimates)
+        self.next_check = monotonic() + self.interval
+        return self.loop_ns
+
+
+class AdaptiveTimer:
+    """
+    Times `func` in batches that grow or shrink to last about `target_ns` each.
+
+    Every call receives the next element of `inputs`, cycling endlessly.
+    `overhead` is the algorithm's Overhead.
+    """
+
+    def __init__(self, func, inputs, overhead, target_ns=TARGET_SAMPLE_NS):
+        self.func = func
+        self.inputs = cycle(inputs)
+        self.overhead = overhead
+        self.target_ns = target_ns
+        self.batch = 1
+
+    def sample(self):
+        """Runs one timed batch; returns (per_iteration_ns, batch_size, raw_per_iteration_ns).
+
+        per_iteration_ns is None when the corrected duration is not above zero.
+        """
+        overhead = self.overhead
+        if overhead.due():
+            overhead.recheck()
+        func, inputs, batch = self.func, self.inputs, self.batch
+        start = perf_counter_ns()
+        for arg in islice(inputs, batch):
+            func(arg)
+        elapsed = perf_counter_ns() - start
+        net = round((elapsed - overhead.timer_ns - overhead.loop_ns * batch) / batch)
+        self._adapt(elapsed)
+        return (net if net > 0 else None), batch, round(elapsed / batch)
+
+    def _adapt(self, elapsed):
+        batch, target = self.batch, self.target_ns
+        if elapsed < target:
+            scaled = int(batch * target / max(elapsed, 1))
+            self.batch = min(MAX_BATCH, batch * MAX_GROWTH, max(batch + 1, scaled))
+        elif elapsed > 4 * target and batch > 1:
+            self.batch = max(1, int(batch * target / elapsed))
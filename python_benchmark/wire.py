@@ -0,0 +1,64 @@
+# =========================
+#   P-RAF: Binary Wire Format (Python reference implementation)
+# =========================
+#
+# Mirrors praf_protocol.py on the orchestrator side. The worker announces its
+# language and algorithm names once in a JSON `hello` line; afterwards every
+# message is a length-prefixed frame and algorithms are referred to by id.
+
+import json
+import struct
+
+FRAME_HEADER = struct.Struct("<I")
+RECORDS_HEADER = struct.Struct("<BBHI")
+
+KIND_RECORDS = 1
+KIND_JSON = 2
+
+FLAG_TIMESTAMP = 0x01
+FLAG_ITERATIONS = 0x02
+
+
+def encode_hello(lang, algorithms, encodings, **info):
+    """Handshake line sent right after connecting (always JSON).
+
+    Extra keyword arguments (e.g. the execution mode) are sent along as-is.
+    """
+    return (json.dumps({
+        "type": "hello",
+        "lang": lang,
+        "encodings": list(encodings),
+        "algorithms": list(algorithms),
+        **info
+    }) + "\n").encode("utf-8")
+
+
+def _frame(body):
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def encode_records(algo_id, durations_ns, iterations=None, timestamps=None):
+    """
+    One RECORDS frame: int64 nanosecond durations, optionally followed per record
+    by the int64 batch size (FLAG_ITERATIONS) and a float64 timestamp (FLAG_TIMESTAMP).
+    """
+    count = len(durations_ns)
+    flags, columns, fmt = 0, [durations_ns], "q"
+    if iterations is not None:
+        flags |= FLAG_ITERATIONS
+        columns.append(iterations)
+        fmt += "q"
+    if timestamps is not None:
+        flags |= FLAG_TIMESTAMP
+        columns.append(timestamps)
+        fmt += "d"
+    header = RECORDS_HEADER.pack(KIND_RECORDS, flags, algo_id, count)
+    if len(columns) == 1:
+        return _frame(header + struct.pack(f"<{count}q", *durations_ns))
+    interleaved = [field for record in zip(*columns) for field in record]
+    return _frame(header + struct.pack("<" + fmt * count, *interleaved))
+
+
+def encode_json(message):
+    """A JSON message carried inside the binary stream (e.g. `register`)."""
+    return _frame(bytes((KIND_JSON,)) + json.dumps(message, separators=(",", ":")).encode("utf-8"))
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from praf_affinity import CoreMap, affinity_supported, place_process
+
+
+def test_blocks_cover_only_the_launched_workers():
+    core_map = CoreMap.plan(["Python", "Rust"], cores=range(9), housekeeping=1)
+    assert core_map.housekeeping == [0]
+    assert core_map.workers == {"Python": [1, 2, 3, 4], "Rust": [5, 6, 7, 8]}
+    assert not core_map.shared
+
+
+def test_without_workers_only_housekeeping_is_planned():
+    core_map = CoreMap.plan([], cores=range(4), housekeeping=2)
+    assert core_map.housekeeping == [0, 1] and core_map.workers == {}
+    assert not core_map.shared
+
+
+def test_too_few_cores_are_shared_round_robin():
+    core_map = CoreMap.plan(["a", "b", "c"], cores=range(3), housekeeping=1)
+    assert core_map.shared
+    assert core_map.workers == {"a": [1], "b": [2], "c": [1]}
+
+
+@pytest.mark.skipif(not affinity_supported(), reason="needs os.sched_setaffinity")
+def test_place_process_pins_a_running_child():
+    core = sorted(os.sched_getaffinity(0))[0]
+    child = subprocess.Popen([sys.executable, "-c", "import sys; sys.stdin.read()"], stdin=subprocess.PIPE)
+    try:
+        place_process(child.pid, [core])
+        assert os.sched_getaffinity(child.pid) == {core}
+    finally:
+        child.communicate(b"")
@@ -0,0 +1,54 @@
+import pytest
+
+from praf_aggregator import ResultAggregator, build_results_frame
+from praf_histogram import LogHistogram
+
+KEY = ("Python", "array_sort")
+
+
+def test_deltas_are_weighted_by_iterations_and_reset_per_tick():
+    aggregator = ResultAggregator()
+    aggregator.add(*KEY, 2e-6, iterations=4)
+    aggregator.add(*KEY, 1e-6)
+    aggregator.add_ns(*KEY, [3000, 500], iterations=[2, 1])
+    count, total, low, high = aggregator.drain()[KEY]
+    assert count == 8
+    assert total == pytest.approx(4 * 2e-6 + 1e-6 + 2 * 3e-6 + 0.5e-6)
+    assert (low, high) == pytest.approx((0.5e-6, 3e-6))
+    assert aggregator.drain() == {}
+
+    # Totals keep counting across ticks; `samples` counts every sample once.
+    aggregator.add_ns(*KEY, [1000, 1000])
+    assert aggregator.drain()[KEY][0] == 2
+    assert aggregator.histograms[KEY].count == 10
+    assert aggregator.samples[KEY].count == 6
+
+
+def test_runs_that_arrive_as_histograms_join_deltas_and_totals_only():
+    aggregator = ResultAggregator()
+    aggregator.add(*KEY, 2e-6)
+    hist = LogHistogram()
+    for value in (1000, 4000, 4000):
+        hist.record(value)
+    aggregator.add_histogram(*KEY, hist)
+    aggregator.add_histogram(*KEY, LogHistogram())
+    count, total, low, high = aggregator.drain()[KEY]
+    assert count == 4 and total == pytest.approx(11e-6)
+    assert (low, high) == pytest.approx((1e-6, 4e-6))
+    assert aggregator.histograms[KEY].count == 4 and aggregator.samples[KEY].count == 1
+
+
+def test_results_frame_carries_deltas_percentiles_and_elements():
+    aggregator = ResultAggregator()
+    for ns in range(1000, 2000, 10):
+        aggregator.add_ns(*KEY, [ns])
+    aggregator.add("Rust", "array_sort", 1e-6, iterations=3)
+    aggregator.set_elements(*KEY, 64)
+    frame = build_results_frame(aggregator.drain(), aggregator.histograms, 12.5, 0.1, aggregator.elements)
+    assert (frame["type"], frame["timestamp"], frame["interval"]) == ("results", 12.5, 0.1)
+    python, rust = frame["results"]
+    assert (python["lang"], python["algo"], python["count"], python["elements"]) == ("Python", "array_sort", 100, 64)
+    assert python["sum"] == pytest.approx(sum(range(1000, 2000, 10)) * 1e-9)
+    assert python["p50"] == pytest.approx(1.5e-6, rel=0.05)
+    assert python == {**python, **aggregator.percentiles(*KEY)}
+    assert (rust["count"], rust["elements"], rust["min"], rust["max"]) == (3, 1, 1e-6, 1e-6)
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from praf_aggregator import ResultAggregator
+from praf_baseline import (
+    IMPROVEMENT, INSUFFICIENT, REGRESSION, UNCHANGED, compare_runs, entries_from_state, histograms_from_records,
+    load_baseline, save_baseline,
+)
+
+KEY = ("Python", "is_leap_year")
+
+
+def entries(durations_ns, iterations):
+    aggregator = ResultAggregator()
+    aggregator.add_ns(*KEY, [int(d) for d in durations_ns], [int(i) for i in iterations])
+    return entries_from_state(aggregator)
+
+
+def lognormal(seed, n, median_ns=1000.0, sigma=0.2):
+    return np.random.default_rng(seed).lognormal(np.log(median_ns), sigma, n)
+
+
+def test_batched_iterations_do_not_count_as_samples():
+    # 300 timed samples of 100,000 iterations each from one distribution: n is 300, not 30 million.
+    baseline = entries(lognormal(1, 300), [100_000] * 300)
+    candidate = entries(lognormal(2, 300), [100_000] * 300)
+    (comparison,) = compare_runs(baseline, candidate)
+    assert (comparison.baseline_samples, comparison.candidate_samples) == (300, 300)
+    assert comparison.baseline_runs == 30_000_000
+    assert comparison.verdict == UNCHANGED
+    assert comparison.p_value > 0.01
+    assert comparison.ci_high - comparison.ci_low > 0.01  # Not "1.000-1.000"
+
+
+def test_known_shift_is_a_regression_and_its_mirror_an_improvement():
+    baseline = entries(lognormal(1, 500), [1000] * 500)
+    candidate = entries(lognormal(2, 500, median_ns=1200.0), [1000] * 500)
+    (slower,) = compare_runs(baseline, candidate)
+    assert slower.verdict == REGRESSION
+    assert slower.ci_low < 1.2 < slower.ci_high
+    assert slower.effect > 0.5
+    (faster,) = compare_runs(candidate, baseline)
+    assert faster.verdict == IMPROVEMENT
+
+
+def test_few_samples_are_insufficient_however_many_iterations():
+    (comparison,) = compare_runs(entries([1000] * 10, [1 << 20] * 10), entries([1000] * 10, [1 << 20] * 10))
+    assert comparison.verdict == INSUFFICIENT
+    assert comparison.baseline_samples == 10
+
+
+def test_histograms_from_records_weights_only_the_first_histogram():
+    weighted, samples = histograms_from_records(np, [100, 200, 5000], [1, 10, 100])
+    assert (weighted.count, samples.count) == (111, 3)
+    assert weighted.sum == 100 + 2000 + 500_000
+    assert samples.sum == 5300
+    assert samples.min == weighted.min == 100 and samples.max == weighted.max == 5000
+
+
+def test_save_and_load_keep_both_histograms(tmp_path):
+    path = save_baseline(str(tmp_path / "b.json"), entries(lognormal(1, 50), [10] * 50))
+    loaded, _ = load_baseline(str(path))
+    assert loaded[KEY].histogram.count == 500
+    assert loaded[KEY].samples.count == 50
+
+
+def test_version_1_baselines_are_rejected(tmp_path):
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"version": 1, "results": {}}))
+    with pytest.raises(ValueError, match="iteration-weighted"):
+        load_baseline(str(path))
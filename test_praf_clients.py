@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+
+from praf_clients import (
+    EVENT_QUEUE_LIMIT, MAX_CLIENT_INTERVAL, RECOVERY_SENDS, SLOW_CLOSE_CODE, SLOW_STRIKES, DashboardClient,
+    Subscription, merge_entry,
+)
+
+
+class FakeWebSocket:
+    remote_address = ("127.0.0.1", 50000)
+
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self, code, reason):
+        self.closed = (code, reason)
+
+
+def entry(lang, algo, count, total, low, high, p50):
+    return {"lang": lang, "algo": algo, "count": count, "sum": total, "min": low, "max": high, "p50": p50,
+            "phase": "steady"}
+
+
+def frame(timestamp, *entries):
+    return {"type": "results", "timestamp": timestamp, "interval": 0.1, "results": list(entries)}
+
+
+def test_merge_entry_adds_counts_widens_extremes_and_keeps_the_latest_fields():
+    pending = entry("Python", "array_sort", 2, 3.0, 1.0, 2.0, 1.5)
+    merge_entry(pending, entry("Python", "array_sort", 3, 6.0, 0.5, 1.8, 1.2))
+    assert pending == entry("Python", "array_sort", 5, 9.0, 0.5, 2.0, 1.2)
+
+
+def test_client_conflates_the_deltas_of_ticks_it_is_behind_on():
+    async def run():
+        client = DashboardClient(FakeWebSocket(), 0.1)
+        first = frame(1.0, entry("Python", "array_sort", 2, 3.0, 1.0, 2.0, 1.5))
+        client.offer_results(first, json.dumps(first))
+        assert client._take() == [json.dumps(first)]  # One tick, full subscription: the shared frame as-is
+
+        client.offer_results(first, json.dumps(first))
+        second = frame(1.1, entry("Python", "array_sort", 3, 6.0, 0.5, 1.8, 1.2),
+                       entry("Rust", "array_sort", 1, 0.5, 0.5, 0.5, 0.5))
+        client.offer_results(second, json.dumps(second))
+        message, = client._take()
+        return json.loads(message), client
+
+    message, client = asyncio.run(run())
+    assert message["conflated"] == 2 and message["timestamp"] == 1.1
+    assert message["interval"] == pytest.approx(0.2)
+    assert message["results"] == [
+        entry("Python", "array_sort", 5, 9.0, 0.5, 2.0, 1.2), entry("Rust", "array_sort", 1, 0.5, 0.5, 0.5, 0.5),
+    ]
+    assert not client.pending and client.pending_since is None
+
+
+def test_subscription_filters_langs_algos_and_metrics():
+    subscription = Subscription.from_request(
+        {"langs": ["Rust"], "algos": ["array_sort"], "metrics": ["counts"], "max_rate": 2}, 0.1)
+    assert subscription.interval == 0.5 and not subscription.everything
+    assert subscription.wants("Rust") and not subscription.wants("Python")
+    assert subscription.filter_entry(entry("Rust", "fibonacci", 1, 1.0, 1.0, 1.0, 1.0)) is None
+    assert subscription.filter_entry(entry("Rust", "array_sort", 1, 1.0, 1.0, 1.0, 1.0)) == {
+        "lang": "Rust", "algo": "array_sort", "count": 1, "sum": 1.0, "min": 1.0, "max": 1.0,
+    }
+    assert Subscription.from_request({"max_rate": 100}, 0.1).interval == 0.1
+    assert Subscription.from_request({}, 0.1).everything
+
+    async def run():
+        client = DashboardClient(FakeWebSocket(), 0.1)
+        client.subscribe(subscription)
+        client.offer_results(frame(1.0, entry("Python", "array_sort", 1, 1.0, 1.0, 1.0, 1.0)), "{}")
+        assert not client.pending
+        client.offer_event("python", lang="Python")
+        client.offer_event("rust", lang="Rust")
+        return list(client.events)
+
+    assert asyncio.run(run()) == ["rust"]
+
+
+@pytest.mark.parametrize("request_", [
+    {"metrics": ["counts", "latency"]}, {"langs": "Rust"}, {"max_rate": 0},
+])
+def test_subscription_rejects_invalid_requests(request_):
+    with pytest.raises(ValueError):
+        Subscription.from_request(request_, 0.1)
+
+
+def test_slow_client_is_downgraded_then_dropped_and_recovers_when_it_keeps_up():
+    async def run():
+        websocket = FakeWebSocket()
+        client = DashboardClient(websocket, 0.1)
+        intervals = []
+        while True:
+            for _ in range(SLOW_STRIKES - 1):
+                assert await client._check_health(10.0)
+            if not await client._check_health(10.0):
+                break
+            intervals.append(client.interval)
+        return websocket, client, intervals
+
+    websocket, client, intervals = asyncio.run(run())
+    assert intervals == [0.5, 1.0, 2.0, 4.0, MAX_CLIENT_INTERVAL]
+    assert websocket.closed == (SLOW_CLOSE_CODE, "slow consumer")
+    assert sum(json.loads(e)["level"] == "warn" for e in client.events) == len(intervals)
+
+    async def recover():
+        client = DashboardClient(FakeWebSocket(), 0.1)
+        client.interval = 2.0
+        for _ in range(RECOVERY_SENDS):
+            await client._check_health(0.0)
+        return client.interval
+
+    assert asyncio.run(recover()) == 1.0
+
+
+def test_dropped_events_count_as_a_strike():
+    async def run():
+        client = DashboardClient(FakeWebSocket(), 0.1)
+        for i in range(EVENT_QUEUE_LIMIT + 1):
+            client.offer_event(str(i))
+        await client._check_health(0.0)
+        return client
+
+    client = asyncio.run(run())
+    assert client.dropped_events == 1 and client.strikes == 1
+    assert client.events[0] == "1"
@@ -0,0 +1,35 @@
+import pytest
+
+from praf_clock import CLOCK_WINDOW, NodeClock, ntp_sample
+
+
+def exchange(t0, skew, up, down, hold=0.001):
+    """(t0, t1, t2, t3) of one exchange with a worker clock `skew` seconds ahead and the given leg delays."""
+    t1 = t0 + up + skew
+    t2 = t1 + hold
+    return t0, t1, t2, t2 - skew + down
+
+
+def test_ntp_sample_recovers_offset_and_round_trip():
+    offset, delay = ntp_sample(*exchange(100.0, 2.5, 0.01, 0.01))
+    assert offset == pytest.approx(2.5) and delay == pytest.approx(0.02)
+    offset, _ = ntp_sample(*exchange(100.0, 2.5, 0.03, 0.01))  # Asymmetric legs: off by half the difference
+    assert offset == pytest.approx(2.51)
+
+
+def test_clock_keeps_the_offset_of_the_min_delay_exchange_and_corrects_with_it():
+    clock = NodeClock("lab-1")
+    assert not clock.synced and clock.correct(50.0) == 50.0
+    clock.add(*exchange(100.0, 2.0, 0.040, 0.010))  # Queued on the way out: offset off by 15 ms
+    clock.add(*exchange(101.0, 2.0, 0.002, 0.002))  # Fastest exchange: exact
+    clock.add(*exchange(102.0, 2.0, 0.010, 0.030))
+    assert clock.synced and clock.exchanges == 3
+    assert clock.offset == pytest.approx(2.0) and clock.delay == pytest.approx(0.004)
+    assert clock.correct(150.0) == pytest.approx(148.0)
+    assert clock.correct_many([150.0, 151.0]) == pytest.approx([148.0, 149.0])
+    assert clock.to_dict()["uncertainty_s"] == pytest.approx(0.002)
+
+    # Once the best exchange has left the window, the best of the newer ones wins.
+    for i in range(CLOCK_WINDOW):
+        clock.add(*exchange(200.0 + i, 2.1, 0.006 + i * 0.001, 0.004))
+    assert clock.offset == pytest.approx(2.101) and clock.delay == pytest.approx(0.010)
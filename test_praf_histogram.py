@@ -0,0 +1,93 @@
+import math
+import random
+
+import pytest
+
+from praf_histogram import (
+    BUCKET_COUNT, SUB_BUCKET_COUNT, LogHistogram, bucket_bounds, bucket_index,
+)
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+def test_small_values_have_buckets_of_their_own():
+    for value in range(2 * SUB_BUCKET_COUNT):
+        assert bucket_index(value) == value
+        assert bucket_bounds(value) == (value, value)
+
+
+def test_every_value_lies_within_its_bucket_bounds():
+    rng = random.Random(4)
+    values = [rng.getrandbits(rng.randrange(1, 63)) for _ in range(20_000)] + [(1 << 63) - 1]
+    for value in values:
+        lowest, highest = bucket_bounds(bucket_index(value))
+        assert lowest <= value <= highest
+        assert highest - lowest < max(1, lowest / SUB_BUCKET_COUNT) + 1
+    assert bucket_index((1 << 63) - 1) == BUCKET_COUNT - 1
+
+
+def test_buckets_are_contiguous():
+    previous_high = -1
+    for index in range(BUCKET_COUNT):
+        lowest, highest = bucket_bounds(index)
+        assert lowest == previous_high + 1
+        previous_high = highest
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.99, 0.999])
+def test_quantiles_are_within_the_relative_error_bound(q):
+    rng = random.Random(7)
+    values = [int(rng.lognormvariate(10, 1.5)) for _ in range(50_000)]
+    hist = LogHistogram()
+    hist.record_many(values)
+    exact = exact_quantile(values, q)
+    assert abs(hist.quantile(q) - exact) <= exact / SUB_BUCKET_COUNT + 1
+
+
+def test_record_many_matches_record_and_fills_the_sample_histogram():
+    values, weights = [5, 70, 3000, 3000, 10**9], [1, 4, 2, 8, 1]
+    one_by_one, batched, samples = LogHistogram(), LogHistogram(), LogHistogram()
+    for value, weight in zip(values, weights):
+        one_by_one.record(value, weight)
+    batched.record_many(values, weights, samples)
+    assert batched.counts == one_by_one.counts
+    assert (batched.count, batched.sum, batched.min, batched.max) == (16, 5 + 280 + 6000 + 24000 + 10**9, 5, 10**9)
+    assert (samples.count, samples.sum, samples.min, samples.max) == (5, sum(values), 5, 10**9)
+
+
+def test_since_returns_exactly_what_was_added():
+    hist = LogHistogram()
+    hist.record_many([100, 200, 300])
+    earlier = hist.copy()
+    hist.record_many([5000, 5000, 90])
+    diff = hist.since(earlier)
+    assert diff.count == 3 and diff.sum == 10090
+    assert diff.counts[bucket_index(5000)] == 2 and diff.counts[bucket_index(90)] == 1
+    assert diff.min == 90 and diff.max <= 5000
+    assert hist.since(hist.copy()).count == 0
+
+
+def test_merge_and_dict_round_trip():
+    a, b = LogHistogram(), LogHistogram()
+    a.record_many([1, 2, 3])
+    b.record_many([10**6, 10**7])
+    merged = a.copy().merge(b)
+    assert merged.count == 5 and (merged.min, merged.max) == (1, 10**7)
+    restored = LogHistogram.from_dict(merged.to_dict())
+    assert restored.counts == merged.counts
+    assert (restored.count, restored.sum, restored.min, restored.max) == (5, merged.sum, 1, 10**7)
+
+
+def test_other_bucket_layouts_are_rejected():
+    with pytest.raises(ValueError):
+        LogHistogram.from_dict({"sub_bucket_bits": 4, "buckets": {}})
+
+
+def test_negative_values_are_clamped_and_empty_quantiles_are_none():
+    hist = LogHistogram()
+    assert hist.quantiles([0.5, 0.99]) == [None, None]
+    hist.record(-5)
+    assert hist.min == 0 and hist.quantile(0.5) == 0
@@ -0,0 +1,56 @@
+import pytest
+
+import praf_orchestrator
+from praf_aggregator import ResultAggregator
+from praf_clock import NodeClock
+
+
+class FakeResultLog:
+    def __init__(self):
+        self.records = []
+
+    def append(self, lang, algo, timestamp, duration_ns, iterations=1, worker_timestamp=None):
+        self.records.append((lang, algo, duration_ns, iterations, worker_timestamp))
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setattr(praf_orchestrator, "aggregator", ResultAggregator())
+    monkeypatch.setattr(praf_orchestrator, "result_log", FakeResultLog())
+    monkeypatch.setattr(praf_orchestrator, "scheduler", None)
+    return praf_orchestrator
+
+
+def batch(**payload):
+    return {"type": "data_batch", "payload": {"lang": "Python", "algo": "array_sort", **payload}}
+
+
+def test_data_batch_is_aggregated_per_algorithm_and_weighted_by_iterations(orchestrator):
+    orchestrator.ingest_payload(batch(mode="processes", results=[
+        {"duration": 2e-6, "iterations": 4},
+        {"duration": 1e-6},
+        {"algo": "fibonacci", "duration": 5e-7, "iterations": 2},
+    ]))
+    deltas = orchestrator.aggregator.drain()
+    assert set(deltas) == {("Python [processes]", "array_sort"), ("Python [processes]", "fibonacci")}
+    count, total, low, high = deltas[("Python [processes]", "array_sort")]
+    assert count == 5 and total == pytest.approx(9e-6) and (low, high) == (1e-6, 2e-6)
+    assert deltas[("Python [processes]", "fibonacci")][:2] == [2, pytest.approx(1e-6)]
+    assert orchestrator.aggregator.samples[("Python [processes]", "array_sort")].count == 2
+    assert [record[:4] for record in orchestrator.result_log.records] == [
+        ("Python [processes]", "array_sort", 2000, 4), ("Python [processes]", "array_sort", 1000, 1),
+        ("Python [processes]", "fibonacci", 500, 2),
+    ]
+
+
+def test_data_batch_of_a_session_uses_its_series_and_clock(orchestrator):
+    session = orchestrator.WorkerSession(("10.0.0.2", 40000))
+    session.lang = "Python @lab-1"
+    session.clock = NodeClock("lab-1")
+    session.clock.offset = 2.0
+    orchestrator.ingest_payload(batch(results=[{"duration": 3e-6}, {"duration": 1e-6, "timestamp": 102.5}]), session)
+    count, total, _, _ = orchestrator.aggregator.drain()[("Python @lab-1", "array_sort")]
+    assert count == 2 and total == pytest.approx(4e-6)
+    worker_timestamps = [record[4] for record in orchestrator.result_log.records]
+    assert worker_timestamps[0] != worker_timestamps[0] and worker_timestamps[1] == 100.5  # NaN: none sent
+    assert session.clock.lag.count == 1
@@ -0,0 +1,31 @@
+import asyncio
+
+from praf_profile import ProfileCollector, top_frames
+
+KEY = ("Python", "array_sort")
+
+
+def payload(stacks, duration=1.0):
+    return {"duration": duration, "results": [{"algo": KEY[1], "stacks": stacks}, {"algo": "idle", "stacks": {}}]}
+
+
+def test_profiles_merge_and_are_written_off_the_loop(tmp_path):
+    profiles = ProfileCollector(tmp_path / "session")
+    assert profiles.add(KEY[0], payload({"a;b": 3, "a;c": 1})) == [KEY]
+    assert profiles.add(KEY[0], payload({"a;b": 2})) == [KEY]
+    assert not profiles.path(KEY).exists()  # Nothing is written until a flush
+
+    asyncio.run(profiles.flush())
+    assert profiles.path(KEY).read_text(encoding="utf-8") == "a;b 5\na;c 1\n"
+    summary = profiles.summary(KEY)
+    assert summary["samples"] == 6 and summary["seconds"] == 2.0
+    assert summary["top"][0] == ["b", round(5 / 6, 4)]
+
+    profiles.add(KEY[0], payload({"a;c": 9}))
+    profiles.close()
+    assert profiles.path(KEY).read_text(encoding="utf-8") == "a;c 10\na;b 5\n"
+
+
+def test_top_frames_rank_leaf_frames_by_self_time():
+    assert top_frames({"a;b": 1, "x;b": 1, "a": 2}, limit=1) == [("b", 0.5)]
+    assert top_frames({}) == []
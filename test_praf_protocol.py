@@ -0,0 +1,70 @@
+import importlib.util
+import struct
+from pathlib import Path
+
+import pytest
+
+from praf_protocol import (
+    FRAME_HEADER, KIND_JSON, KIND_RECORDS, RECORDS_HEADER, ProtocolError, choose_encoding, decode_json,
+    decode_records,
+)
+
+DURATIONS = [120, 7, 1 << 40, 0]
+ITERATIONS = [1024, 1, 1, 65536]
+TIMESTAMPS = [1720430123.5, 1720430123.25, 1720430124.0, 1720430124.125]
+
+
+def load_worker_wire():
+    # The worker's reference encoder, loaded by path (python_benchmark is not a package).
+    path = Path(__file__).resolve().parent / "python_benchmark" / "wire.py"
+    spec = importlib.util.spec_from_file_location("worker_wire", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def body_of(frame):
+    (length,) = FRAME_HEADER.unpack_from(frame)
+    assert length == len(frame) - FRAME_HEADER.size
+    return frame[FRAME_HEADER.size:]
+
+
+@pytest.mark.parametrize("iterations", [None, ITERATIONS])
+@pytest.mark.parametrize("timestamps", [None, TIMESTAMPS])
+def test_records_decode_what_the_worker_encodes(iterations, timestamps):
+    wire = load_worker_wire()
+    body = body_of(wire.encode_records(3, DURATIONS, iterations, timestamps))
+    assert body[0] == KIND_RECORDS
+    algo_id, durations, decoded_iterations, decoded_timestamps = decode_records(body)
+    assert algo_id == 3
+    assert list(durations) == DURATIONS
+    assert (None if decoded_iterations is None else list(decoded_iterations)) == iterations
+    assert (None if decoded_timestamps is None else list(decoded_timestamps)) == timestamps
+
+
+def test_truncated_and_miscounted_frames_are_protocol_errors():
+    with pytest.raises(ProtocolError, match="Truncated"):
+        decode_records(bytes([KIND_RECORDS, 0, 0]))
+    header = RECORDS_HEADER.pack(KIND_RECORDS, 0, 1, 3)  # Announces 3 records, carries 2
+    with pytest.raises(ProtocolError, match="Expected 3 records"):
+        decode_records(header + struct.pack("<2q", 1, 2))
+
+
+def test_empty_records_frame_decodes_to_empty_columns():
+    algo_id, durations, iterations, timestamps = decode_records(RECORDS_HEADER.pack(KIND_RECORDS, 0, 9, 0))
+    assert algo_id == 9 and len(durations) == 0 and iterations is None and timestamps is None
+
+
+def test_json_frames():
+    wire = load_worker_wire()
+    body = body_of(wire.encode_json({"type": "register", "algorithms": ["a", "b"]}))
+    assert body[0] == KIND_JSON
+    assert decode_json(body) == {"type": "register", "algorithms": ["a", "b"]}
+    with pytest.raises(ProtocolError):
+        decode_json(bytes([KIND_JSON]) + b"{not json")
+
+
+def test_encoding_negotiation_prefers_the_workers_order():
+    assert choose_encoding(["msgpack", "binary", "json"]) == "binary"
+    assert choose_encoding(["json", "binary"]) == "json"
+    assert choose_encoding(None) == "json"
@@ -0,0 +1,73 @@
+import csv
+
+import pytest
+
+from praf_aggregator import ResultAggregator
+from praf_histogram import REPORTED_PERCENTILES, LogHistogram
+from praf_report import CSV_COLUMNS, TELEMETRY_COLUMNS, result_rows, write_csv
+from praf_steadystate import SteadyStateDetector
+
+SORT = ("Python", "array_sort@256")
+FIB = ("Rust", "fibonacci")
+
+
+class FakeScheduler:
+    measured = {SORT: 2.0}
+    phases = {SORT: ("measure", "sweep-002")}
+
+
+class FakeSteadyState:
+    """Rust/fibonacci was steady for its last two runs, with one changepoint."""
+
+    def steady_histogram(self, key, histogram):
+        if key != FIB:
+            return None
+        steady = LogHistogram()
+        steady.record(1000, 2)
+        return steady
+
+    def phases(self, key):
+        phases = ["transient", "steady", "transient", "steady"] if key == FIB else []
+        return [{"phase": phase} for phase in phases]
+
+
+def aggregated():
+    aggregator = ResultAggregator()
+    aggregator.add_ns(*SORT, [2000, 4000], [3, 1])
+    aggregator.set_elements(*SORT, 8)
+    aggregator.add_ns(*FIB, [1000, 1000, 5000])
+    aggregator.add_ns("Rust", "idle", [])
+    return aggregator
+
+
+def test_rows_hold_counts_throughput_and_percentiles_per_key():
+    sort, fib = result_rows(aggregated(), SteadyStateDetector(), FakeScheduler())
+    assert (sort["lang"], sort["algo"], sort["size"], sort["test_id"]) == ("Python", "array_sort@256", 256, "sweep-002")
+    assert (sort["runs"], sort["elements"], sort["measured_sec"]) == (4, 8, 2.0)
+    assert (sort["runs_per_sec"], sort["elements_per_sec"]) == (2.0, 16.0)
+    assert sort["mean_s"] == pytest.approx(2.5e-6, rel=0.01)
+    assert sort["min_s"] == pytest.approx(2e-6) and sort["max_s"] == pytest.approx(4e-6)
+    assert all(sort[f"{name}_s"] is not None for name, _ in REPORTED_PERCENTILES)
+    assert sort["steady_runs"] == 0 and sort["steady_p50_s"] is None and sort["changepoints"] == 0
+    assert all(sort[column] is None for column in TELEMETRY_COLUMNS)
+    assert (fib["size"], fib["test_id"], fib["runs_per_sec"]) == (None, None, None)
+
+
+def test_rows_report_steady_state_data_and_changepoints():
+    _, fib = result_rows(aggregated(), FakeSteadyState())
+    assert fib["steady_runs"] == 2 and fib["steady_p50_s"] == pytest.approx(1e-6, rel=0.01)
+    assert fib["changepoints"] == 1
+
+
+def test_csv_has_one_column_per_field_and_one_line_per_row(tmp_path):
+    rows = result_rows(aggregated(), SteadyStateDetector(), FakeScheduler())
+    path = tmp_path / "out" / "report.csv"
+    write_csv(rows, path)
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        lines = list(reader)
+    assert header == CSV_COLUMNS
+    assert set(CSV_COLUMNS) <= set(rows[0])  # Every column is filled from the rows ("phases" stays out)
+    assert [line[:5] for line in lines] == [["Python", "array_sort@256", "256", "sweep-002", "4"],
+                                           ["Rust", "fibonacci", "", "", "3"]]
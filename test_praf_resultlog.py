@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from praf_resultlog import RECORD, SEGMENT_HEADER, ResultLogReader, ResultLogWriter, replay
+
+pytest.importorskip("numpy")
+
+
+def write_log(directory):
+    """Ten results of Python/array_sort at t=100..109 and one of C++/fibonacci, three records per segment."""
+    writer = ResultLogWriter(directory, segment_bytes=SEGMENT_HEADER.size + 3 * RECORD.size)
+    for i in range(10):
+        writer.append("Python", "array_sort", 100.0 + i, 1000 + i, iterations=i % 2)
+    writer.append_many("C++", "fibonacci", 104.5, [50], iterations=[4], worker_timestamps=[104.25])
+    writer.close()
+
+
+def test_segments_rotate_and_time_ranges_read_back(tmp_path):
+    write_log(tmp_path)
+    assert sorted(path.name for path in tmp_path.glob("*.seg")) == [
+        "000-000-000001.seg", "000-000-000002.seg", "000-000-000003.seg", "000-000-000004.seg",
+        "001-001-000001.seg",
+    ]
+
+    reader = ResultLogReader(tmp_path)
+    assert reader.keys() == [("C++", "fibonacci"), ("Python", "array_sort")]
+    assert reader.time_range() == (100.0, 109.0)
+
+    # The range starts and ends inside a segment and spans a rotation.
+    found = [(lang, records["timestamp"].tolist()) for lang, _, records in reader.query(102.5, 107.0)]
+    assert found == [("C++", [104.5]), ("Python", [103.0, 104.0, 105.0]), ("Python", [106.0])]
+    durations = [records["duration_ns"].tolist() for _, _, records in reader.query(102.5, 107.0, lang="Python")]
+    assert durations == [[1003, 1004, 1005], [1006]]
+    (_, _, records), = reader.query(algo="fibonacci")
+    assert records["iterations"].tolist() == [4] and records["worker_timestamp"].tolist() == [104.25]
+    assert list(reader.query(200.0)) == []
+
+
+def test_replay_streams_every_record_in_order(tmp_path):
+    write_log(tmp_path)
+    received = {}
+
+    def sink(lang, algo, durations_ns, iterations):
+        entry = received.setdefault((lang, algo), ([], []))
+        entry[0].extend(durations_ns)
+        entry[1].extend(iterations)
+
+    asyncio.run(replay(ResultLogReader(tmp_path), sink, speed=300.0, step=0.01))
+    assert received[("Python", "array_sort")] == ([1000 + i for i in range(10)], [1] * 10)
+    assert received[("C++", "fibonacci")] == ([50], [4])
@@ -0,0 +1,53 @@
+import pytest
+
+from praf_rollup import RESOLUTIONS, RollupRing, RollupStore
+
+
+def test_ring_merges_a_slot_and_reuses_it_after_wrap_around():
+    ring = RollupRing(1, 4)
+    ring.add(10.2, 2, 4.0, 1.0, 3.0)
+    ring.add(10.7, 1, 0.5, 0.5, 0.5)
+    assert ring.window() == [[10, 3.0, 4.5, 0.5, 3.0]]
+
+    ring.add(14.5, 1, 9.0, 9.0, 9.0)  # Same position as slot 10, which is past the ring's reach now
+    assert ring.window() == [[14, 1.0, 9.0, 9.0, 9.0]]
+    ring.add(10.9, 5, 5.0, 1.0, 1.0)  # Too old: dropped instead of overwriting slot 14
+    ring.add(12.0, 1, 2.0, 2.0, 2.0)
+    assert ring.window() == [[12, 1.0, 2.0, 2.0, 2.0], [14, 1.0, 9.0, 9.0, 9.0]]
+
+
+def test_ring_window_bounds_are_start_inclusive_end_exclusive():
+    ring = RollupRing(10, 6)
+    assert ring.window() == []
+    for t in range(0, 60, 10):
+        ring.add(t + 1, 1, t, t, t)
+    assert [p[0] for p in ring.window(20, 40)] == [20, 30]
+    assert [p[0] for p in ring.window(25, 41)] == [20, 30, 40]
+    assert [p[0] for p in ring.window(end=10)] == [0]
+    assert [p[0] for p in ring.window(start=100)] == []
+    ring.add(61, 1, 1.0, 1.0, 1.0)  # Slot 0 falls out of reach
+    assert [p[0] for p in ring.window(end=30)] == [10, 20]
+
+
+def test_store_picks_the_finest_resolution_covering_a_span():
+    store = RollupStore()
+    assert store.pick_resolution(60) == 1
+    assert store.pick_resolution(300) == 1
+    assert store.pick_resolution(301) == 10
+    assert store.pick_resolution(3600) == 10
+    assert store.pick_resolution(4 * 3600) == 60
+    assert store.pick_resolution(24 * 3600) == RESOLUTIONS[-1][0]
+
+
+def test_store_windows_filter_keys_and_reject_unknown_resolutions():
+    store = RollupStore()
+    store.add({("Python", "array_sort"): [2, 4.0, 1.0, 3.0], ("Rust", "array_sort"): [1, 1.0, 1.0, 1.0]}, 125.0)
+    store.add({("Python", "array_sort"): [1, 1.0, 1.0, 1.0]}, 131.0)
+    assert store.window(10, lang="Python") == [
+        {"lang": "Python", "algo": "array_sort", "points": [[120, 2.0, 4.0, 1.0, 3.0], [130, 1.0, 1.0, 1.0, 1.0]]},
+    ]
+    assert [(s["lang"], s["points"][0][1]) for s in store.window(60, algo="array_sort")] == [
+        ("Python", 3.0), ("Rust", 1.0),
+    ]
+    with pytest.raises(ValueError):
+        store.window(5)
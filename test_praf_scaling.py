@@ -0,0 +1,58 @@
+import math
+import random
+
+import pytest
+
+from praf_scaling import analyze, fit_all, fit_power_law, fitted_crossover, measured_crossovers, medians_from_rows
+
+SIZES = [16, 32, 64, 128, 256, 512]
+
+
+def power_law(coefficient, exponent, noise=0.0, seed=2):
+    rng = random.Random(seed)
+    return {n: coefficient * n ** exponent * math.exp(rng.gauss(0, noise)) for n in SIZES}
+
+
+def test_exact_power_law_is_recovered():
+    exponent, stderr, coefficient, r_squared = fit_power_law(sorted(power_law(3e-9, 2.0).items()))
+    assert exponent == pytest.approx(2.0)
+    assert coefficient == pytest.approx(3e-9)
+    assert stderr == pytest.approx(0.0, abs=1e-9)
+    assert r_squared == pytest.approx(1.0)
+
+
+def test_noisy_fit_reports_its_uncertainty():
+    exponent, stderr, _, r_squared = fit_power_law(sorted(power_law(1e-8, 1.5, noise=0.1).items()))
+    assert stderr > 0
+    assert abs(exponent - 1.5) < 4 * stderr
+    assert 0.9 < r_squared < 1.0
+
+
+def test_two_points_have_no_standard_error_and_are_not_fitted():
+    assert fit_power_law([(10, 1.0), (100, 10.0)])[1] is None
+    medians = {("Python", "array_sort"): {16: 1e-6, 32: 2e-6}}
+    assert fit_all(medians) == []
+
+
+def test_rows_are_grouped_by_variant_per_element():
+    rows = [
+        {"lang": "Python-NumPy", "algo": "array_sort@64", "p50_s": 8e-6, "steady_p50_s": 4e-6, "elements": 4},
+        {"lang": "Python-NumPy", "algo": "array_sort@128", "p50_s": 6e-6, "elements": 2},
+        {"lang": "Python-NumPy", "algo": "array_sort", "p50_s": 1e-6},  # Unsized: not part of a sweep
+    ]
+    assert medians_from_rows(rows) == {("Python-NumPy", "array_sort"): {64: 1e-6, 128: 3e-6}}
+
+
+def test_crossover_of_a_quadratic_and_a_linear_series():
+    # Quadratic but cheap per step vs. linear with a large constant: they meet at n = 100.
+    quadratic, linear = power_law(1e-9, 2.0), power_law(1e-7, 1.0)
+    medians = {("Python", "matrix_multiplication"): quadratic, ("Python-NumPy", "matrix_multiplication"): linear}
+    (measured,) = measured_crossovers("matrix_multiplication", "Python", quadratic, "Python-NumPy", linear)
+    assert measured.size == pytest.approx(100.0)
+    assert (measured.faster_below, measured.faster_above) == ("Python", "Python-NumPy")
+    fit_a, fit_b = fit_all(medians)
+    fitted = fitted_crossover(fit_a, fit_b, SIZES[0], SIZES[-1])
+    assert fitted.size == pytest.approx(100.0) and not fitted.extrapolated
+    analysis = analyze(medians)
+    assert [c["method"] for c in analysis["crossovers"]] == ["measured", "fitted"]
+    assert [round(f["exponent"], 6) for f in analysis["fits"]] == [2.0, 1.0]
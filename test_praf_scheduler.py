@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import pytest
+
+import praf_scheduler
+from praf_scheduler import (
+    PHASE_DONE, PHASE_MEASURE, PHASE_WARMUP, PlanError, Scheduler, geometric_sizes, load_plan, split_variant,
+    variant_name,
+)
+
+LANGUAGES = ["Python", "Rust"]
+ALGORITHMS = ["array_sort", "is_leap_year"]
+
+
+def plan_file(tmp_path, plan):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(plan))
+    return str(path)
+
+
+class FakeSession:
+    def __init__(self, lang="Python"):
+        self.language = self.lang = lang
+        self.algorithms = ALGORITHMS
+        self.params = {"array_sort": ["length"]}
+        self.controllable = True
+        self.commands = {"RUN_TEST", "PROFILE", "SHUTDOWN"}
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def test_plan_defaults_and_overrides(tmp_path):
+    mode, steps = load_plan(plan_file(tmp_path, {
+        "test_id": "t", "warmup_sec": 1, "measure_sec": 2, "languages": ["Python"],
+        "tests": [{"language": "Python", "algorithm": "array_sort", "measure_sec": 5, "params": {"length": 64}}],
+    }), LANGUAGES, ALGORITHMS)
+    assert mode == "sequential"
+    (step,) = steps
+    assert (step.test_id, step.warmup_sec, step.measure_sec) == ("t-001", 1.0, 5.0)
+    assert step.variant == "array_sort@64"
+
+
+def test_without_tests_every_language_runs_every_algorithm(tmp_path):
+    _, steps = load_plan(plan_file(tmp_path, {"mode": "concurrent"}), LANGUAGES, ALGORITHMS)
+    assert [(s.language, s.algorithm) for s in steps] == [(lang, algo) for lang in LANGUAGES for algo in ALGORITHMS]
+
+
+def test_sweep_expands_to_geometric_sizes(tmp_path):
+    _, steps = load_plan(plan_file(tmp_path, {
+        "languages": ["Python"], "sweep": {"algorithms": ["array_sort"], "points": 3,
+                                           "ranges": {"array_sort": {"min": 16, "max": 1024}}},
+    }), LANGUAGES, ALGORITHMS)
+    assert [s.variant for s in steps] == ["array_sort@16", "array_sort@128", "array_sort@1024"]
+    assert geometric_sizes(10, 10, 4) == [10]
+
+
+@pytest.mark.parametrize("plan, message", [
+    ({"mode": "sometimes"}, "Unknown plan mode"),
+    ({"tests": [{"language": "Python"}]}, "Invalid test #1"),
+    ({"tests": []}, "no tests"),
+    ({"mode": "concurrent", "languages": ["Python"], "sweep": {"algorithms": ["array_sort"]}}, "sequential mode"),
+])
+def test_invalid_plans(tmp_path, plan, message):
+    with pytest.raises(PlanError, match=message):
+        load_plan(plan_file(tmp_path, plan), LANGUAGES, ALGORITHMS)
+
+
+def test_variant_names_round_trip():
+    assert variant_name("array_sort", {"length": 256.0}) == "array_sort@256"
+    assert variant_name("is_leap_year", {"length": 256}) == "is_leap_year"
+    assert split_variant("array_sort@256") == ("array_sort", 256)
+    assert split_variant("array_sort") == ("array_sort", None)
+
+
+def test_step_gates_results_and_files_late_profiles_under_their_variant(tmp_path, monkeypatch):
+    monkeypatch.setattr(praf_scheduler, "PROFILE_RESULT_TIMEOUT", 2.0)
+    _, steps = load_plan(plan_file(tmp_path, {
+        "test_id": "t", "warmup_sec": 0.01, "measure_sec": 0.01, "profile": True, "languages": ["Python"],
+        "sweep": {"algorithms": ["array_sort"], "points": 2, "ranges": {"array_sort": {"min": 16, "max": 64}}},
+    }), LANGUAGES, ALGORITHMS)
+    session = FakeSession()
+    phases = []
+
+    async def notify(event):
+        phases.append((event["variant"], event["phase"], scheduler.accepts("Python", "array_sort")))
+
+    async def answer_late():
+        await asyncio.sleep(0.2)  # Both steps are done by now
+        assert {"command": "SHUTDOWN"} not in session.sent
+        scheduler.profile_received("Python", "t-001")
+        scheduler.profile_received("Python", "t-002")
+
+    async def run():
+        answering = asyncio.get_running_loop().create_task(answer_late())
+        await scheduler.run()
+        await answering
+
+    scheduler = Scheduler("sequential", steps, {session}, notify)
+    asyncio.run(run())
+    assert phases[:3] == [
+        ("array_sort@16", PHASE_WARMUP, False), ("array_sort@16", PHASE_MEASURE, True),
+        ("array_sort@16", PHASE_DONE, False),
+    ]
+    # The second size is running (or done) when the first profile arrives; its test id still names @16.
+    assert scheduler.variant("Python", "array_sort") == "array_sort@64"
+    assert scheduler.profile_variant("Python", "array_sort", "t-001") == "array_sort@16"
+    stops = [m["payload"] for m in session.sent if m["command"] == "PROFILE" and m["payload"]["action"] == "stop"]
+    assert [stop["plan_test_id"] for stop in stops] == ["t-001", "t-002"]
+    assert session.sent[-1] == {"command": "SHUTDOWN"}
+    assert not scheduler.awaiting
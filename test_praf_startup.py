@@ -0,0 +1,76 @@
+import asyncio
+
+from praf_startup import START_COMMAND, StartupBarrier
+
+
+class FakeProc:
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+
+class FakeSession:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def test_release_waits_until_every_spawned_worker_is_ready():
+    barrier = StartupBarrier(timeout=5.0)
+    sessions = {lang: FakeSession() for lang in ("Python", "Rust")}
+    for lang in sessions:
+        barrier.spawn(lang, FakeProc())
+    barrier.spawn("C++", FakeProc(returncode=1))  # Exited: nothing to wait for
+
+    async def run():
+        release = asyncio.get_running_loop().create_task(barrier.release())
+        barrier.mark_ready("Python", {"init_s": 0.4}, held=True, session=sessions["Python"])
+        await asyncio.sleep(0.05)
+        assert not release.done() and barrier.holding
+        assert sessions["Python"].sent == []
+        barrier.mark_ready("Rust", held=True, session=sessions["Rust"])
+        return await release
+
+    assert asyncio.run(run()) == []
+    assert not barrier.holding and not barrier.held
+    assert all(session.sent == [START_COMMAND] for session in sessions.values())
+
+
+def test_release_after_the_timeout_reports_the_pending_languages():
+    barrier = StartupBarrier(timeout=0.05)
+    session = FakeSession()
+    barrier.spawn("Python", FakeProc())
+    barrier.spawn("Rust", FakeProc())
+    barrier.mark_ready("Python", held=True, session=session)
+    assert asyncio.run(barrier.release()) == ["Rust"]
+    assert session.sent == [START_COMMAND]
+
+    late = FakeSession()
+    barrier.mark_ready("Rust", held=True, session=late)  # Connected after the release: starts right away
+    assert late.sent == [] and not barrier.held
+    assert barrier.summary()["Rust"]["status"] == "late"
+
+
+def test_summary_reports_startup_times_per_language():
+    barrier = StartupBarrier()
+    barrier.spawned = {"Python": (10.0, FakeProc()), "Rust": (10.0, FakeProc()), "C++": (10.0, FakeProc(1)),
+                       "Java": (10.0, FakeProc())}
+    barrier.connected = {"Python": 10.25, "Rust": 10.5, "Java": 11.0}
+    barrier.ready = {"Python": (11.5, {"init_s": 1.2}, True), "Rust": (12.5, {}, True), "Go": (11.0, {}, False)}
+    barrier.released_at = 12.0
+    assert barrier.summary() == {
+        "C++": {"spawn_to_connect_s": None, "spawn_to_ready_s": None, "held_s": None, "worker_init_s": None,
+                "status": "exited"},
+        "Go": {"spawn_to_connect_s": None, "spawn_to_ready_s": None, "held_s": None, "worker_init_s": None,
+               "status": "unheld"},
+        "Java": {"spawn_to_connect_s": 1.0, "spawn_to_ready_s": None, "held_s": None, "worker_init_s": None,
+                 "status": "not ready"},
+        "Python": {"spawn_to_connect_s": 0.25, "spawn_to_ready_s": 1.5, "held_s": 0.5, "worker_init_s": 1.2,
+                   "status": "held"},
+        "Rust": {"spawn_to_connect_s": 0.5, "spawn_to_ready_s": 2.5, "held_s": None, "worker_init_s": None,
+                 "status": "late"},
+    }
@@ -0,0 +1,113 @@
+import math
+import random
+
+from praf_aggregator import ResultAggregator
+from praf_steadystate import (
+    PHASE_STEADY, PHASE_TRANSIENT, STEADY_BLOCK_RUNS, STEADY_WINDOW, SteadyStateDetector, coefficient_of_variation,
+    is_stable, relative_drift,
+)
+
+KEY = ("Python", "fibonacci")
+
+
+class Stream:
+    """Feeds one block of STEADY_BLOCK_RUNS samples per tick through a real aggregator."""
+
+    def __init__(self, seed=3, iterations=1):
+        self.rng = random.Random(seed)
+        self.aggregator = ResultAggregator()
+        self.detector = SteadyStateDetector()
+        self.iterations = iterations
+        self.now = 0.0
+        self.events = []
+
+    def tick(self, mean_ns, noise=0.02, runs=STEADY_BLOCK_RUNS):
+        values = [int(self.rng.gauss(mean_ns, mean_ns * noise)) for _ in range(runs)]
+        self.aggregator.add_ns(*KEY, values, [self.iterations] * len(values))
+        self.now += 1.0
+        self.events += self.detector.update(
+            self.aggregator.drain(), self.aggregator.histograms, self.now, self.aggregator.samples
+        )
+
+    def steady(self, which=0):
+        histograms = self.aggregator.samples if which else self.aggregator.histograms
+        return self.detector.steady_histogram(KEY, histograms[KEY], which)
+
+
+def test_window_statistics():
+    assert coefficient_of_variation([10, 10, 10]) == 0
+    assert math.isclose(coefficient_of_variation([9, 11]), math.sqrt(2) / 10)
+    assert relative_drift([100, 100, 110, 110]) == 0.1
+    assert is_stable([100, 101, 99, 100])
+    assert not is_stable([100, 100, 100, 100, 110, 110, 110, 110])  # Low spread, but trending
+    assert not is_stable([50, 150, 50, 150])
+
+
+def test_warmup_is_excluded_from_the_steady_phase():
+    stream = Stream()
+    for mean in (5000, 3500, 2500, 1800, 1400):  # JIT/cache warmup
+        stream.tick(mean)
+    assert stream.detector.phase(KEY) == PHASE_TRANSIENT
+    assert stream.steady() is None
+    for _ in range(STEADY_WINDOW):
+        stream.tick(1000)
+    assert stream.detector.phase(KEY) == PHASE_STEADY
+    (event,) = stream.events
+    assert event["phase"] == PHASE_STEADY and event["start"] == 5.0
+    assert math.isclose(event["mean"], 1000e-9, rel_tol=0.05)  # Seconds
+    steady = stream.steady()
+    assert steady.count == STEADY_WINDOW * STEADY_BLOCK_RUNS
+    assert steady.max < 1300
+
+
+def test_level_shift_is_a_changepoint_and_both_steady_phases_are_kept():
+    stream = Stream()
+    for _ in range(STEADY_WINDOW + 5):
+        stream.tick(1000)
+    for _ in range(STEADY_WINDOW + 2):
+        stream.tick(1300)  # E.g. thermal throttling
+    phases = [(event["phase"], event.get("changepoint", False)) for event in stream.events]
+    assert phases == [(PHASE_STEADY, False), (PHASE_TRANSIENT, True), (PHASE_STEADY, False)]
+    shift = stream.events[1]
+    assert shift["previous_mean"] < shift["mean"]
+    assert shift["start"] == STEADY_WINDOW + 5.0  # The shift starts with the first slow block
+    # The second steady phase starts with the alarm block, so here every sample ends up steady.
+    assert stream.steady().count == (2 * STEADY_WINDOW + 7) * STEADY_BLOCK_RUNS
+
+
+def test_per_sample_histogram_is_cut_at_the_same_boundaries():
+    stream = Stream(iterations=1000)
+    for mean in (4000, 2000):
+        stream.tick(mean)
+    for _ in range(STEADY_WINDOW):
+        stream.tick(1000)
+    assert stream.steady(which=0).count == STEADY_WINDOW * STEADY_BLOCK_RUNS * 1000
+    assert stream.steady(which=1).count == STEADY_WINDOW * STEADY_BLOCK_RUNS
+
+
+def test_a_single_deviant_block_is_an_outlier_not_a_changepoint():
+    stream = Stream()
+    for _ in range(STEADY_WINDOW + 3):
+        stream.tick(1000)
+    stream.tick(1150)  # 15 % off: trips the CUSUM on its own
+    for _ in range(3):
+        stream.tick(1000)
+    assert [event["phase"] for event in stream.events] == [PHASE_STEADY]
+    assert stream.detector.phase(KEY) == PHASE_STEADY
+
+
+def test_partial_tick_after_the_measurement_phase_is_ignored():
+    # Regression: the truncated last tick of a test was reported as "changepoint -> transient".
+    stream = Stream()
+    for _ in range(STEADY_WINDOW + 5):
+        stream.tick(1000)
+    stream.tick(1000, runs=STEADY_BLOCK_RUNS // 2)  # Open block when the phase ends
+    stream.detector.end(KEY)
+    stream.tick(1200, runs=STEADY_BLOCK_RUNS)       # The tick that straddles the end
+    stream.tick(1200, runs=STEADY_BLOCK_RUNS)
+    assert [event["phase"] for event in stream.events] == [PHASE_STEADY]
+    assert stream.detector.phases(KEY)[-1]["phase"] == PHASE_STEADY
+    stream.detector.resume(KEY)  # Measured again: analyzed again
+    for _ in range(3):
+        stream.tick(1300)
+    assert [event.get("changepoint", False) for event in stream.events] == [False, True]
@@ -0,0 +1,40 @@
+from praf_histogram import LogHistogram
+from praf_telemetry import TelemetryAggregator
+
+KEY = ("Python", "array_sort")
+
+
+def payload(events, **totals):
+    return {"process": {"rss_bytes": 1 << 20}, "results": [
+        {"algo": KEY[1], "samples": 100, "gc_collections": 2, "nivcsw": 1, "alloc_peak_bytes": 4096,
+         **totals, "events": events},
+    ]}
+
+
+def test_totals_accumulate_and_keep_the_latest_allocation_peak():
+    telemetry = TelemetryAggregator()
+    telemetry.add(KEY[0], payload([]))
+    telemetry.add(KEY[0], payload([], alloc_peak_bytes=8192, majflt=3))
+    summary = telemetry.summary(KEY)
+    assert summary["samples"] == 200 and summary["gc_collections"] == 4 and summary["majflt"] == 3
+    assert summary["alloc_peak_bytes"] == 8192
+    assert telemetry.process[KEY[0]] == {"rss_bytes": 1 << 20}
+    assert telemetry.summary(("Python", "fibonacci")) is None
+
+
+def test_tail_is_attributed_to_gc_and_scheduler_events():
+    # 1000 fast runs, a tail of 20 slow ones: 10 with a collection, 5 preempted, 5 unexplained.
+    hist = LogHistogram()
+    hist.record(1000, 980)
+    hist.record(50_000, 20)
+    events = (
+        [[50_000, 1, 1, 40_000, 0, 0]] * 10   # A collection ran
+        + [[50_000, 1, 0, 0, 1, 0]] * 4       # Involuntary context switch
+        + [[50_000, 1, 0, 0, 0, 1]]           # Major page fault
+        + [[1000, 100, 1, 5000, 0, 0]]        # GC in a fast sample: not part of the tail
+    )
+    telemetry = TelemetryAggregator()
+    telemetry.add(KEY[0], payload(events))
+    shares = telemetry.tail_attribution(KEY, hist)
+    assert shares == {"p99_gc_share": 0.5, "p99_scheduler_share": 0.25}
+    assert telemetry.summary(KEY, hist)["p99_gc_share"] == 0.5
@@ -0,0 +1,349 @@
+# =========================
+#   P-RAF: Orchestrator Self-Benchmark
+#   (Developer Utility)
+# =========================
+#
+# Measures the orchestrator's own hot path: how many results per second it
+# ingests and how long a result takes from the worker socket to the
+# dashboards. Every scenario starts a fresh orchestrator (--no-launch
+# --no-browser --no-log on spare ports), connects headless fake dashboards,
+# and then starts synthetic workers as separate processes. Each worker sends
+# pre-encoded results at a fixed rate (0 = as fast as the socket takes them)
+# in one of three shapes:
+#
+#   lines    v1 per-result JSON lines, no hello
+#   batch    data_batch JSON lines of `batch` results (hello, json encoding)
+#   binary   RECORDS frames of `batch` results (hello, binary encoding)
+#
+# Latency: every PROBE_INTERVAL each worker also sends one result of the
+# algorithm "bench_probe" whose duration is its send time (seconds since the
+# scenario start). The dashboards see it as the min of that key's delta, so
+# receive time - send time is the ingest-to-broadcast latency, including the
+# wait for the next broadcast tick (BROADCAST_INTERVAL, 100 ms).
+#
+# Reported per scenario: results/s offered and ingested (counted by the
+# dashboards), wire messages/s, latency p50/p99/max, and the orchestrator's
+# CPU use and RSS from /proc (Linux).
+#
+#   python tools/orchestrator_bench.py                       # all scenarios, 10 s each
+#   python tools/orchestrator_bench.py --scenario binary-max --duration 30 --json bench.json
+#   python tools/orchestrator_bench.py --shape binary --workers 8 --rate 0 --clients 4
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / "python_benchmark"))
+import wire  # noqa: E402  (the worker-side reference encoder)
+
+ORCHESTRATOR = ROOT_DIR / "praf_orchestrator.py"
+HOST = "127.0.0.1"
+BENCH_PORT = 9100            # Worker port of the benchmarked orchestrator (dashboard port: +1)
+SHAPES = ("lines", "batch", "binary")
+ALGORITHMS = ("bench_a", "bench_b", "bench_c", "bench_d")
+PROBE = "bench_probe"
+PROBE_INTERVAL = 0.25        # Seconds between latency probes of one worker
+DEFAULT_DURATION = 10.0      # Seconds the workers send per scenario
+STARTUP_TIMEOUT = 15.0
+DRAIN_SEC = 1.0              # Seconds to keep listening after the workers stopped
+MESSAGE_POOL = 16            # Pre-encoded messages each worker cycles through
+
+Scenario = namedtuple("Scenario", ["name", "shape", "workers", "rate", "batch", "clients"])
+# `rate` is results per second per worker (0 = unthrottled)
+SCENARIOS = [
+    Scenario("lines", "lines", 1, 20_000, 1, 1),
+    Scenario("batch", "batch", 2, 100_000, 500, 1),
+    Scenario("binary", "binary", 2, 200_000, 500, 1),
+    Scenario("binary-max", "binary", 4, 0, 500, 1),
+    Scenario("fanout", "binary", 2, 100_000, 500, 16),
+]
+
+
+# --- Synthetic Worker (runs in its own process) ---
+def encode_messages(shape, lang, batch, rng):
+    """A pool of ready-to-send messages of `batch` results each (one for lines)."""
+    messages = []
+    for i in range(MESSAGE_POOL):
+        algo_id = i % len(ALGORITHMS)
+        durations = [rng.randint(1_000, 2_000_000) for _ in range(batch)]
+        if shape == "lines":
+            messages.append((json.dumps({"lang": lang, "algo": ALGORITHMS[algo_id], "duration": durations[0] * 1e-9})
+                             + "\n").encode())
+        elif shape == "batch":
+            messages.append(batch_line(lang, [(ALGORITHMS[(algo_id + j) % len(ALGORITHMS)], d * 1e-9)
+                                              for j, d in enumerate(durations)]))
+        else:
+            messages.append(wire.encode_records(algo_id, durations))
+    return messages
+
+
+def batch_line(lang, results):
+    return (json.dumps({"status": "success", "type": "data_batch", "payload": {
+        "lang": lang, "results": [{"algo": algo, "duration": duration} for algo, duration in results],
+    }}) + "\n").encode()
+
+
+def probe_message(shape, lang, sent_at):
+    if shape == "lines":
+        return (json.dumps({"lang": lang, "algo": PROBE, "duration": sent_at}) + "\n").encode()
+    if shape == "batch":
+        return batch_line(lang, [(PROBE, sent_at)])
+    return wire.encode_records(len(ALGORITHMS), [round(sent_at * 1e9)])
+
+
+def connect_worker(shape, lang, port):
+    sock = socket.create_connection((HOST, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if shape != "lines":
+        encodings = ["binary"] if shape == "binary" else ["json"]
+        sock.sendall(wire.encode_hello(lang, ALGORITHMS + (PROBE,), encodings))
+        ack = json.loads(sock.makefile("rb").readline())
+        if ack.get("encoding") != encodings[0]:
+            raise RuntimeError(f"orchestrator negotiated {ack.get('encoding')!r} instead of {encodings[0]!r}")
+    return sock
+
+
+def synthetic_worker(spec):
+    """Sends results as described by `spec` for spec["duration"] seconds; prints what it sent as JSON."""
+    shape, rate, duration, base = spec["shape"], spec["rate"], spec["duration"], spec["base"]
+    batch = 1 if shape == "lines" else spec["batch"]
+    lang = f"Bench-{spec['index']}"
+    messages = encode_messages(shape, lang, batch, random.Random(spec["index"]))
+    sock = connect_worker(shape, lang, spec["port"])
+    interval = batch / rate if rate else 0.0
+    started = time.perf_counter()
+    end = started + duration
+    next_send = next_probe = started
+    sent = count = 0
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            break
+        if now >= next_probe:
+            sock.sendall(probe_message(shape, lang, time.time() - base))
+            next_probe += PROBE_INTERVAL
+        sock.sendall(messages[count % MESSAGE_POOL])
+        count += 1
+        sent += batch
+        if interval:
+            next_send += interval
+            ahead = next_send - time.perf_counter()
+            if ahead > 0.001:  # Finer waits are busy: sleep() cannot hit them
+                time.sleep(ahead)
+    seconds = time.perf_counter() - started
+    sock.close()
+    print(json.dumps({"results": sent, "messages": count, "seconds": seconds}))
+
+
+# --- Fake Dashboards ---
+class FakeDashboard:
+    """Headless WebSocket client counting results and probe latencies."""
+
+    def __init__(self):
+        self.results = 0
+        self.frames = 0
+        self.latencies = []
+        self.ready = asyncio.Event()
+
+    async def run(self, url, base):
+        import websockets
+        async with websockets.connect(url, max_size=None) as ws:
+            async for message in ws:
+                received = time.time()
+                data = json.loads(message)
+                if data["type"] == "snapshot":
+                    self.ready.set()
+                elif data["type"] == "results":
+                    self.frames += 1
+                    for entry in data["results"]:
+                        if entry["algo"] == PROBE:
+                            self.latencies.append(received - base - entry["min"])
+                        else:
+                            self.results += entry["count"]
+
+
+# --- Orchestrator Process ---
+def process_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_memory(pid):
+    """(current, peak) resident set size in bytes."""
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(value.split()[0]) * 1024
+    return values.get("VmRSS"), values.get("VmHWM")
+
+
+def wait_for_port(port, proc, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"orchestrator exited with code {proc.returncode}")
+        try:
+            with socket.create_connection((HOST, port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"orchestrator did not open port {port} within {timeout:.0f}s")
+
+
+def start_orchestrator(port, verbose):
+    command = [sys.executable, str(ORCHESTRATOR), "--no-launch", "--no-browser", "--no-log",
+               "--port", str(port), "--dashboard-port", str(port + 1)]
+    output = None if verbose else subprocess.DEVNULL
+    proc = subprocess.Popen(command, stdout=output, stderr=output)
+    wait_for_port(port + 1, proc)
+    return proc
+
+
+def stop_orchestrator(proc):
+    proc.send_signal(signal.SIGINT)
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# --- Scenarios ---
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))]
+
+
+async def run_scenario(scenario, duration, port, verbose=False):
+    proc = start_orchestrator(port, verbose)
+    try:
+        base = time.time()
+        dashboards = [FakeDashboard() for _ in range(scenario.clients)]
+        listeners = [asyncio.create_task(d.run(f"ws://{HOST}:{port + 1}", base)) for d in dashboards]
+        await asyncio.wait_for(asyncio.gather(*(d.ready.wait() for d in dashboards)), STARTUP_TIMEOUT)
+
+        cpu_before, wall_before = process_cpu_seconds(proc.pid), time.monotonic()
+        spec = {"shape": scenario.shape, "rate": scenario.rate, "batch": scenario.batch,
+                "duration": duration, "base": base, "port": port}
+        workers = [
+            await asyncio.create_subprocess_exec(
+                sys.executable, __file__, "--as-worker", json.dumps({**spec, "index": i}),
+                stdout=asyncio.subprocess.PIPE)
+            for i in range(scenario.workers)
+        ]
+        outputs = [json.loads((await w.communicate())[0] or b"{}") for w in workers]
+        await asyncio.sleep(DRAIN_SEC)
+        cpu = process_cpu_seconds(proc.pid) - cpu_before
+        wall = time.monotonic() - wall_before
+        rss, peak_rss = process_memory(proc.pid)
+        for listener in listeners:
+            listener.cancel()
+    finally:
+        stop_orchestrator(proc)
+
+    if any("results" not in output for output in outputs):
+        raise RuntimeError("a synthetic worker failed (see its error output)")
+    seconds = max(output["seconds"] for output in outputs)
+    latencies = sorted(latency for d in dashboards for latency in d.latencies)
+    return {
+        **scenario._asdict(),
+        "duration_s": round(seconds, 3),
+        "offered_per_s": sum(o["results"] for o in outputs) / seconds,
+        "messages_per_s": sum(o["messages"] for o in outputs) / seconds,
+        # Every dashboard sees every result once; report what one of them saw.
+        "ingested_per_s": dashboards[0].results / seconds,
+        "frames_per_client": round(sum(d.frames for d in dashboards) / len(dashboards), 1),
+        "latency_p50_ms": latency_ms(percentile(latencies, 0.5)),
+        "latency_p99_ms": latency_ms(percentile(latencies, 0.99)),
+        "latency_max_ms": latency_ms(latencies[-1] if latencies else None),
+        "probes": len(latencies),
+        "cpu_percent": round(100 * cpu / wall, 1),
+        "rss_mb": round(rss / 2**20, 1) if rss else None,
+        "peak_rss_mb": round(peak_rss / 2**20, 1) if peak_rss else None,
+    }
+
+
+def latency_ms(seconds):
+    return round(seconds * 1e3, 2) if seconds is not None else None
+
+
+def print_results(rows):
+    print("\n--- Orchestrator Benchmark ---")
+    print(f"{'Scenario':<12} {'Shape':<7} {'Wk':>3} {'WS':>3} {'Offered/s':>11} {'Ingested/s':>11} {'Msgs/s':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'CPU %':>6} {'RSS MB':>7}")
+    for r in rows:
+        cells = [f"{r[k]:>8.1f}" if r[k] is not None else f"{'-':>8}"
+                 for k in ("latency_p50_ms", "latency_p99_ms", "latency_max_ms")]
+        print(f"{r['name']:<12} {r['shape']:<7} {r['workers']:>3} {r['clients']:>3} {r['offered_per_s']:>11,.0f} "
+              f"{r['ingested_per_s']:>11,.0f} {r['messages_per_s']:>9,.0f} {' '.join(cells)} "
+              f"{r['cpu_percent']:>6.1f} {r['rss_mb'] or 0:>7.1f}")
+
+
+async def run_all(scenarios, args):
+    rows = []
+    for scenario in scenarios:
+        print(f"▶️  {scenario.name}: {scenario.workers} x {scenario.shape} worker(s) at "
+              f"{f'{scenario.rate:,} results/s' if scenario.rate else 'full speed'}, "
+              f"{scenario.clients} dashboard(s), {args.duration:.0f}s...")
+        try:
+            rows.append(await run_scenario(scenario, args.duration, args.port, args.verbose))
+        except (RuntimeError, OSError, asyncio.TimeoutError) as e:
+            print(f"❌ {scenario.name} failed: {e}")
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="P-RAF orchestrator ingest/broadcast benchmark (Linux)")
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS],
+                        help="run only this predefined scenario (repeatable; default: all)")
+    parser.add_argument("--shape", choices=SHAPES, help="run one custom scenario with this message shape")
+    parser.add_argument("--workers", type=int, default=2, help="custom scenario: synthetic workers")
+    parser.add_argument("--rate", type=int, default=0, help="custom scenario: results/s per worker (0 = unthrottled)")
+    parser.add_argument("--batch", type=int, default=500, help="custom scenario: results per batch/frame")
+    parser.add_argument("--clients", type=int, default=1, help="custom scenario: fake dashboards")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per scenario")
+    parser.add_argument("--port", type=int, default=BENCH_PORT,
+                        help=f"worker port of the benchmarked orchestrator; the dashboard port is +1 "
+                             f"(default: {BENCH_PORT})")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the orchestrator's output")
+    parser.add_argument("--as-worker", metavar="SPEC", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.as_worker:
+        synthetic_worker(json.loads(args.as_worker))
+        return 0
+    if not sys.platform.startswith("linux"):
+        print("❌ ERROR: The orchestrator benchmark reads CPU and memory from /proc (Linux only).")
+        return 1
+    if args.shape:
+        scenarios = [Scenario("custom", args.shape, args.workers, args.rate, args.batch, args.clients)]
+    else:
+        scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    rows = asyncio.run(run_all(scenarios, args))
+    print_results(rows)
+    if args.json:
+        Path(args.json).write_text(json.dumps({"scenarios": rows}, indent=2), encoding="utf-8")
+        print(f"📄 Results written to {args.json}")
+    return 0 if len(rows) == len(scenarios) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())